@@ -1,7 +1,7 @@
-import scipy.io
 import numpy as np
 import plotly.graph_objects as go
 import warnings
+from pose_cache import load_relative_pose
 
 # Suppress .mat file loading warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
@@ -56,12 +56,9 @@ def fmt_title(text):
 
 # === Load Data ===
 # Use the 45° dataset
-data_45 = scipy.io.loadmat("Robot_Data3_45.mat")
-ir1 = data_45['ir_positions']
-ir2 = data_45['ir_positions2']
-rel = ir1 - ir2
-# reorder axes [x, z, -y] and convert to mm
-rel_mm = np.vstack([rel[0], rel[2], -rel[1]]) * 1000
+data_45 = load_relative_pose("Robot_Data3_45.mat")
+# relative position, axes reordered [x, z, -y] and in mm
+rel_mm = data_45['position_mm']
 
 # Apply rotation (same rotation angles, here demonstrating effect)
 R = rotation_matrix(rx, ry, rz)
@@ -1,7 +1,7 @@
-import scipy.io
 import numpy as np
 import plotly.graph_objects as go
 import warnings
+from pose_cache import load_relative_pose
 
 warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
 
@@ -10,7 +10,7 @@ line_width = 8
 color = 'rgb(214, 39, 40)'  # Red
 base_marker_color = 'limegreen'
 
-data = scipy.io.loadmat("Robot_Data_90F.mat")
+data = load_relative_pose("Robot_Data_90F.mat")
 
 def rotation_matrix(rx, ry, rz):
     rx, ry, rz = np.radians([rx, ry, rz])
@@ -20,10 +20,7 @@ def rotation_matrix(rx, ry, rz):
     return Rz @ Ry @ Rx
 
 def process_and_rotate(data, R):
-    ir1 = data['ir_positions']
-    ir2 = data['ir_positions2']
-    rel = ir1 - ir2
-    rel_mm = np.vstack([rel[0], rel[2], -rel[1]]) * 1000
+    rel_mm = data['position_mm']
     return R @ rel_mm
 
 R = rotation_matrix(rx, ry, rz)
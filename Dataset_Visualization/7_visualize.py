@@ -1,7 +1,7 @@
-import scipy.io
 import numpy as np
 import plotly.graph_objects as go
 import warnings
+from pose_cache import load_relative_pose
 
 warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
 
@@ -29,17 +29,14 @@ def rotation_matrix(rx, ry, rz):
     return Rz @ Ry @ Rx
 
 def process_and_rotate(data, R):
-    ir_positions = data['ir_positions']
-    ir_positions2 = data['ir_positions2']
-    rel_pos = ir_positions - ir_positions2
-    rel_pos_mm = np.vstack([rel_pos[0], rel_pos[2], -rel_pos[1]]) * 1000
+    rel_pos_mm = data['position_mm']
     rotated = R @ rel_pos_mm
     return rotated[0], rotated[1], rotated[2]
 
 # Load and transform
-data_zero = scipy.io.loadmat("Robot_Data_Zero.mat")
-data_45 = scipy.io.loadmat("Robot_Data3_45.mat")
-data_90 = scipy.io.loadmat("Robot_Data_90F.mat")
+data_zero = load_relative_pose("Robot_Data_Zero.mat")
+data_45 = load_relative_pose("Robot_Data3_45.mat")
+data_90 = load_relative_pose("Robot_Data_90F.mat")
 R = rotation_matrix(rx, ry, rz)
 X0, Y0, Z0 = process_and_rotate(data_zero, R)
 X45, Y45, Z45 = process_and_rotate(data_45, R)
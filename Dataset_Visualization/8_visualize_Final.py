@@ -1,7 +1,7 @@
-import scipy.io
 import numpy as np
 import plotly.graph_objects as go
 import warnings
+from pose_cache import load_relative_pose
 
 # Suppress .mat file loading warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
@@ -21,9 +21,9 @@ color_90 = 'rgb(214, 39, 40)'     # Red
 base_marker_color = 'limegreen'
 
 # === Data Loading ===
-data_zero = scipy.io.loadmat("Robot_Data_Zero.mat")
-data_45 = scipy.io.loadmat("Robot_Data3_45.mat")
-data_90 = scipy.io.loadmat("Robot_Data_90F.mat")
+data_zero = load_relative_pose("Robot_Data_Zero.mat")
+data_45 = load_relative_pose("Robot_Data3_45.mat")
+data_90 = load_relative_pose("Robot_Data_90F.mat")
 
 # === Rotation matrix helper ===
 def rotation_matrix(rx, ry, rz):
@@ -41,10 +41,7 @@ def rotation_matrix(rx, ry, rz):
 
 # === Process and rotate data ===
 def process_and_rotate(data, R):
-    ir_positions = data['ir_positions']
-    ir_positions2 = data['ir_positions2']
-    rel_pos = ir_positions - ir_positions2
-    rel_pos_mm = np.vstack([rel_pos[0], rel_pos[2], -rel_pos[1]]) * 1000
+    rel_pos_mm = data['position_mm']
     rotated = R @ rel_pos_mm
     return rotated[0], rotated[1], rotated[2]
 
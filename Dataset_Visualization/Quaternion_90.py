@@ -1,7 +1,7 @@
-import scipy.io
 import numpy as np
 import plotly.graph_objects as go
 import warnings
+from pose_cache import load_relative_pose
 
 # Suppress .mat file loading warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
@@ -48,11 +48,9 @@ def rotation_matrix(rx, ry, rz):
     return Rz @ Ry @ Rx
 
 # === Load 90° data ===
-data = scipy.io.loadmat("Robot_Data_90F.mat")  # 90° dataset
-ir1 = data['ir_positions']
-ir2 = data['ir_positions2']
-rel = ir1 - ir2            # 3×N relative marker vector
-rel_mm = np.vstack([rel[0], rel[2], -rel[1]]) * 1000  # reorder & mm
+data = load_relative_pose("Robot_Data_90F.mat")  # 90° dataset
+# relative position, axes reordered [x, z, -y] and in mm
+rel_mm = data['position_mm']
 
 # Apply global rotation
 Rmat = rotation_matrix(rx, ry, rz)
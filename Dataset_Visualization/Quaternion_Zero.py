@@ -1,8 +1,8 @@
-import scipy.io
 import numpy as np
 import plotly.graph_objects as go
 from scipy.spatial.transform import Rotation as R
 import warnings
+from pose_cache import load_relative_pose
 
 # Suppress .mat file loading warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
@@ -70,14 +70,10 @@ fig = go.Figure()
 draw_axes_legend = True
 
 for idx, ds in enumerate(datasets):
-    data    = scipy.io.loadmat(ds['file'], squeeze_me=True)
-    ir1, ir2= data['ir_positions'], data['ir_positions2']
-    qw, qv  = data['ir_quaternion_scalar'], data['ir_quaternion_vector']
+    data    = load_relative_pose(ds['file'])
 
     # --- rotated trajectory ---
-    rel_mm  = np.vstack([ir1[0]-ir2[0],
-                         ir1[2]-ir2[2],
-                         -(ir1[1]-ir2[1])]) * 1000
+    rel_mm  = data['position_mm']
     rel_rot = Rmat @ rel_mm
     x, y, z = rel_rot[:, start_index:end_index]
 
@@ -90,7 +86,7 @@ for idx, ds in enumerate(datasets):
     ))
 
     # --- build & rotate quaternions into body‐frame axes ---
-    quats  = np.vstack([qv, qw]).T
+    quats  = data['quaternion']
     Rs     = R.from_quat(quats).as_matrix()
     Rs_tot = np.einsum('ij,kjl->kil', Rmat, Rs)
 
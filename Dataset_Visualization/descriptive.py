@@ -1,9 +1,9 @@
-import scipy.io
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
 from matplotlib.lines import Line2D
+from pose_cache import load_relative_pose
 
 # ========= USER CONFIGURATION =========
 
@@ -60,10 +60,7 @@ def rotation_matrix(rx, ry, rz):
     return Rz @ Ry @ Rx
 
 def process_and_rotate(data, R):
-    ir_positions = data['ir_positions']
-    ir_positions2 = data['ir_positions2']
-    rel_pos = ir_positions - ir_positions2
-    rel_pos_mm = np.vstack([rel_pos[0], rel_pos[2], -rel_pos[1]]) * 1000
+    rel_pos_mm = data['position_mm']
     rotated = R @ rel_pos_mm
     return rel_pos_mm, rotated
 
@@ -74,7 +71,7 @@ stats = []
 box_data = []
 
 for label, file_path in mat_files.items():
-    data = scipy.io.loadmat(file_path)
+    data = load_relative_pose(file_path)
     raw, rotated = process_and_rotate(data, R)
     for axis_idx, axis_label in enumerate(['X', 'Y', 'Z']):
         stats.extend([
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import scipy.io
+
+# -----------------------------------------------------------------------------
+# Shared derived-data cache for the Robot_Data_*.mat tracker recordings
+#
+# Every visualization script needs the same relative pose:
+#   rel   = ir_positions - ir_positions2
+#   pos   = [x, z, -y] * 1000          (3, N) in mm
+#   quat  = [qx, qy, qz, qw]           (N, 4) from ir_quaternion_vector/_scalar
+#
+# load_relative_pose() computes it once per source file and stores it under
+# .pose_cache/<sha1 of the .mat contents>.npz, so re-running the full figure set
+# only pays for a small .npz read per dataset.
+# -----------------------------------------------------------------------------
+
+CACHE_DIR_NAME = '.pose_cache'
+CACHE_VERSION = 1          # bump when relative_pose() changes
+INDEX_NAME = 'index.json'  # path/size/mtime → hash, so unchanged files aren't re-hashed
+
+
+def relative_pose(data):
+    """
+    Relative marker pose from a loaded Robot_Data_*.mat dict.
+
+    Returns:
+      position_mm  → array (3, N), axes remapped to (x, z, -y) and scaled to mm
+      quaternion   → array (N, 4) as [qx, qy, qz, qw], or None if not recorded
+    """
+    rel = data['ir_positions'] - data['ir_positions2']
+    position_mm = np.vstack([rel[0], rel[2], -rel[1]]) * 1000
+
+    quaternion = None
+    if 'ir_quaternion_vector' in data and 'ir_quaternion_scalar' in data:
+        qv = np.asarray(data['ir_quaternion_vector'], dtype=float).reshape(3, -1)
+        qw = np.ravel(data['ir_quaternion_scalar']).astype(float)
+        quaternion = np.column_stack([qv[0], qv[1], qv[2], qw])
+    return position_mm, quaternion
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-1 of the file contents."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cached_hash(path, cache_dir):
+    index_path = os.path.join(cache_dir, INDEX_NAME)
+    try:
+        with open(index_path) as fh:
+            index = json.load(fh)
+    except (OSError, ValueError):
+        index = {}
+
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    entry = index.get(key)
+    if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+        return entry['sha1']
+
+    digest = file_hash(path)
+    index[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha1': digest}
+    tmp = index_path + '.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump(index, fh, indent=2)
+    os.replace(tmp, index_path)
+    return digest
+
+
+def load_relative_pose(mat_path, cache_dir=None):
+    """
+    Cached `relative_pose` for a Robot_Data_*.mat file.
+
+    Args:
+      mat_path   path to the tracker recording
+      cache_dir  where derived arrays live (None → .pose_cache next to the file)
+
+    Returns:
+      dict with 'position_mm' (3, N) and, if recorded, 'quaternion' (N, 4)
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(mat_path)), CACHE_DIR_NAME)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    digest = _cached_hash(mat_path, cache_dir)
+    cache_path = os.path.join(cache_dir, f"{digest}-v{CACHE_VERSION}.npz")
+
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            return {k: cached[k] for k in cached.files}
+
+    position_mm, quaternion = relative_pose(scipy.io.loadmat(mat_path))
+    pose = {'position_mm': position_mm}
+    if quaternion is not None:
+        pose['quaternion'] = quaternion
+
+    tmp = cache_path + '.tmp'
+    with open(tmp, 'wb') as fh:
+        np.savez(fh, **pose)
+    os.replace(tmp, cache_path)
+    return pose
+
+
+if __name__ == '__main__':
+    # Warm the cache for the three datasets used by the figure scripts
+    for path in ['Robot_Data_Zero.mat', 'Robot_Data3_45.mat', 'Robot_Data_90F.mat']:
+        pose = load_relative_pose(path)
+        print(f"{path}: {pose['position_mm'].shape[1]} samples cached")
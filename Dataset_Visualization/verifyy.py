@@ -0,0 +1,144 @@
+import argparse
+import glob
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.io
+from scipy.spatial.transform import Rotation as R
+
+from pose_cache import relative_pose
+
+# Suppress .mat file loading warnings
+warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
+
+# -----------------------------------------------------------------------------
+# Batched Python port of verifyy.m
+#
+#   Robot_Data_*.mat (ir_positions, ir_positions2, ir_quaternion_*, motor_*)
+#       → TEE_*_cellformat.mat  (posecell (N,7), motorcell (N,4))
+#
+# verifyy.m loops over every sample (quat2rotm → rotx*roty*rotz → rotm2quat);
+# here the whole recording is rotated and re-composed in one batched call.
+# posecell quaternions are stored scalar-last [qx, qy, qz, qw], which is how
+# the training notebooks read them (R.from_quat(posecell[:, 3:])).
+# -----------------------------------------------------------------------------
+
+# Output names for the sessions used in the paper
+SESSION_NAMES = {
+    'Robot_Data_Zero.mat': 'TEE_zero_cellformat.mat',
+    'Robot_Data3_45.mat':  'TEE_45_cellformat.mat',
+    'Robot_Data_90F.mat':  'TEE_90_cellformat.mat',
+}
+
+# Encoder channels in motorcell column order: [m_1 m_2 m_4 m_3]
+MOTOR_KEYS    = ['motor_1_position_m', 'motor_2_position_m',
+                 'motor_4_position_m', 'motor_3_position_m']
+MOTOR_OFFSET  = np.array([2048.0, 2048.0, 0.0, 2048.0])          # counts
+MOTOR_COUNTS  = np.array([4096.0, 4096.0, 526374.0, 4096.0])     # counts per revolution
+
+
+def frame_rotation(rx, ry, rz):
+    """MATLAB rotx(rx)*roty(ry)*rotz(rz) (degrees) as a scipy Rotation."""
+    return R.from_euler('XYZ', [rx, ry, rz], degrees=True)
+
+
+def build_posecell(data, rotation=(0, 0, 0)):
+    """
+    posecell = [X Y Z qx qy qz qw] for a whole recording in one pass.
+
+    Args:
+      data      dict loaded from Robot_Data_*.mat
+      rotation  (rx, ry, rz) in degrees, applied as rotx*roty*rotz
+
+    Returns:
+      posecell → array (N, 7); positions in mm, quaternions unit-norm
+    """
+    position_mm, quat = relative_pose(data)
+    if quat is None:
+        raise KeyError("recording has no ir_quaternion_vector / ir_quaternion_scalar")
+
+    rot = frame_rotation(*rotation)
+    pos = rot.apply(position_mm.T)                 # (N, 3)
+    quat = (rot * R.from_quat(quat)).as_quat()     # (N, 4), batched composition
+    return np.hstack([pos, quat])
+
+
+def build_motorcell(data, raw_counts=False):
+    """
+    motorcell = [m_1 m_2 m_4 m_3] for a whole recording in one pass.
+
+    Args:
+      data        dict loaded from Robot_Data_*.mat
+      raw_counts  keep encoder counts instead of converting to radians
+
+    Returns:
+      motorcell → array (N, 4)
+    """
+    counts = np.column_stack([np.ravel(data[k]).astype(np.float64) for k in MOTOR_KEYS])
+    if raw_counts:
+        return counts
+    # deg2rad((m - 2048) * 360 / 4096) for all four channels at once
+    return (counts - MOTOR_OFFSET) * (2 * np.pi / MOTOR_COUNTS)
+
+
+def convert_session(mat_path, out_path, rotation=(0, 0, 0), raw_counts=False):
+    """Convert one Robot_Data_*.mat file and save posecell/motorcell to `out_path`."""
+    data = scipy.io.loadmat(mat_path)
+    posecell = build_posecell(data, rotation)
+    motorcell = build_motorcell(data, raw_counts)
+
+    n = min(len(posecell), len(motorcell))
+    if len(posecell) != len(motorcell):
+        print(f"⚠ {mat_path}: {len(posecell)} poses vs {len(motorcell)} motor samples, trimming to {n}")
+    scipy.io.savemat(out_path, {'posecell': posecell[:n], 'motorcell': motorcell[:n]})
+    return out_path, n
+
+
+def output_name(mat_path):
+    name = os.path.basename(mat_path)
+    if name in SESSION_NAMES:
+        return SESSION_NAMES[name]
+    return os.path.splitext(name)[0] + '_cellformat.mat'
+
+
+def convert_directory(src_dir, out_dir=None, pattern='Robot_Data*.mat',
+                      rotation=(0, 0, 0), raw_counts=False, workers=None):
+    """
+    Convert every matching session in `src_dir` with a process pool.
+
+    Returns:
+      list of (out_path, n_samples), one per session
+    """
+    out_dir = out_dir or src_dir
+    os.makedirs(out_dir, exist_ok=True)
+    sources = sorted(glob.glob(os.path.join(src_dir, pattern)))
+    targets = [os.path.join(out_dir, output_name(p)) for p in sources]
+
+    if workers == 1 or len(sources) <= 1:
+        return [convert_session(s, t, rotation, raw_counts) for s, t in zip(sources, targets)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(convert_session, s, t, rotation, raw_counts)
+                   for s, t in zip(sources, targets)]
+        return [f.result() for f in futures]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Build posecell/motorcell .mat files from Robot_Data_*.mat recordings.')
+    parser.add_argument('src_dir', nargs='?', default='.')
+    parser.add_argument('--out', default=None, help='output directory (default: src_dir)')
+    parser.add_argument('--pattern', default='Robot_Data*.mat')
+    parser.add_argument('--rot', nargs=3, type=float, default=[0, 0, 0],
+                        metavar=('RX', 'RY', 'RZ'), help='rotx*roty*rotz angles in degrees')
+    parser.add_argument('--raw-counts', action='store_true',
+                        help='store motor encoder counts instead of radians')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    results = convert_directory(args.src_dir, args.out, args.pattern,
+                                tuple(args.rot), args.raw_counts, args.workers)
+    for path, n in results:
+        print(f"📁 Saved: {path}  ({n} samples)")
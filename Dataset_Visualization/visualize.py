@@ -1,29 +1,21 @@
-import scipy.io
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import warnings
+from pose_cache import load_relative_pose
 
 # Suppress duplicate variable name warnings from scipy
 warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
 
 # --- Load MATLAB files (make sure they are in the same folder as this script) ---
-data_zero = scipy.io.loadmat("Robot_Data_Zero.mat")
-data_45 = scipy.io.loadmat("Robot_Data3_45.mat")
-data_90 = scipy.io.loadmat("Robot_Data_90F.mat")
+data_zero = load_relative_pose("Robot_Data_Zero.mat")
+data_45 = load_relative_pose("Robot_Data3_45.mat")
+data_90 = load_relative_pose("Robot_Data_90F.mat")
 
 # --- Function to extract and transform positions ---
 def process_ir_positions(data):
-    ir_positions = data['ir_positions']
-    ir_positions2 = data['ir_positions2']
-    x = ir_positions[0, :] - ir_positions2[0, :]
-    y = ir_positions[1, :] - ir_positions2[1, :]
-    z = ir_positions[2, :] - ir_positions2[2, :]
-    
-    # Transform to new coordinate system and convert to millimeters
-    X = x * 1000
-    Y = z * 1000
-    Z = -y * 1000
+    # relative position, already transformed to (x, z, -y) and millimeters
+    X, Y, Z = data['position_mm']
     return X, Y, Z
 
 # --- Process datasets ---
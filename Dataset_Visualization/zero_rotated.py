@@ -1,7 +1,7 @@
-import scipy.io
 import numpy as np
 import plotly.graph_objects as go
 import warnings
+from pose_cache import load_relative_pose
 
 # Suppress .mat file loading warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
@@ -55,12 +55,9 @@ def fmt_title(text):
     return f"<b>{text}</b>" if axis_title_bold else text
 
 # === Load Data ===
-data_zero = scipy.io.loadmat("Robot_Data_Zero.mat")
-ir1 = data_zero['ir_positions']
-ir2 = data_zero['ir_positions2']
-rel = ir1 - ir2
-# reorder axes [x, z, -y] and convert to mm
-rel_mm = np.vstack([rel[0], rel[2], -rel[1]]) * 1000
+data_zero = load_relative_pose("Robot_Data_Zero.mat")
+# relative position, axes reordered [x, z, -y] and in mm
+rel_mm = data_zero['position_mm']
 
 # Apply rotation
 R = rotation_matrix(rx, ry, rz)
@@ -1,10 +1,11 @@
-import scipy.io
+import os
+import sys
+
 import numpy as np
 import plotly.graph_objects as go
-import warnings
 
-# Suppress .mat file loading warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from tee_kinematics.prediction_bundle import open_bundle
 
 # === USER SETTINGS ===
 rx, ry, rz = 0, 0, 0          # global rotation (degrees)
@@ -12,6 +13,7 @@ window_width, window_height = 1800, 1100
 
 #start_index, end_index = 2000, 9000
 start_index, end_index = 9780, None
+bundle_path = 'predictions.bundle'     # written by the notebook export cells
 sample_step = 50                  # draw orientation arrows every N samples
 line_width = 6
 arrow_scale = 0.15
@@ -112,28 +114,22 @@ def add_arrows(fig, x, y, z, ox, oy, oz,
         ))
 
 
-def load_and_slice(matfile, key):
-    """Load a .mat variable and slice it by start/end indices."""
-    arr = scipy.io.loadmat(matfile)[key].squeeze()
-    return arr[start_index:end_index]
+def load_and_slice(bundle_path, name):
+    """Measured and predicted (N, 7) poses of one configuration, sliced by start/end indices."""
+    run = open_bundle(bundle_path)[name]
+    return run.measured[start_index:end_index], run.predicted[start_index:end_index]
 
 
 # === LOAD AND SLICE DATA ===
+measured, predicted = load_and_slice(bundle_path, 'Zero')
+
 # Positions (mm)
-x0  = load_and_slice("TEE_Zero_org_pos_matlab.mat",     'x_total') * 1000
-y0  = load_and_slice("TEE_Zero_org_pos_matlab.mat",     'y_total') * 1000
-z0  = load_and_slice("TEE_Zero_org_pos_matlab.mat",     'z_total') * 1000
-xp0 = load_and_slice("TEE_Zero_predict_pos_matlab.mat", 'xp_total') * 1000
-yp0 = load_and_slice("TEE_Zero_predict_pos_matlab.mat", 'yp_total') * 1000
-zp0 = load_and_slice("TEE_Zero_predict_pos_matlab.mat", 'zp_total') * 1000
+x0, y0, z0 = measured[:, :3].T * 1000
+xp0, yp0, zp0 = predicted[:, :3].T * 1000
 
 # Orientations
-ox0  = load_and_slice("TEE_Zero_org_orient_matlab.mat",     'o1_total')
-oy0  = load_and_slice("TEE_Zero_org_orient_matlab.mat",     'o2_total')
-oz0  = load_and_slice("TEE_Zero_org_orient_matlab.mat",     'o3_total')
-oxp0 = load_and_slice("TEE_Zero_predict_orient_matlab.mat", 'o1p_total')
-oyp0 = load_and_slice("TEE_Zero_predict_orient_matlab.mat", 'o2p_total')
-ozp0 = load_and_slice("TEE_Zero_predict_orient_matlab.mat", 'o3p_total')
+ox0, oy0, oz0 = measured[:, 3:6].T
+oxp0, oyp0, ozp0 = predicted[:, 3:6].T
 
 # === APPLY GLOBAL ROTATION ===
 Rmat = rotation_matrix(rx, ry, rz)
@@ -1,15 +1,25 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import os
+import sys
 import tempfile
 import webbrowser
 
-import scipy.io as sio
 import plotly.graph_objects as go
+from scipy.spatial.transform import Rotation as R
 
-# === USER SETTINGS: Rotation Angles for subtitle ===
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from tee_kinematics.prediction_bundle import open_bundle
+
+# === USER SETTINGS: Rotation Angles (applied to the positions, shown in the subtitle) ===
 rx, ry, rz = 0, -20, 40
 
+# === USER SETTINGS: results of the run ===
+# predictions.bundle written by the Original_1 notebook export cells. Its codecs
+# use R.from_euler('xyz', [0, 0, 0]), so the poses are in the recorded frame;
+# load_xyz rotates them by rx, ry, rz here.
+bundle_path = 'predictions.bundle'
+
 # === USER SETTINGS: Line Widths ===
 lw_orig = 6    # thickness for original trajectories
 lw_pred = 3    # thickness for predicted trajectories
@@ -28,23 +38,25 @@ base_marker_color = 'black'
 base_marker_size  = 15
 
 # -----------------------------------------------------------------------------
-# Helper to load and scale XYZ from a .mat
+# Helper to rotate and scale XYZ of one configuration of the prediction bundle
 # -----------------------------------------------------------------------------
-def load_xyz(matfile, keys):
-    d = sio.loadmat(matfile)
-    return tuple(d[k].squeeze() * 1000 for k in keys)
+rotation = R.from_euler('xyz', [rx, ry, rz], degrees=True).as_matrix()
+
+def load_xyz(run):
+    """Measured x, y, z and predicted xp, yp, zp of one configuration, rotated, in mm."""
+    x, y, z = (run.measured[:, :3] @ rotation.T).T * 1000
+    xp, yp, zp = (run.predicted[:, :3] @ rotation.T).T * 1000
+    return x, y, z, xp, yp, zp
 
 # -----------------------------------------------------------------------------
 # 1. Load rotated positions (org + pred) for 0°, 45°, 90°
 # -----------------------------------------------------------------------------
-x0,  y0,  z0   = load_xyz('TEE_zero_org_pos_matlab_rotate.mat',     ['x_total_zero','y_total_zero','z_total_zero'])
-xp0, yp0, zp0 = load_xyz('TEE_zero_predict_pos_matlab_rotate.mat', ['xp_total_zero','yp_total_zero','zp_total_zero'])
+bundle = open_bundle(bundle_path)
+x0,  y0,  z0, xp0, yp0, zp0 = load_xyz(bundle['Zero'])
 
-x45,  y45,  z45   = load_xyz('TEE_45_org_pos_matlab_rotate.mat',     ['x_total_45','y_total_45','z_total_45'])
-xp45, yp45, zp45 = load_xyz('TEE_45_predict_pos_matlab_rotate.mat', ['xp_total_45','yp_total_45','zp_total_45'])
+x45,  y45,  z45, xp45, yp45, zp45 = load_xyz(bundle['45'])
 
-x90,  y90,  z90   = load_xyz('TEE_90_org_pos_matlab_rotate.mat',     ['x_total_90','y_total_90','z_total_90'])
-xp90, yp90, zp90 = load_xyz('TEE_90_predict_pos_matlab_rotate.mat', ['xp_total_90','yp_total_90','zp_total_90'])
+x90,  y90,  z90, xp90, yp90, zp90 = load_xyz(bundle['90'])
 
 # -----------------------------------------------------------------------------
 # 2. Build 3D line plot (solid for both original & predicted)
@@ -1,15 +1,17 @@
-import scipy.io
+import os
+import sys
+
 import numpy as np
 import plotly.graph_objects as go
-import warnings
 
-# Suppress .mat file loading warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from tee_kinematics.prediction_bundle import open_bundle
 
 # === USER SETTINGS ===
 rx, ry, rz = 0, -20, 40          # global rotation (degrees)
 window_width, window_height = 1800, 1100
 start_index, end_index = 4000, 6000
+bundle_path = 'predictions.bundle'     # written by the notebook export cells
 sample_step = 50                  # draw orientation arrows every N samples
 line_width = 6
 arrow_scale = 0.15
@@ -87,27 +89,15 @@ def add_arrows(fig, x, y, z, ox, oy, oz, prefix):
         ))
 
 # === LOAD ZERO DATA ===
-# Positions
-P0 = scipy.io.loadmat("TEE_Zero_org_pos_matlab.mat")
-x0 = P0['x_total'].squeeze() * 1000
-y0 = P0['y_total'].squeeze() * 1000
-z0 = P0['z_total'].squeeze() * 1000
+zero = open_bundle(bundle_path)['Zero']
 
-PP0 = scipy.io.loadmat("TEE_Zero_predict_pos_matlab.mat")
-xp0 = PP0['xp_total'].squeeze() * 1000
-yp0 = PP0['yp_total'].squeeze() * 1000
-zp0 = PP0['zp_total'].squeeze() * 1000
+# Positions
+x0, y0, z0 = zero.measured[:, :3].T * 1000
+xp0, yp0, zp0 = zero.predicted[:, :3].T * 1000
 
 # Orientations
-O0 = scipy.io.loadmat("TEE_Zero_org_orient_matlab.mat")
-ox0 = O0['o1_total'].squeeze()
-oy0 = O0['o2_total'].squeeze()
-oz0 = O0['o3_total'].squeeze()
-
-OP0 = scipy.io.loadmat("TEE_Zero_predict_orient_matlab.mat")
-oxp0 = OP0['o1p_total'].squeeze()
-oyp0 = OP0['o2p_total'].squeeze()
-ozp0 = OP0['o3p_total'].squeeze()
+ox0, oy0, oz0 = zero.measured[:, 3:6].T
+oxp0, oyp0, ozp0 = zero.predicted[:, 3:6].T
 
 # Apply global rotation
 Rmat = rotation_matrix(rx, ry, rz)
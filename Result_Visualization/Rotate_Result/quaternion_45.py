@@ -1,15 +1,17 @@
-import scipy.io
+import os
+import sys
+
 import numpy as np
 import plotly.graph_objects as go
-import warnings
 
-# Suppress .mat file loading warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from tee_kinematics.prediction_bundle import open_bundle
 
 # === USER SETTINGS ===
 rx, ry, rz = 0, 0, 0          # global rotation (degrees)
 window_width, window_height = 1800, 1100
 start_index, end_index = 9780, None
+bundle_path = 'predictions.bundle'     # written by the notebook export cells
 sample_step = 50                  # draw orientation arrows every N samples
 line_width = 6
 arrow_scale = 0.15
@@ -108,27 +110,21 @@ def add_arrows(fig, x, y, z, ox, oy, oz,
         ))
 
 
-def load_and_slice(matfile, key):
-    """Load a .mat variable and slice it by start/end indices."""
-    arr = scipy.io.loadmat(matfile)[key].squeeze()
-    return arr[start_index:end_index]
+def load_and_slice(bundle_path, name):
+    """Measured and predicted (N, 7) poses of one configuration, sliced by start/end indices."""
+    run = open_bundle(bundle_path)[name]
+    return run.measured[start_index:end_index], run.predicted[start_index:end_index]
 
 # === LOAD AND SLICE DATA FOR 45° ===
+measured, predicted = load_and_slice(bundle_path, '45')
+
 # Positions (mm)
-xm  = load_and_slice("TEE_45_org_pos_matlab.mat",     'x_total') * 1000
-ym  = load_and_slice("TEE_45_org_pos_matlab.mat",     'y_total') * 1000
-zm  = load_and_slice("TEE_45_org_pos_matlab.mat",     'z_total') * 1000
-xp  = load_and_slice("TEE_45_predict_pos_matlab.mat", 'xp_total') * 1000
-yp  = load_and_slice("TEE_45_predict_pos_matlab.mat", 'yp_total') * 1000
-zp  = load_and_slice("TEE_45_predict_pos_matlab.mat", 'zp_total') * 1000
+xm, ym, zm = measured[:, :3].T * 1000
+xp, yp, zp = predicted[:, :3].T * 1000
 
 # Orientations
-oxm = load_and_slice("TEE_45_org_orient_matlab.mat",     'o1_total')
-oym = load_and_slice("TEE_45_org_orient_matlab.mat",     'o2_total')
-ozm = load_and_slice("TEE_45_org_orient_matlab.mat",     'o3_total')
-oxp = load_and_slice("TEE_45_predict_orient_matlab.mat", 'o1p_total')
-oyp = load_and_slice("TEE_45_predict_orient_matlab.mat", 'o2p_total')
-ozp = load_and_slice("TEE_45_predict_orient_matlab.mat", 'o3p_total')
+oxm, oym, ozm = measured[:, 3:6].T
+oxp, oyp, ozp = predicted[:, 3:6].T
 
 # === APPLY GLOBAL ROTATION ===
 Rmat = rotation_matrix(rx, ry, rz)
@@ -1,20 +1,25 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import os
+import sys
 import tempfile
 import webbrowser
 
-import scipy.io as sio
 import plotly.graph_objects as go
 import numpy as np
-import warnings
 
-# Suppress .mat file loading warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="scipy.io.matlab")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from tee_kinematics.prediction_bundle import open_bundle
 
 # === USER SETTINGS: Rotation Angles for subtitle ===
 rx, ry, rz = 0, -20, 40
 
+# === USER SETTINGS: results of the run ===
+# predictions.bundle written by the rotated_2 notebook export cells. Its codecs
+# rotate by R.from_euler('xyz', [0, -20, 40]), so the poses are already in the
+# rotated frame named in the subtitle.
+bundle_path = 'predictions.bundle'
+
 # === USER SETTINGS: Line Widths ===
 lw_orig = 6   # thickness for original trajectories
 lw_pred = 1    # thickness (if using lines) for predicted trajectories
@@ -42,23 +47,23 @@ base_marker_color = 'black'
 base_marker_size  = 15
 
 # -----------------------------------------------------------------------------
-# Helper to load and scale XYZ from a .mat
+# Helper to scale XYZ of one configuration of the prediction bundle
 # -----------------------------------------------------------------------------
-def load_xyz(matfile, keys):
-    d = sio.loadmat(matfile)
-    return tuple(d[k].squeeze() * 1000 for k in keys)
+def load_xyz(run):
+    """Measured x, y, z and predicted xp, yp, zp of one configuration, in mm."""
+    x, y, z = run.measured[:, :3].T * 1000
+    xp, yp, zp = run.predicted[:, :3].T * 1000
+    return x, y, z, xp, yp, zp
 
 # -----------------------------------------------------------------------------
 # 1. Load rotated positions (org + pred) for 0°, 45°, 90°
 # -----------------------------------------------------------------------------
-x0,  y0,  z0   = load_xyz('TEE_Zero_org_pos_matlab.mat',     ['x_total','y_total','z_total'])
-xp0, yp0, zp0 = load_xyz('TEE_Zero_predict_pos_matlab.mat', ['xp_total','yp_total','zp_total'])
+bundle = open_bundle(bundle_path)
+x0,  y0,  z0, xp0, yp0, zp0 = load_xyz(bundle['Zero'])
 
-x45,  y45,  z45   = load_xyz('TEE_45_org_pos_matlab.mat',     ['x_total','y_total','z_total'])
-xp45, yp45, zp45 = load_xyz('TEE_45_predict_pos_matlab.mat', ['xp_total','yp_total','zp_total'])
+x45,  y45,  z45, xp45, yp45, zp45 = load_xyz(bundle['45'])
 
-x90,  y90,  z90   = load_xyz('TEE_90_org_pos_matlab.mat',     ['x_total','y_total','z_total'])
-xp90, yp90, zp90 = load_xyz('TEE_90_predict_pos_matlab.mat', ['xp_total','yp_total','zp_total'])
+x90,  y90,  z90, xp90, yp90, zp90 = load_xyz(bundle['90'])
 
 # -----------------------------------------------------------------------------
 # 2. Build 3D plot (solid lines for originals, symbols for predictions)
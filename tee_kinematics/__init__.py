@@ -0,0 +1,6 @@
+"""
+Shared data and model utilities for the robotic TEE kinematics notebooks.
+
+The training notebooks (Original_1/, rotated_2/) add the repository root to
+``sys.path`` and import from here instead of re-implementing each step.
+"""
@@ -0,0 +1,270 @@
+import argparse
+import asyncio
+import concurrent.futures
+import time
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# asyncio front end for the inference engines
+#
+# predict() runs on a dedicated worker (one thread, or one process that loads
+# its own copy of the model), so the event loop keeps serving sensor I/O while
+# a prediction is computed:
+#
+#   await predictor.predict(x, f)                 one prediction
+#   async for y in predictor.stream(windows):     pipelined, in order
+#
+# Backpressure: at most `max_pending` predictions are queued or running. When
+# all slots are taken, predict() waits for one (overflow='wait') or raises
+# Overloaded at once (overflow='reject'), so a slow model shows up at the
+# caller instead of as an ever-growing queue.
+#
+# Timeouts: predict(..., timeout=) raises asyncio.TimeoutError if the result
+# is not ready in time, counting the wait for a slot. A computation that has
+# already started cannot be interrupted; its slot is released when the worker
+# actually finishes, so the backpressure limit reflects the real worker load.
+# -----------------------------------------------------------------------------
+
+
+class Overloaded(RuntimeError):
+    """All `max_pending` slots are taken and the predictor rejects new requests."""
+
+
+# --- process worker: the model lives in the worker process ---
+
+_worker_predict = None
+
+
+def _load_worker(path, engine, threads):
+    global _worker_predict
+    from tee_kinematics.benchmark import load_engine
+
+    _worker_predict = load_engine(path, engine, threads).predict
+
+
+def _run_worker(x, f):
+    return np.asarray(_worker_predict(x, f))
+
+
+class AsyncPredictor:
+    """
+    Await predictions of any engine without blocking the event loop.
+
+    Args:
+      predict      callable (x (N, history, 7), f (N, history, 4)) → (N, 7), run in a
+                   worker thread (NumpyCombinedModel.predict, an engine's predict, ...)
+      max_pending  predictions queued or running at once
+      overflow     'wait' for a free slot, or 'reject' with Overloaded
+      timeout      default timeout in seconds for predict() (None → no timeout)
+      executor     concurrent.futures executor to use instead of a private worker thread
+    """
+
+    def __init__(self, predict, max_pending=4, overflow='wait', timeout=None, executor=None):
+        if overflow not in ('wait', 'reject'):
+            raise ValueError(f"overflow must be 'wait' or 'reject', not {overflow!r}")
+        self._predict = predict
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.timeout = timeout
+        self._own_executor = executor is None
+        self._executor = executor or concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='tee-inference')
+        self._slots = None
+        self.pending = 0
+        self.stats = {'completed': 0, 'timed_out': 0, 'rejected': 0}
+
+    @classmethod
+    def from_engine(cls, path, engine='numpy', threads=None, process=False, **kwargs):
+        """
+        Load a model with `benchmark.load_engine`.
+
+        With process=True the model is loaded and run in one worker process
+        (inputs and outputs are pickled across); otherwise in a worker thread.
+        """
+        if not process:
+            from tee_kinematics.benchmark import load_engine
+
+            return cls(load_engine(path, engine, threads).predict, **kwargs)
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, initializer=_load_worker, initargs=(path, engine, threads))
+        predictor = cls(_run_worker, executor=executor, **kwargs)
+        predictor._own_executor = True
+        return predictor
+
+    @property
+    def full(self):
+        return self.pending >= self.max_pending
+
+    async def _acquire(self):
+        if self._slots is None:                 # bind to the running loop on first use
+            self._slots = asyncio.Semaphore(self.max_pending)
+        if self.overflow == 'reject' and self._slots.locked():
+            self.stats['rejected'] += 1
+            raise Overloaded(f"{self.pending} predictions pending (max_pending={self.max_pending})")
+        await self._slots.acquire()
+
+    def _submit(self, x, f):
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = self._executor.submit(self._predict, x, f)
+
+        def release(_):
+            loop.call_soon_threadsafe(self._release)
+
+        future.add_done_callback(release)
+        return asyncio.wrap_future(future)
+
+    def _release(self):
+        self.pending -= 1
+        self._slots.release()
+
+    async def predict(self, x, f, timeout=...):
+        """
+        Args:
+          x, f     windows (N, history, D) or a single window (history, D)
+          timeout  seconds (default: the predictor's timeout)
+
+        Returns:
+          predictions (N, 7), or (7,) for a single window
+        """
+        timeout = self.timeout if timeout is ... else timeout
+        single = np.ndim(x) == 2
+        if single:
+            x, f = np.asarray(x)[None], np.asarray(f)[None]
+
+        async def run():
+            await self._acquire()
+            return await self._submit(x, f)
+
+        try:
+            out = await asyncio.wait_for(run(), timeout)
+        except asyncio.TimeoutError:
+            self.stats['timed_out'] += 1
+            raise
+        self.stats['completed'] += 1
+        return out[0] if single else out
+
+    async def stream(self, windows, timeout=...):
+        """
+        Predict a sequence of windows with up to `max_pending` in flight.
+
+        Args:
+          windows  iterable or async iterable of (x, f) pairs
+
+        Yields:
+          predictions in input order
+        """
+        timeout = self.timeout if timeout is ... else timeout
+        # a window is only read (and its prediction, with its timeout,
+        # started) once one of `max_pending` stream slots is free; a slot is
+        # given back when the consumer has received that result, so the input
+        # is read as fast as results drain and never runs ahead of them
+        window_slots = asyncio.Semaphore(self.max_pending)
+        in_flight = asyncio.Queue()
+        done = object()
+
+        async def submit(x, f):
+            await in_flight.put(asyncio.ensure_future(self.predict(x, f, timeout)))
+
+        async def feed():
+            try:
+                if hasattr(windows, '__aiter__'):
+                    iterator = windows.__aiter__()
+                    while True:
+                        await window_slots.acquire()
+                        try:
+                            x, f = await iterator.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        await submit(x, f)
+                else:
+                    iterator = iter(windows)
+                    while True:
+                        await window_slots.acquire()
+                        try:
+                            x, f = next(iterator)
+                        except StopIteration:
+                            break
+                        await submit(x, f)
+            finally:
+                await in_flight.put(done)
+
+        feeder = asyncio.ensure_future(feed())
+        try:
+            while True:
+                task = await in_flight.get()
+                if task is done:
+                    break
+                try:
+                    result = await task
+                finally:
+                    window_slots.release()
+                yield result
+            await feeder
+        finally:
+            feeder.cancel()
+            while not in_flight.empty():
+                task = in_flight.get_nowait()
+                if task is not done:
+                    task.cancel()
+
+    def close(self):
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+async def _loop_jitter(predictor, seconds=2.0, period_ms=1.0, history_size=20):
+    # a 1 kHz "sensor" task next to a stream of predictions: how late does it wake?
+    lateness = []
+    stop = time.perf_counter() + seconds
+
+    async def sensor():
+        next_tick = time.perf_counter()
+        while time.perf_counter() < stop:
+            next_tick += period_ms / 1e3
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+            lateness.append((time.perf_counter() - next_tick) * 1e3)
+
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((history_size, 7)).astype(np.float32)
+    f = rng.standard_normal((history_size, 4)).astype(np.float32)
+
+    async def controller():
+        count = 0
+        while time.perf_counter() < stop:
+            await predictor.predict(x, f)
+            count += 1
+        return count
+
+    _, predictions = await asyncio.gather(sensor(), controller())
+    return {'predictions_per_s': predictions / seconds,
+            'sensor_late_p50_ms': float(np.percentile(lateness, 50)),
+            'sensor_late_p99_ms': float(np.percentile(lateness, 99))}
+
+
+if __name__ == '__main__':
+    from tee_kinematics.benchmark import ENGINES
+
+    parser = argparse.ArgumentParser(
+        description='Sensor-loop lateness while predictions run through AsyncPredictor.')
+    parser.add_argument('model')
+    parser.add_argument('--engine', choices=[e for e in ENGINES if e != 'streaming'], default='numpy')
+    parser.add_argument('--process', action='store_true', help='run the model in a worker process')
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    async def main():
+        async with AsyncPredictor.from_engine(args.model, args.engine, process=args.process) as p:
+            await p.predict(np.zeros((20, 7), np.float32), np.zeros((20, 4), np.float32))
+            report = await _loop_jitter(p, args.seconds)
+        print(f"{report['predictions_per_s']:.0f} predictions/s, 1 kHz sensor task late by "
+              f"p50 {report['sensor_late_p50_ms']:.3f} ms / p99 {report['sensor_late_p99_ms']:.3f} ms")
+
+    asyncio.run(main())
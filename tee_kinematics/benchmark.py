@@ -0,0 +1,355 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Inference latency benchmark
+#
+# Loads a model through one of the engines below, runs warm-up calls, then
+# times single calls per batch size and reports p50 / p90 / p99 / max latency
+# and throughput. Results go to JSON / CSV and can be compared against a
+# stored baseline to catch regressions.
+#
+#   keras       tf.keras.models.load_model(...).predict_on_batch  (.h5 / .keras)
+#   savedmodel  tf.saved_model.load(dir).signatures['serving_default']
+#   tflite      TFLite interpreter (tflite_runtime if installed, else tf.lite)
+#   onnx        onnxruntime InferenceSession
+#   numpy       tee_kinematics.numpy_runtime.NumpyCombinedModel on the .h5 weights
+#   folded      NumpyCombinedModel on the folded weights (tee_kinematics.fold)
+#   streaming   StreamingPredictor.step, one sample per call (batch 1 only)
+#
+# Thread counts are applied per run in a fresh subprocess, because TensorFlow
+# and the BLAS libraries fix their thread pools when first used.
+#
+#   python -m tee_kinematics.benchmark Original_1/smrs_v2_2041.h5 --engine numpy \
+#       --threads 1 2 4 --json bench.json --baseline baseline.json
+# -----------------------------------------------------------------------------
+
+# "Real-time inference in 1.8 ms" (README / paper), single window
+README_LATENCY_MS = 1.8
+
+BATCH_SIZES = (1, 4, 16, 64, 256, 1024, 4096)
+ENGINES = ('keras', 'savedmodel', 'tflite', 'onnx', 'numpy', 'folded', 'streaming')
+CSV_FIELDS = ('engine', 'model', 'threads', 'batch', 'calls',
+              'p50_ms', 'p90_ms', 'p99_ms', 'max_ms', 'mean_ms', 'windows_per_s')
+THREAD_ENV = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+Engine = namedtuple('Engine', ['name', 'predict', 'max_batch'])
+
+
+def split_inputs_by_width(specs, width_of, x_width=7):
+    """
+    Tell the two model inputs apart by their last dimension (7 pose vs 4 motor).
+
+    Args:
+      specs     the two input descriptions of a runtime (TFLite input details,
+                ONNX session inputs, SavedModel signature specs, ...)
+      width_of  callable spec → last dimension
+      x_width   last dimension of the pose input
+
+    Returns:
+      (pose spec, motor spec)
+    """
+    x_spec = next(s for s in specs if width_of(s) == x_width)
+    f_spec = next(s for s in specs if s is not x_spec)
+    return x_spec, f_spec
+
+
+def _set_tf_threads(threads):
+    import tensorflow as tf
+
+    if threads:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    return tf
+
+
+def _keras_engine(path, threads):
+    tf = _set_tf_threads(threads)
+    model = tf.keras.models.load_model(path, compile=False)
+    return Engine('keras', lambda x, f: model.predict_on_batch([x, f]), None)
+
+
+def _savedmodel_engine(path, threads):
+    tf = _set_tf_threads(threads)
+    serve = tf.saved_model.load(path).signatures['serving_default']
+    specs = serve.structured_input_signature[1]
+    x_name, f_name = split_inputs_by_width(list(specs), lambda name: specs[name].shape[-1], 7)
+
+    def predict(x, f):
+        out = serve(**{x_name: tf.constant(x), f_name: tf.constant(f)})
+        return next(iter(out.values())).numpy()
+
+    return Engine('savedmodel', predict, None)
+
+
+def _tflite_engine(path, threads):
+    from tee_kinematics.tflite_export import TFLiteModel
+
+    model = TFLiteModel(path, threads)
+    return Engine('tflite', lambda x, f: model.predict_on_batch([x, f]), None)
+
+
+def _onnx_engine(path, threads):
+    from tee_kinematics.onnx_export import OnnxModel
+
+    model = OnnxModel(path, threads)
+    return Engine('onnx', lambda x, f: model.predict_on_batch([x, f]), None)
+
+
+def _numpy_engine(path, threads, folded=False):
+    from tee_kinematics.fold import fold_dense
+    from tee_kinematics.numpy_runtime import NumpyCombinedModel
+    from tee_kinematics.weights import load_h5
+
+    weights = load_h5(path)
+    if folded:
+        weights = fold_dense(weights)
+    model = NumpyCombinedModel(weights)
+    return Engine('folded' if folded else 'numpy', model.predict, None)
+
+
+def _streaming_engine(path, threads):
+    from tee_kinematics.streaming import StreamingPredictor
+
+    stream = StreamingPredictor(path)
+    # fill the window first, so every timed tick produces a prediction
+    for _ in range(stream.history_size):
+        stream.step(np.zeros(7), np.zeros(4))
+
+    def predict(x, f):
+        # one control tick: the newest sample of the window
+        return stream.step(x[0, -1], f[0, -1])
+
+    return Engine('streaming', predict, 1)
+
+
+def load_engine(path, engine='keras', threads=None):
+    """
+    Load `path` for benchmarking.
+
+    Returns:
+      Engine(name, predict(x, f) → (B, 7), max_batch or None)
+    """
+    loaders = {
+        'keras': _keras_engine,
+        'savedmodel': _savedmodel_engine,
+        'tflite': _tflite_engine,
+        'onnx': _onnx_engine,
+        'numpy': _numpy_engine,
+        'folded': lambda p, t: _numpy_engine(p, t, folded=True),
+        'streaming': _streaming_engine,
+    }
+    if engine not in loaders:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {ENGINES}")
+    return loaders[engine](path, threads)
+
+
+def time_calls(predict, x, f, warmup=10, min_calls=20, max_calls=1000, budget_s=2.0):
+    """
+    Latencies (ms) of repeated predict(x, f) calls after `warmup` untimed calls.
+
+    Runs at least `min_calls` calls, then stops at `max_calls` or once
+    `budget_s` seconds have been spent.
+    """
+    for _ in range(warmup):
+        predict(x, f)
+    latencies = []
+    deadline = time.perf_counter() + budget_s
+    while len(latencies) < max_calls:
+        t0 = time.perf_counter_ns()
+        predict(x, f)
+        latencies.append(time.perf_counter_ns() - t0)
+        if len(latencies) >= min_calls and time.perf_counter() > deadline:
+            break
+    return np.asarray(latencies, dtype=np.float64) / 1e6
+
+
+def summarize(latencies_ms, batch):
+    p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+    mean = latencies_ms.mean()
+    return {
+        'batch': batch,
+        'calls': len(latencies_ms),
+        'p50_ms': float(p50),
+        'p90_ms': float(p90),
+        'p99_ms': float(p99),
+        'max_ms': float(latencies_ms.max()),
+        'mean_ms': float(mean),
+        'windows_per_s': float(batch / mean * 1e3),
+    }
+
+
+def run_benchmark(path, engine='keras', batch_sizes=BATCH_SIZES, threads=None, history_size=20,
+                  warmup=10, min_calls=20, max_calls=1000, budget_s=2.0, seed=0):
+    """
+    Benchmark one engine in this process.
+
+    Inputs are standard-normal windows (the model inputs are z-scored).
+
+    Returns:
+      list of result dicts, one per batch size
+    """
+    eng = load_engine(path, engine, threads)
+    rng = np.random.default_rng(seed)
+    results = []
+    for batch in batch_sizes:
+        if eng.max_batch is not None and batch > eng.max_batch:
+            continue
+        x = rng.standard_normal((batch, history_size, 7)).astype(np.float32)
+        f = rng.standard_normal((batch, history_size, 4)).astype(np.float32)
+        latencies = time_calls(eng.predict, x, f, warmup, min_calls, max_calls, budget_s)
+        result = {'engine': eng.name, 'model': os.path.basename(os.path.normpath(path)),
+                  'threads': threads or 0}
+        result.update(summarize(latencies, batch))
+        results.append(result)
+    return results
+
+
+def run_suite(path, engine='keras', batch_sizes=BATCH_SIZES, thread_counts=(None,), history_size=20,
+              warmup=10, min_calls=20, max_calls=1000, budget_s=2.0):
+    """
+    `run_benchmark` for every thread count, each in a fresh subprocess.
+
+    Returns:
+      list of result dicts over all thread counts and batch sizes
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for threads in thread_counts:
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+        if threads:
+            env.update({name: str(threads) for name in THREAD_ENV})
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'results.json')
+            cmd = [sys.executable, '-m', 'tee_kinematics.benchmark', path,
+                   '--engine', engine, '--batch', *map(str, batch_sizes),
+                   '--history', str(history_size), '--warmup', str(warmup),
+                   '--min-calls', str(min_calls), '--max-calls', str(max_calls),
+                   '--budget', str(budget_s), '--child-json', out]
+            if threads:
+                cmd += ['--threads', str(threads)]
+            subprocess.run(cmd, env=env, check=True)
+            with open(out) as fh:
+                results.extend(json.load(fh))
+    return results
+
+
+def metadata():
+    import numpy
+
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+    }
+
+
+def write_json(path, results):
+    with open(path, 'w') as fh:
+        json.dump({'meta': metadata(), 'results': results}, fh, indent=2)
+
+
+def write_csv(path, results):
+    with open(path, 'w', newline='') as fh:
+        writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def compare_baseline(results, baseline_path, tolerance=0.10, metric='p50_ms'):
+    """
+    Compare results against a JSON file written by `write_json`.
+
+    A row regresses when its `metric` exceeds the matching baseline row
+    (same engine / threads / batch) by more than `tolerance` (fractional).
+
+    Returns:
+      list of (result, baseline value, ratio) for the regressed rows
+    """
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)['results']
+    key = lambda r: (r['engine'], r['threads'], r['batch'])
+    base = {key(r): r for r in baseline}
+
+    regressions = []
+    for result in results:
+        ref = base.get(key(result))
+        if ref is None:
+            continue
+        ratio = result[metric] / ref[metric]
+        if ratio > 1.0 + tolerance:
+            regressions.append((result, ref[metric], ratio))
+    return regressions
+
+
+def print_table(results):
+    print(f"{'engine':>10} {'threads':>7} {'batch':>6} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9} {'windows/s':>11}")
+    for r in results:
+        print(f"{r['engine']:>10} {r['threads'] or '-':>7} {r['batch']:>6} {r['p50_ms']:9.3f} "
+              f"{r['p90_ms']:9.3f} {r['p99_ms']:9.3f} {r['max_ms']:9.3f} {r['windows_per_s']:11.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inference latency benchmark for the CombinedModel.')
+    parser.add_argument('model', help='.h5 / .keras / SavedModel dir / .tflite / .onnx')
+    parser.add_argument('--engine', choices=ENGINES, default='keras')
+    parser.add_argument('--batch', type=int, nargs='+', default=list(BATCH_SIZES))
+    parser.add_argument('--threads', type=int, nargs='+', default=None)
+    parser.add_argument('--history', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--min-calls', type=int, default=20)
+    parser.add_argument('--max-calls', type=int, default=1000)
+    parser.add_argument('--budget', type=float, default=2.0, help='seconds per batch size')
+    parser.add_argument('--json', default=None)
+    parser.add_argument('--csv', default=None)
+    parser.add_argument('--baseline', default=None, help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    parser.add_argument('--child-json', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    options = dict(history_size=args.history, warmup=args.warmup, min_calls=args.min_calls,
+                   max_calls=args.max_calls, budget_s=args.budget)
+    if args.child_json:
+        threads = args.threads[0] if args.threads else None
+        with open(args.child_json, 'w') as fh:
+            json.dump(run_benchmark(args.model, args.engine, args.batch, threads, **options), fh)
+        sys.exit(0)
+
+    if args.threads:
+        results = run_suite(args.model, args.engine, args.batch, args.threads, **options)
+    else:
+        results = run_benchmark(args.model, args.engine, args.batch, **options)
+    print_table(results)
+
+    single = [r for r in results if r['batch'] == 1]
+    if single:
+        best = min(r['p50_ms'] for r in single)
+        status = 'meets' if best <= README_LATENCY_MS else 'misses'
+        print(f"batch 1 p50 {best:.3f} ms {status} the {README_LATENCY_MS} ms README figure")
+
+    if args.json:
+        write_json(args.json, results)
+    if args.csv:
+        write_csv(args.csv, results)
+    if args.baseline:
+        regressions = compare_baseline(results, args.baseline, args.tolerance)
+        for result, ref, ratio in regressions:
+            print(f"REGRESSION {result['engine']} threads={result['threads']} batch={result['batch']}: "
+                  f"p50 {result['p50_ms']:.3f} ms vs baseline {ref:.3f} ms ({ratio:.2f}x)")
+        sys.exit(1 if regressions else 0)
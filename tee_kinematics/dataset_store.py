@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import scipy.io as spio
+
+# -----------------------------------------------------------------------------
+# Columnar store for the TEE_*_cellformat_Final.mat recordings
+#
+#   TEE_zero_cellformat_Final.mat  →  TEE_zero_cellformat_Final.store/
+#                                        posecell.npy    (T, 7)
+#                                        motorcell.npy   (T, 4)
+#                                        manifest.json
+#
+# The .npy files are opened memory-mapped, so slicing [start:end] is a view
+# into the page cache instead of a full MATLAB decode on every notebook run.
+# -----------------------------------------------------------------------------
+
+CELL_ARRAYS = ('posecell', 'motorcell')
+MANIFEST_NAME = 'manifest.json'
+STORE_SUFFIX = '.store'
+
+# Trim bounds used by the training notebooks for each configuration
+TRIM_BOUNDS = {
+    'TEE_zero_cellformat_Final.mat': (5000, 19000),
+    'TEE_45_cellformat_Final.mat':   (0, 14000),
+    'TEE_90_cellformat_Final.mat':   (2000, 16000),
+}
+
+
+def store_path_for(mat_path):
+    """Default store directory next to the .mat file."""
+    root, _ = os.path.splitext(mat_path)
+    return root + STORE_SUFFIX
+
+
+def _source_signature(mat_path):
+    st = os.stat(mat_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _trim_bounds(mat_path, start, end):
+    # requested bounds, or the notebook defaults when neither is given
+    if start is None and end is None:
+        start, end = TRIM_BOUNDS.get(os.path.basename(mat_path), (None, None))
+    return start, end
+
+
+def _write_manifest(store_dir, manifest):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def convert_cellformat(mat_path, store_dir=None, start=None, end=None, dtype=np.float64):
+    """
+    One-time conversion of a cellformat .mat file into contiguous .npy columns.
+
+    Args:
+      mat_path   path to TEE_*_cellformat_Final.mat (posecell / motorcell)
+      store_dir  output directory (None → <mat_path without .mat>.store)
+      start, end default trim bounds recorded in the manifest
+      dtype      on-disk float dtype of both arrays
+
+    Returns:
+      manifest dict (also written to <store_dir>/manifest.json)
+    """
+    if store_dir is None:
+        store_dir = store_path_for(mat_path)
+    start, end = _trim_bounds(mat_path, start, end)
+
+    mat = spio.loadmat(mat_path, squeeze_me=True)
+    os.makedirs(store_dir, exist_ok=True)
+
+    arrays = {}
+    samples = None
+    for name in CELL_ARRAYS:
+        arr = np.ascontiguousarray(mat[name], dtype=dtype)
+        if arr.ndim == 1:
+            arr = arr[:, None]
+        if samples is None:
+            samples = arr.shape[0]
+        elif arr.shape[0] != samples:
+            raise ValueError(f"{mat_path}: {name} has {arr.shape[0]} samples, expected {samples}")
+        np.save(os.path.join(store_dir, name + '.npy'), arr)
+        arrays[name] = {'shape': list(arr.shape), 'dtype': arr.dtype.str}
+
+    manifest = {
+        'source':  os.path.basename(mat_path),
+        'signature': _source_signature(mat_path),
+        'samples': samples,
+        'dtype':   np.dtype(dtype).str,
+        'trim':    [start, end],
+        'arrays':  arrays,
+    }
+    # write the manifest last so a half-written store is never picked up
+    _write_manifest(store_dir, manifest)
+    return manifest
+
+
+class CellStore:
+    """
+    Memory-mapped view of a converted cellformat recording.
+
+    ``store['posecell']`` returns the full (T, 7) memmap, so the notebook
+    idiom ``matx['posecell'][start:end]`` keeps working and is zero-copy.
+    ``store.trimmed(name)`` applies the trim bounds from the manifest.
+    """
+
+    def __init__(self, store_dir, mmap_mode='r'):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, MANIFEST_NAME)) as fh:
+            self.manifest = json.load(fh)
+        self._arrays = {}
+        for name in self.manifest['arrays']:
+            self._arrays[name] = np.load(os.path.join(store_dir, name + '.npy'),
+                                         mmap_mode=mmap_mode)
+
+    def __getitem__(self, name):
+        return self._arrays[name]
+
+    def __contains__(self, name):
+        return name in self._arrays
+
+    def keys(self):
+        return self._arrays.keys()
+
+    @property
+    def samples(self):
+        return self.manifest['samples']
+
+    @property
+    def trim(self):
+        start, end = self.manifest['trim']
+        return start, end
+
+    def trimmed(self, name, start=None, end=None):
+        """View of `name` sliced to the given (or manifest) trim bounds."""
+        if start is None and end is None:
+            start, end = self.trim
+        return self._arrays[name][start:end]
+
+
+def load_cellformat(store_dir, mmap_mode='r'):
+    """Open an existing store directory (see `convert_cellformat`)."""
+    return CellStore(store_dir, mmap_mode=mmap_mode)
+
+
+def _is_current(mat_path, store_dir):
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return False
+    if not os.path.exists(mat_path):
+        # store shipped without its source: trust it
+        return True
+    with open(manifest_path) as fh:
+        manifest = json.load(fh)
+    return manifest.get('signature') == _source_signature(mat_path)
+
+
+def open_cellformat(mat_path, start=None, end=None, store_dir=None, mmap_mode='r'):
+    """
+    Drop-in replacement for ``spio.loadmat(mat_path, squeeze_me=True)``.
+
+    Converts the .mat file on first use (or when it has changed since the
+    last conversion) and returns a memory-mapped `CellStore`. The arrays are
+    stored untrimmed, so when `start` / `end` differ from the trim recorded in
+    an existing store only its manifest is updated.
+    """
+    if store_dir is None:
+        store_dir = store_path_for(mat_path)
+    if not _is_current(mat_path, store_dir):
+        convert_cellformat(mat_path, store_dir, start=start, end=end)
+    else:
+        trim = list(_trim_bounds(mat_path, start, end))
+        with open(os.path.join(store_dir, MANIFEST_NAME)) as fh:
+            manifest = json.load(fh)
+        if manifest['trim'] != trim:
+            manifest['trim'] = trim
+            _write_manifest(store_dir, manifest)
+    return load_cellformat(store_dir, mmap_mode=mmap_mode)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Convert TEE_*_cellformat_Final.mat files into memory-mapped stores.')
+    parser.add_argument('mat_files', nargs='+')
+    parser.add_argument('--start', type=int, default=None)
+    parser.add_argument('--end', type=int, default=None)
+    args = parser.parse_args()
+
+    for path in args.mat_files:
+        info = convert_cellformat(path, start=args.start, end=args.end)
+        print(f"{path} → {store_path_for(path)}  samples={info['samples']}  trim={info['trim']}")
@@ -0,0 +1,198 @@
+import json
+import math
+import multiprocessing as mp
+import os
+import queue
+import socket
+import time
+
+# -----------------------------------------------------------------------------
+# Multi-process data-parallel CPU training
+#
+# N local worker processes form a tf.distribute.MultiWorkerMirroredStrategy
+# cluster over localhost and run a custom training step under strategy.run,
+# so gradients are all-reduced with ring collectives every step.
+# Every worker builds the same model, trains on its own shard of the window
+# index space (shard i keeps every N-th training window of each
+# configuration) and uses cores / N intra-op threads. Worker 0 saves the
+# weights and reports throughput.
+#
+# TensorFlow is imported inside the workers only, after TF_CONFIG and the
+# thread settings are in place.
+# -----------------------------------------------------------------------------
+
+
+def free_ports(n):
+    """Reserve `n` free TCP ports on localhost."""
+    socks, ports = [], []
+    for _ in range(n):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.bind(('localhost', 0))
+        socks.append(s)
+        ports.append(s.getsockname()[1])
+    for s in socks:
+        s.close()
+    return ports
+
+
+def _worker(rank, ports, model_fn, configs, epochs, history_size, target_size,
+            batch_size, weights, seed, threads, save_path, results):
+    os.environ['TF_CONFIG'] = json.dumps({
+        'cluster': {'worker': [f'localhost:{p}' for p in ports]},
+        'task': {'type': 'worker', 'index': rank},
+    })
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+
+    import tensorflow as tf
+    from tee_kinematics.input_pipeline import split_indices
+    from tee_kinematics.mixed_training import mixed_datasets
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(2)
+
+    options = tf.distribute.experimental.CommunicationOptions(
+        implementation=tf.distribute.experimental.CommunicationImplementation.RING)
+    strategy = tf.distribute.MultiWorkerMirroredStrategy(communication_options=options)
+    n_workers = strategy.num_replicas_in_sync
+    global_batch = batch_size * n_workers
+
+    n_train = sum(len(split_indices(len(cfg['x']), cfg['train_end'], cfg['val_end'],
+                                    history_size, target_size)['train'])
+                  for cfg in configs.values())
+    steps = math.ceil(n_train / global_batch)
+
+    def dataset_fn(ctx):
+        train, _, _, _ = mixed_datasets(configs, history_size, target_size,
+                                        ctx.get_per_replica_batch_size(global_batch),
+                                        weights, seed,
+                                        shard=(ctx.input_pipeline_id, ctx.num_input_pipelines))
+        return train
+
+    with strategy.scope():
+        model = model_fn()
+        model.optimizer.build(model.trainable_variables)
+    train = iter(strategy.distribute_datasets_from_function(dataset_fn))
+
+    @tf.function
+    def train_step(iterator):
+        def step_fn(inputs):
+            (x, f), y = inputs
+            with tf.GradientTape() as tape:
+                pred = model([x, f], training=True)
+                # MAE, averaged over the global batch so the all-reduced sum is the mean
+                per_window = tf.reduce_mean(tf.abs(y - pred), axis=-1)
+                loss = tf.nn.compute_average_loss(per_window, global_batch_size=global_batch)
+            grads = tape.gradient(loss, model.trainable_variables)
+            model.optimizer.apply_gradients(zip(grads, model.trainable_variables))
+            return loss
+
+        per_replica = strategy.run(step_fn, args=(next(iterator),))
+        return strategy.reduce(tf.distribute.ReduceOp.SUM, per_replica, axis=None)
+
+    def run_epoch():
+        total = 0.0
+        for _ in range(steps):
+            total += float(train_step(train))
+        return total / steps
+
+    # first epoch includes graph tracing and collective setup; time the rest separately
+    losses = []
+    t0 = time.perf_counter()
+    losses.append(run_epoch())
+    t1 = time.perf_counter()
+    for epoch in range(1, epochs):
+        losses.append(run_epoch())
+        if rank == 0:
+            print(f"epoch {epoch + 1}/{epochs}  loss: {losses[-1]:.4f}")
+    t2 = time.perf_counter()
+
+    if rank == 0:
+        if save_path:
+            model.save_weights(save_path)
+        timed_epochs = max(epochs - 1, 0)
+        results.put({
+            'workers': n_workers,
+            'global_batch': global_batch,
+            'steps_per_epoch': steps,
+            'first_epoch_s': t1 - t0,
+            'epoch_s': (t2 - t1) / timed_epochs if timed_epochs else t1 - t0,
+            'windows_per_s': (steps * global_batch * timed_epochs / (t2 - t1)) if timed_epochs
+                             else steps * global_batch / (t1 - t0),
+            'loss': losses,
+        })
+
+
+def train_data_parallel(model_fn, configs, n_workers, epochs, history_size, target_size=0,
+                        batch_size=32, weights=None, seed=None, threads=None, save_path=None):
+    """
+    Train `model_fn()` with `n_workers` local data-parallel processes.
+
+    Args:
+      model_fn      top-level (picklable) function returning a compiled model,
+                    e.g. tee_kinematics.model.build_combined_model
+      configs       dict name → dict(x=, f=, train_end=, val_end=), as in `fit_mixed`
+      n_workers     number of worker processes
+      epochs        epochs over the mixed stream (at least 2 for a timed epoch)
+      batch_size    per-worker batch; the global batch is batch_size × n_workers
+      threads       intra-op threads per worker (None → cores // n_workers)
+      save_path     where worker 0 saves the trained weights (.weights.h5)
+
+    Returns:
+      dict with throughput (windows_per_s), per-epoch time and losses
+    """
+    threads = threads or max(1, (os.cpu_count() or 1) // n_workers)
+    ports = free_ports(n_workers)
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+
+    procs = [ctx.Process(target=_worker,
+                         args=(rank, ports, model_fn, configs, epochs, history_size, target_size,
+                               batch_size, weights, seed, threads, save_path, results))
+             for rank in range(n_workers)]
+    for p in procs:
+        p.start()
+
+    report = None
+    while report is None:
+        try:
+            report = results.get(timeout=1.0)
+        except queue.Empty:
+            # a dead worker leaves the others blocked in collectives: stop them
+            if any(p.exitcode for p in procs) or not any(p.is_alive() for p in procs):
+                break
+    if report is None:
+        for p in procs:
+            p.terminate()
+    for p in procs:
+        p.join()
+
+    failed = [p.exitcode for p in procs if p.exitcode]
+    if failed or report is None:
+        raise RuntimeError(f"data-parallel training failed, worker exit codes {failed}")
+    return report
+
+
+def scaling_benchmark(model_fn, configs, worker_counts, epochs, history_size, target_size=0,
+                      batch_size=32, seed=None):
+    """
+    Run `train_data_parallel` for each worker count and report scaling efficiency.
+
+    Efficiency is throughput(N) / (N × throughput(1 worker)), measured on the
+    epochs after the first.
+
+    Returns:
+      list of report dicts with an added 'efficiency' key
+    """
+    reports = []
+    base = None
+    for n in worker_counts:
+        report = train_data_parallel(model_fn, configs, n, epochs, history_size, target_size,
+                                     batch_size, seed=seed)
+        if base is None:
+            base = report['windows_per_s'] / report['workers']
+        report['efficiency'] = report['windows_per_s'] / (report['workers'] * base)
+        reports.append(report)
+        print(f"workers={report['workers']:>3}  windows/s={report['windows_per_s']:10.1f}  "
+              f"epoch={report['epoch_s']:7.2f}s  efficiency={report['efficiency']:.2f}")
+    return reports
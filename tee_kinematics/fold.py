@@ -0,0 +1,127 @@
+import argparse
+
+import numpy as np
+
+from tee_kinematics.numpy_runtime import NumpyCombinedModel
+from tee_kinematics.weights import load_h5
+
+# -----------------------------------------------------------------------------
+# Folding the activation-free Dense chains
+#
+# None of the Dense layers in create_lstm / create_c1dnn / the head has an
+# activation, so each chain is one affine map:
+#
+#   x W1 + b1 → (x W1 + b1) W2 + b2 = x (W1 W2) + (b1 W2 + b2)
+#
+#   LSTM branch   Dense(256) → Dense(64) → Dense(7)   →  one (256, 7) Dense
+#   Dense branch  Dense(256) → Dense(32) → Dense(4)   →  one (4, 4) Dense per timestep
+#   head          Concatenate → Dense(14) → Dense(7)  →  one (87, 7) Dense
+#
+# The products are formed in float64 and cast back to the model dtype. The
+# folded weights keep the CombinedWeights structure (single-layer chains), so
+# NumpyCombinedModel / StreamingPredictor run them unchanged, and
+# `tee_kinematics.model.build_folded_model` turns them back into a Keras model.
+# -----------------------------------------------------------------------------
+
+
+def fold_chain(layers):
+    """
+    Collapse consecutive linear Dense layers [(W, b), ...] into one (W, b), in float64.
+    """
+    w, b = (np.asarray(a, dtype=np.float64) for a in layers[0])
+    for wi, bi in layers[1:]:
+        wi = np.asarray(wi, dtype=np.float64)
+        w = w @ wi
+        b = b @ wi + bi
+    return w, b
+
+
+def fold_dense(weights):
+    """
+    CombinedWeights with every Dense chain folded into a single layer.
+    """
+    dtype = weights.lstm[0].dtype
+
+    def fold(layers):
+        w, b = fold_chain(layers)
+        return [(w.astype(dtype), b.astype(dtype))]
+
+    return weights._replace(lstm_dense=fold(weights.lstm_dense),
+                            motor_dense=fold(weights.motor_dense),
+                            head=fold(weights.head))
+
+
+def dense_macs(weights, history_size=20):
+    """Multiply-accumulates per window spent in the Dense layers (the LSTM excluded)."""
+    lstm = sum(w.size for w, _ in weights.lstm_dense)
+    motor = history_size * sum(w.size for w, _ in weights.motor_dense)
+    head = sum(w.size for w, _ in weights.head)
+    return lstm + motor + head
+
+
+def check_folded(weights, folded, x=None, f=None, history_size=20, count=4096, seed=0):
+    """
+    Compare the original and folded weights on the same windows.
+
+    Without (x, f), `count` standard-normal windows are used (the model inputs
+    are z-scored, so this covers the input range).
+
+    Returns:
+      dict with max_abs_err / mean_abs_err and the Dense MACs before / after
+    """
+    if x is None or f is None:
+        rng = np.random.default_rng(seed)
+        d_x = weights.lstm[0].shape[0]
+        d_f = weights.motor_dense[0][0].shape[0]
+        x = rng.standard_normal((count, history_size, d_x))
+        f = rng.standard_normal((count, history_size, d_f))
+    history_size = x.shape[1]
+
+    expected = NumpyCombinedModel(weights, history_size).predict(x, f)
+    got = NumpyCombinedModel(folded, history_size).predict(x, f)
+    err = np.abs(got - expected)
+    return {
+        'max_abs_err': float(err.max()),
+        'mean_abs_err': float(err.mean()),
+        'dense_macs': dense_macs(weights, history_size),
+        'folded_dense_macs': dense_macs(folded, history_size),
+    }
+
+
+def export_folded(h5_path, out_path, x=None, f=None, history_size=20, atol=1e-4):
+    """
+    Fold a saved CombinedModel, verify it, and save the folded Keras model.
+
+    Args:
+      h5_path   model saved with model.save('...h5')
+      out_path  where to save the folded model (.h5 or .keras)
+      x, f      windows to verify on (None → random windows)
+      atol      largest accepted absolute output difference
+
+    Returns:
+      report dict from `check_folded`
+    """
+    from tee_kinematics.model import build_folded_model
+
+    weights = load_h5(h5_path)
+    folded = fold_dense(weights)
+    report = check_folded(weights, folded, x, f, history_size)
+    if report['max_abs_err'] > atol:
+        raise ValueError(f"folded model differs by {report['max_abs_err']:.3g} > atol={atol}")
+
+    build_folded_model(folded, history_size).save(out_path)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Fold the linear Dense chains of a saved CombinedModel into single layers.')
+    parser.add_argument('h5_path')
+    parser.add_argument('out_path')
+    parser.add_argument('--history', type=int, default=20)
+    parser.add_argument('--atol', type=float, default=1e-4)
+    args = parser.parse_args()
+
+    report = export_folded(args.h5_path, args.out_path, history_size=args.history, atol=args.atol)
+    print(f"{args.h5_path} → {args.out_path}  max_abs_err={report['max_abs_err']:.3g}  "
+          f"dense MACs {report['dense_macs']} → {report['folded_dense_macs']}")
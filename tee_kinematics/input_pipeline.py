@@ -0,0 +1,95 @@
+import numpy as np
+import tensorflow as tf
+
+from tee_kinematics.windowing import split_bounds, window_bounds
+
+# -----------------------------------------------------------------------------
+# Streaming tf.data input pipeline
+#
+# Only the contiguous (T, 7) pose and (T, 4) motor series are held (once, as
+# float32 tensors). Each batch is a vector of label indices; the map step
+# gathers the (B, history, D) windows for it, so shuffling moves indices
+# instead of window tensors and the gather runs in parallel with training.
+# -----------------------------------------------------------------------------
+
+
+def split_indices(n_samples, train_end, val_end, history_size, target_size):
+    """
+    Label indices of the train / val / test splits.
+
+    Same windows as `joint_windows`: index i has inputs [i-target-history, i-target)
+    and label dataset[i].
+    """
+    indices = {}
+    for name, (start_index, end_index) in split_bounds(train_end, val_end).items():
+        start, stop = window_bounds(n_samples, start_index, end_index, history_size, target_size)
+        indices[name] = np.arange(start + target_size, stop + target_size, dtype=np.int64)
+    return indices
+
+
+def window_gather(series_x, series_f, history_size, target_size=0, labels=True):
+    """
+    Map function turning a (B,) batch of label indices into window tensors.
+
+    Returns:
+      fn(idx) → ((x, f), y), or (x, f) when labels is False
+    """
+    series_x = tf.convert_to_tensor(series_x, dtype=tf.float32)
+    series_f = tf.convert_to_tensor(series_f, dtype=tf.float32)
+    offsets = tf.range(-history_size - target_size, -target_size, dtype=tf.int64)
+
+    def gather(idx):
+        rows = idx[:, None] + offsets[None, :]              # (B, history)
+        x = tf.gather(series_x, rows)                        # (B, history, D_x)
+        f = tf.gather(series_f, rows)                        # (B, history, D_f)
+        if labels:
+            return (x, f), tf.gather(series_x, idx)          # (B, D_x)
+        return (x, f)
+
+    return gather
+
+
+def window_dataset(series_x, series_f, index, history_size, target_size=0,
+                   batch_size=256, shuffle=False, seed=None, labels=True):
+    """
+    tf.data.Dataset of ((x, f), y) batches gathered from the series on the fly.
+
+    Args:
+      series_x      pose series (T, D_x), array or tf.Tensor
+      series_f      motor series (T, D_f), array or tf.Tensor
+      index         label indices of the windows to serve (see `split_indices`)
+      history_size  number of past steps in each input
+      target_size   steps between the last input and the label
+      batch_size    windows per batch
+      shuffle       reshuffle the indices every epoch
+      seed          shuffle seed
+      labels        yield ((x, f), y); False → (x, f) only, for model.predict
+
+    Returns:
+      tf.data.Dataset, prefetched
+    """
+    ds = tf.data.Dataset.from_tensor_slices(np.asarray(index, dtype=np.int64))
+    if shuffle:
+        ds = ds.shuffle(len(index), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = ds.map(window_gather(series_x, series_f, history_size, target_size, labels),
+                num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def split_datasets(series_x, series_f, train_end, val_end, history_size, target_size=0,
+                   batch_size=256, seed=None):
+    """
+    Train (shuffled) / val / test datasets for one configuration.
+
+    Returns:
+      dict 'train' / 'val' / 'test' → tf.data.Dataset
+    """
+    series_x = tf.convert_to_tensor(series_x, dtype=tf.float32)
+    series_f = tf.convert_to_tensor(series_f, dtype=tf.float32)
+    indices = split_indices(int(series_x.shape[0]), train_end, val_end, history_size, target_size)
+    return {
+        name: window_dataset(series_x, series_f, idx, history_size, target_size,
+                             batch_size=batch_size, shuffle=(name == 'train'), seed=seed)
+        for name, idx in indices.items()
+    }
@@ -0,0 +1,190 @@
+import argparse
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Position and orientation metrics of all splits in one pass
+#
+# Input is the measured and predicted (N, 7) poses [x y z qx qy qz qw] of a
+# configuration, rows ordered by split (train + val + test, as in the
+# notebook export cells and the prediction bundle), plus the split bounds.
+# Per row, one float64 matrix holds
+#
+#   |e|, e²                 e = predicted − measured position (3 columns each)
+#   t − c, (t − c)²         measured position about its overall mean c (R²)
+#   angle, angle²           quaternion geodesic angle 2·arccos(|q_t · q_p|) in
+#                           degrees, computed from dot products and norms
+#                           without normalizing (or copying) the quaternions
+#
+# and a single np.add.reduceat over the split boundaries sums it per split.
+# The position metrics match sklearn's mean_absolute_error /
+# mean_squared_error / r2_score on the (n, 3) arrays (uniform average over
+# the axes), the angle metrics the notebooks' mean / RMS angle error.
+# -----------------------------------------------------------------------------
+
+AXES = ('x', 'y', 'z')
+SPLIT_LABELS = {'train': 'Train', 'val': 'Validation', 'test': 'Test'}
+POSITION_COLUMNS = ['MAE', 'MSE', 'RMSE', 'R²']
+ANGLE_COLUMNS = ['Mean Angle Error (deg)', 'RMSE Angle Error (deg)']
+AXIS_COLUMNS = [f'{m} {a}' for m in ('MAE', 'RMSE', 'R²') for a in AXES]
+
+
+def quaternion_angle_deg(q_true, q_pred):
+    """
+    Geodesic angle between quaternions (..., 4) in degrees, 2·arccos(|q̂_t · q̂_p|).
+
+    The inputs need not be unit length and are not modified.
+    """
+    dot = np.einsum('...i,...i->...', q_true, q_pred, dtype=np.float64)
+    norm = np.einsum('...i,...i->...', q_true, q_true, dtype=np.float64)
+    norm *= np.einsum('...i,...i->...', q_pred, q_pred, dtype=np.float64)
+    np.sqrt(norm, out=norm)
+    cos = np.abs(dot, out=dot)
+    cos /= norm
+    np.clip(cos, 0, 1, out=cos)
+    return np.degrees(2 * np.arccos(cos, out=cos))
+
+
+def position_rms_error(p_true, p_pred):
+    """Per-sample RMS over x, y, z of the position error (..., 3): sqrt(|e|² / 3)."""
+    err = np.subtract(p_pred, p_true, dtype=np.float64)
+    return np.sqrt(np.einsum('...i,...i->...', err, err) / err.shape[-1])
+
+
+def split_bounds(splits, samples):
+    """
+    Normalize split definitions to name → (start, stop).
+
+    Args:
+      splits   None (one split 'all'), dict name → (start, stop), or dict
+               name → size with the splits stored one after another
+      samples  number of rows
+    """
+    if splits is None:
+        return {'all': (0, samples)}
+    bounds, start = {}, 0
+    for name, value in splits.items():
+        if np.ndim(value) == 0:
+            bounds[name] = (start, start + int(value))
+        else:
+            bounds[name] = (int(value[0]), int(value[1]))
+        start = bounds[name][1]
+        if not 0 <= bounds[name][0] <= bounds[name][1] <= samples:
+            raise ValueError(f"split {name!r} {bounds[name]} outside the {samples} rows")
+    return bounds
+
+
+def _split_sums(values, bounds, samples):
+    # (splits, columns) sums of values over each [start, stop), from one
+    # reduceat over all split boundaries
+    points = sorted({0, *(b for pair in bounds for b in pair)} - {samples})
+    if points:
+        sums = np.add.reduceat(values, points, axis=0)
+    else:
+        sums = np.zeros((0, values.shape[1]))
+    segment = {p: k for k, p in enumerate(points)}
+    segment[samples] = len(points)
+    return np.stack([sums[segment[start]:segment[stop]].sum(axis=0) for start, stop in bounds])
+
+
+def metric_row(config, split, n, mae, mse, r2, angle_mean, angle_rms):
+    """
+    One table row from per-axis (3,) MAE / MSE / R² and the angle statistics;
+    overall MAE / MSE / R² are the uniform average over the axes.
+    """
+    row = {'config': config, 'split': SPLIT_LABELS.get(split, split), 'n': int(n),
+           'MAE': np.mean(mae), 'MSE': np.mean(mse), 'RMSE': np.sqrt(np.mean(mse)), 'R²': np.mean(r2)}
+    for a, axis in enumerate(AXES):
+        row[f'MAE {axis}'] = mae[a]
+        row[f'RMSE {axis}'] = np.sqrt(mse[a])
+        row[f'R² {axis}'] = r2[a]
+    row['Mean Angle Error (deg)'] = angle_mean
+    row['RMSE Angle Error (deg)'] = angle_rms
+    return {key: (float(v) if isinstance(v, np.floating) else v) for key, v in row.items()}
+
+
+def evaluate(measured, predicted, splits=None, config=None):
+    """
+    Metrics of every split of one configuration.
+
+    Args:
+      measured, predicted  (N, 7) poses (any float dtype, views are fine)
+      splits               see `split_bounds`; e.g. {'train': n_train, 'val': n_val, 'test': n_test}
+                           or ConfigResults.splits of a prediction bundle
+      config               configuration name stored in each row
+
+    Returns:
+      list of rows, one per split: dict config, split, n, MAE, MSE, RMSE,
+      R², per-axis 'MAE x' ... 'R² z', 'Mean Angle Error (deg)' and
+      'RMSE Angle Error (deg)'. Split names train / val / test are shown as
+      Train / Validation / Test.
+    """
+    samples = len(measured)
+    bounds = split_bounds(splits, samples)
+    t, p = measured[:, :3], predicted[:, :3]
+
+    per_row = np.empty((samples, 14))
+    err = np.subtract(p, t, out=per_row[:, 3:6])
+    np.abs(err, out=per_row[:, 0:3])
+    np.square(err, out=per_row[:, 3:6])
+    centered = np.subtract(t, np.mean(t, axis=0, dtype=np.float64), out=per_row[:, 6:9])
+    np.square(centered, out=per_row[:, 9:12])
+    per_row[:, 12] = quaternion_angle_deg(measured[:, 3:7], predicted[:, 3:7])
+    np.square(per_row[:, 12], out=per_row[:, 13])
+
+    sums = _split_sums(per_row, list(bounds.values()), samples)
+    n = np.array([stop - start for start, stop in bounds.values()], dtype=np.float64)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mae = sums[:, 0:3] / n
+        mse = sums[:, 3:6] / n
+        ss_res = sums[:, 3:6]
+        ss_tot = sums[:, 9:12] - sums[:, 6:9] ** 2 / n
+        r2 = 1 - ss_res / ss_tot
+        # sklearn: a constant target scores 1 if predicted exactly, else 0
+        r2 = np.where(ss_tot > 0, r2, np.where(ss_res == 0, 1.0, 0.0))
+        r2[n[:, 0] == 0] = np.nan
+        angle_mean = sums[:, 12] / n[:, 0]
+        angle_rms = np.sqrt(sums[:, 13] / n[:, 0])
+
+    return [metric_row(config, name, n[k, 0], mae[k], mse[k], r2[k], angle_mean[k], angle_rms[k])
+            for k, name in enumerate(bounds)]
+
+
+def evaluate_bundle(bundle, names=None):
+    """Rows of `evaluate` for every configuration (or `names`) of a prediction bundle."""
+    from tee_kinematics.prediction_bundle import PredictionBundle, open_bundle
+
+    if not isinstance(bundle, PredictionBundle):
+        bundle = open_bundle(bundle)
+    rows = []
+    for name in names or list(bundle):
+        run = bundle[name]
+        rows.extend(evaluate(run.measured, run.predicted, run.splits, config=name))
+    return rows
+
+
+def to_frame(rows):
+    """
+    pandas DataFrame of metric rows, indexed by split (and config when set).
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame(rows)
+    if frame['config'].isna().all():
+        return frame.drop(columns='config').set_index('split')
+    return frame.set_index(['config', 'split'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Metrics table of every configuration in a prediction bundle.')
+    parser.add_argument('bundle')
+    parser.add_argument('--names', nargs='*', default=None)
+    parser.add_argument('--axes', action='store_true', help='add the per-axis MAE / RMSE / R² columns')
+    parser.add_argument('--csv', default=None)
+    args = parser.parse_args()
+
+    frame = to_frame(evaluate_bundle(args.bundle, args.names))
+    columns = POSITION_COLUMNS + (AXIS_COLUMNS if args.axes else []) + ANGLE_COLUMNS
+    print(frame[columns].to_string(float_format='%.4f'))
+    if args.csv:
+        frame.to_csv(args.csv)
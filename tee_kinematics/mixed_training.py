@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+import tensorflow as tf
+
+from tee_kinematics.input_pipeline import split_indices, window_dataset, window_gather
+
+# -----------------------------------------------------------------------------
+# Interleaved multi-configuration training
+#
+# Instead of NUM_CYCLES × 3 separate model.fit calls (Zero, 45°, 90°, each with
+# EPOCHS=1), one model.fit runs over a sampler that draws every batch from a
+# weighted mix of the configurations. The series of all configurations are
+# concatenated once and each configuration's indices are offset into it, so
+# windows never straddle two recordings and one vectorized gather serves all.
+# -----------------------------------------------------------------------------
+
+
+def concat_configs(configs):
+    """
+    Stack the series of several configurations end to end.
+
+    Args:
+      configs  dict name → dict(x=(T, D_x), f=(T, D_f), train_end=, val_end=)
+
+    Returns:
+      series_x, series_f  concatenated series
+      offsets             dict name → row offset of that configuration
+    """
+    offsets, row = {}, 0
+    for name, cfg in configs.items():
+        offsets[name] = row
+        row += len(cfg['x'])
+    series_x = np.concatenate([np.asarray(cfg['x'], dtype=np.float32) for cfg in configs.values()])
+    series_f = np.concatenate([np.asarray(cfg['f'], dtype=np.float32) for cfg in configs.values()])
+    return series_x, series_f, offsets
+
+
+def mixed_datasets(configs, history_size, target_size=0, batch_size=32, weights=None, seed=None,
+                   shard=None):
+    """
+    Mixed training stream plus per-configuration validation/test datasets.
+
+    Args:
+      configs       dict name → dict(x=, f=, train_end=, val_end=)
+      history_size  number of past steps in each input
+      target_size   steps between the last input and the label
+      batch_size    windows per batch
+      weights       dict name → mixing weight (None → equal weights)
+      seed          sampling / shuffle seed
+      shard         (shard_index, num_shards) → keep every num_shards-th training
+                    window, for data-parallel workers
+
+    Returns:
+      train           infinite tf.data.Dataset of mixed ((x, f), y) batches
+      steps_per_epoch batches that cover every training window once on average
+      val, test       dict name → tf.data.Dataset
+    """
+    series_x, series_f, offsets = concat_configs(configs)
+    series_x = tf.constant(series_x)
+    series_f = tf.constant(series_f)
+
+    names = list(configs)
+    if weights is None:
+        weights = {name: 1.0 for name in names}
+    total = float(sum(weights[name] for name in names))
+
+    train_parts, val, test = [], {}, {}
+    n_train = 0
+    for name in names:
+        cfg = configs[name]
+        idx = split_indices(len(cfg['x']), cfg['train_end'], cfg['val_end'],
+                            history_size, target_size)
+        idx = {split: i + offsets[name] for split, i in idx.items()}
+        if shard is not None:
+            idx['train'] = idx['train'][shard[0]::shard[1]]
+        n_train += len(idx['train'])
+        train_parts.append(tf.data.Dataset.from_tensor_slices(idx['train'])
+                           .shuffle(len(idx['train']), seed=seed, reshuffle_each_iteration=True)
+                           .repeat())
+        val[name] = window_dataset(series_x, series_f, idx['val'], history_size, target_size,
+                                   batch_size=batch_size)
+        test[name] = window_dataset(series_x, series_f, idx['test'], history_size, target_size,
+                                    batch_size=batch_size)
+
+    train = tf.data.Dataset.sample_from_datasets(
+        train_parts, weights=[weights[name] / total for name in names], seed=seed)
+    train = (train.batch(batch_size)
+                  .map(window_gather(series_x, series_f, history_size, target_size),
+                       num_parallel_calls=tf.data.AUTOTUNE)
+                  .prefetch(tf.data.AUTOTUNE))
+    return train, math.ceil(n_train / batch_size), val, test
+
+
+class PerConfigValidation(tf.keras.callbacks.Callback):
+    """
+    Evaluate every configuration's validation split at the end of an epoch.
+
+    Adds val_loss_<name> for each configuration and val_loss (weighted by the
+    number of validation batches) to the epoch logs, so History / EarlyStopping /
+    ModelCheckpoint can use them.
+    """
+
+    def __init__(self, val_datasets, freq=1):
+        super().__init__()
+        self.val_datasets = val_datasets
+        self.freq = freq
+        self.sizes = {name: int(ds.cardinality()) for name, ds in val_datasets.items()}
+
+    def on_epoch_end(self, epoch, logs=None):
+        if logs is None or (epoch + 1) % self.freq:
+            return
+        weighted, count = 0.0, 0
+        for name, ds in self.val_datasets.items():
+            result = self.model.evaluate(ds, verbose=0, return_dict=True)
+            for key, value in result.items():
+                logs[f'val_{key}_{name}'] = value
+            weighted += result['loss'] * self.sizes[name]
+            count += self.sizes[name]
+        logs['val_loss'] = weighted / max(count, 1)
+
+
+def fit_mixed(model, configs, epochs, history_size, target_size=0, batch_size=32,
+              weights=None, seed=None, callbacks=None, verbose=1):
+    """
+    One model.fit over all configurations with per-configuration validation.
+
+    `epochs` plays the role of NUM_CYCLES: each epoch runs as many gradient
+    steps as one pass over every configuration's training windows.
+
+    Returns:
+      history  keras History (with val_loss_<name> per configuration)
+      test     dict name → test tf.data.Dataset, for model.evaluate
+    """
+    train, steps, val, test = mixed_datasets(configs, history_size, target_size,
+                                             batch_size, weights, seed)
+    callbacks = [PerConfigValidation(val)] + list(callbacks or [])
+    history = model.fit(train, epochs=epochs, steps_per_epoch=steps,
+                        callbacks=callbacks, verbose=verbose)
+    return history, test
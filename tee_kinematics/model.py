@@ -0,0 +1,97 @@
+import tensorflow as tf
+from tensorflow.keras.layers import LSTM, Dense, Flatten, Input, Concatenate
+from tensorflow.keras.models import Model
+
+# -----------------------------------------------------------------------------
+# CombinedModel from the training notebooks
+#
+#   lstm_input  (history, 7) → LSTM(256) → Dense(256) → Dense(64) → Dense(7)
+#   c1dnn_input (history, 4) → Dense(256) → Dense(32) → Dense(4) → Flatten
+#   Concatenate → Dense(14) → Dense(7, name="final_output")
+# -----------------------------------------------------------------------------
+
+
+def _input_shape(inpt):
+    # accept a window array (N, history, D) or a plain (history, D) shape
+    shape = getattr(inpt, 'shape', inpt)
+    return tuple(shape[-2:])
+
+
+def create_lstm(inpt):
+    """
+    LSTM branch: takes input shape from inpt (history, features)
+    and outputs a 7‐dimensional vector.
+    """
+    lstm_input = Input(shape=_input_shape(inpt), name="lstm_input")
+    x = LSTM(256)(lstm_input)
+    x = Dense(256)(x)
+    x = Dense(64)(x)
+    x = Dense(7)(x)
+    return Model(inputs=lstm_input, outputs=x, name="LSTM_branch")
+
+
+def create_c1dnn(inpt):
+    """
+    Dense branch: takes input shape from inpt (history, features_f)
+    and outputs a 4‐dimensional vector.
+    """
+    c_input = Input(shape=_input_shape(inpt), name="c1dnn_input")
+    y = Dense(256)(c_input)
+    y = Dense(32)(y)
+    y = Dense(4)(y)
+    y = Flatten()(y)
+    return Model(inputs=c_input, outputs=y, name="Dense_branch")
+
+
+def build_combined_model(x_inpt=(20, 7), f_inpt=(20, 4), name="Combined_LSTM_Dense_Model"):
+    """
+    Combined LSTM + Dense model, compiled with Adam / MAE as in the notebooks.
+
+    Args:
+      x_inpt  pose windows or their (history, 7) shape
+      f_inpt  motor windows or their (history, 4) shape
+    """
+    lstm_branch = create_lstm(x_inpt)
+    dense_branch = create_c1dnn(f_inpt)
+
+    combined = Concatenate()([lstm_branch.output, dense_branch.output])
+    z = Dense(14)(combined)
+    z = Dense(7, name="final_output")(z)
+
+    model = Model(inputs=[lstm_branch.input, dense_branch.input], outputs=z, name=name)
+    model.compile(optimizer=tf.keras.optimizers.Adam(), loss='mae')
+    return model
+
+
+def build_folded_model(weights, history_size=20, name="Folded_LSTM_Dense_Model"):
+    """
+    Keras model for CombinedWeights whose Dense chains were folded
+    (see `tee_kinematics.fold.fold_dense`):
+
+      lstm_input  → LSTM(256) → Dense(7)
+      c1dnn_input → Dense(4) → Flatten
+      Concatenate → Dense(7, name="final_output")
+    """
+    (w_l, b_l), = weights.lstm_dense
+    (w_m, b_m), = weights.motor_dense
+    (w_h, b_h), = weights.head
+    kernel, recurrent, bias = weights.lstm
+
+    lstm_input = Input(shape=(history_size, kernel.shape[0]), name="lstm_input")
+    c_input = Input(shape=(history_size, w_m.shape[0]), name="c1dnn_input")
+    lstm = LSTM(recurrent.shape[0], activation=weights.activation,
+                recurrent_activation=weights.recurrent_activation)
+    lstm_dense = Dense(w_l.shape[1])
+    motor_dense = Dense(w_m.shape[1])
+    head = Dense(w_h.shape[1], name="final_output")
+
+    x = lstm_dense(lstm(lstm_input))
+    y = Flatten()(motor_dense(c_input))
+    z = head(Concatenate()([x, y]))
+    model = Model(inputs=[lstm_input, c_input], outputs=z, name=name)
+
+    lstm.set_weights([kernel, recurrent, bias])
+    lstm_dense.set_weights([w_l, b_l])
+    motor_dense.set_weights([w_m, b_m])
+    head.set_weights([w_h, b_h])
+    return model
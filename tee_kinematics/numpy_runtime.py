@@ -0,0 +1,183 @@
+import numpy as np
+
+from tee_kinematics.weights import load_h5
+
+# -----------------------------------------------------------------------------
+# TensorFlow-free inference
+#
+# NumpyCombinedModel runs the CombinedModel forward pass with NumPy only:
+#
+#   LSTM_branch   input projection for all timesteps in one matmul, then
+#                 `history` recurrent steps → Dense(256) → Dense(64) → Dense(7)
+#   Dense_branch  Dense(256) → Dense(32) → Dense(4) on all (batch × history) rows
+#   head          Concatenate → Dense(14) → final_output
+#
+# All intermediate buffers are allocated once for `max_batch` windows; larger
+# inputs are processed in slices of max_batch. Weights come from
+# `tee_kinematics.weights.load_h5` (h5py only), so an inference process starts
+# without importing TensorFlow.
+# -----------------------------------------------------------------------------
+
+
+def sigmoid(z, out):
+    np.negative(z, out=out)
+    np.exp(out, out=out)
+    out += 1.0
+    return np.reciprocal(out, out=out)
+
+
+def tanh(z, out):
+    return np.tanh(z, out=out)
+
+
+ACTIVATIONS = {'sigmoid': sigmoid, 'tanh': tanh}
+
+
+def activation(name):
+    """In-place NumPy version of a Keras LSTM activation."""
+    try:
+        return ACTIVATIONS[name]
+    except KeyError:
+        raise ValueError(f"unsupported LSTM activation {name!r}") from None
+
+
+def _affine(x, w, b, out):
+    np.matmul(x, w, out=out)
+    out += b
+    return out
+
+
+class NumpyCombinedModel:
+    """
+    CombinedModel forward pass on preallocated NumPy buffers.
+
+    Args:
+      weights       CombinedWeights (see `tee_kinematics.weights`)
+      history_size  window length
+      max_batch     windows per internal slice (buffer size)
+    """
+
+    def __init__(self, weights, history_size=20, max_batch=1024):
+        self.weights = weights
+        self.history_size = history_size
+        self.max_batch = max_batch
+
+        kernel, recurrent, bias = weights.lstm
+        self.dtype = kernel.dtype
+        self.units = u = recurrent.shape[0]
+        self._act = activation(weights.activation)
+        self._rec_act = activation(weights.recurrent_activation)
+
+        b, t, dt = max_batch, history_size, self.dtype
+        self._xw = np.empty((b * t, 4 * u), dtype=dt)
+        self._h = np.empty((b, u), dtype=dt)
+        self._c = np.empty((b, u), dtype=dt)
+        self._z = np.empty((b, 4 * u), dtype=dt)
+        self._tmp = np.empty((b, u), dtype=dt)
+        self._lstm_bufs = [np.empty((b, w.shape[1]), dtype=dt) for w, _ in weights.lstm_dense]
+        self._motor_bufs = [np.empty((b * t, w.shape[1]), dtype=dt) for w, _ in weights.motor_dense]
+        self._head_bufs = [np.empty((b, w.shape[1]), dtype=dt) for w, _ in weights.head]
+
+        # first head Dense split into the rows fed by the LSTM branch and the Dense branch
+        w1, _ = weights.head[0]
+        n_lstm = weights.lstm_dense[-1][0].shape[1]
+        self._head_split = (np.ascontiguousarray(w1[:n_lstm]), np.ascontiguousarray(w1[n_lstm:]))
+        self._head_tmp = np.empty((b, w1.shape[1]), dtype=dt)
+
+    @classmethod
+    def from_h5(cls, path, history_size=20, max_batch=1024, dtype=np.float32):
+        """Load a model saved with model.save('...h5') without TensorFlow."""
+        return cls(load_h5(path, dtype), history_size, max_batch)
+
+    @property
+    def output_size(self):
+        return self.weights.head[-1][0].shape[1]
+
+    def _lstm_branch(self, x):
+        n = len(x)
+        t = self.history_size
+        u = self.units
+        kernel, recurrent, bias = self.weights.lstm
+
+        xw = self._xw[:n * t]
+        _affine(x.reshape(n * t, -1), kernel, bias, xw)
+        xw = xw.reshape(n, t, 4 * u)
+
+        h, c, z, tmp = self._h[:n], self._c[:n], self._z[:n], self._tmp[:n]
+        h[:] = 0
+        c[:] = 0
+        for step in range(t):
+            np.matmul(h, recurrent, out=z)
+            z += xw[:, step]
+            i = self._rec_act(z[:, :u], z[:, :u])
+            f = self._rec_act(z[:, u:2 * u], z[:, u:2 * u])
+            g = self._act(z[:, 2 * u:3 * u], z[:, 2 * u:3 * u])
+            o = self._rec_act(z[:, 3 * u:], z[:, 3 * u:])
+            c *= f
+            np.multiply(i, g, out=tmp)
+            c += tmp
+            self._act(c, tmp)
+            np.multiply(o, tmp, out=h)
+
+        y = h
+        for (w, b), buf in zip(self.weights.lstm_dense, self._lstm_bufs):
+            y = _affine(y, w, b, buf[:n])
+        return y
+
+    def _dense_branch(self, f):
+        n = len(f)
+        y = f.reshape(n * self.history_size, -1)
+        for (w, b), buf in zip(self.weights.motor_dense, self._motor_bufs):
+            y = _affine(y, w, b, buf[:n * self.history_size])
+        return y.reshape(n, -1)                              # Flatten
+
+    def _predict_slice(self, x, f, out):
+        n = len(x)
+        lstm_out = self._lstm_branch(x)
+        dense_out = self._dense_branch(f)
+
+        w1a, w1b = self._head_split
+        z = np.matmul(lstm_out, w1a, out=self._head_bufs[0][:n])
+        z += np.matmul(dense_out, w1b, out=self._head_tmp[:n])
+        z += self.weights.head[0][1]
+        for (w, b), buf in zip(self.weights.head[1:], self._head_bufs[1:]):
+            z = _affine(z, w, b, buf[:n])
+        out[:] = z
+
+    def predict(self, x, f):
+        """
+        Args:
+          x  pose windows (N, history, 7)
+          f  motor windows (N, history, 4)
+
+        Returns:
+          predictions (N, 7), same as model.predict([x, f])
+        """
+        x = np.asarray(x, dtype=self.dtype)
+        f = np.asarray(f, dtype=self.dtype)
+        out = np.empty((len(x), self.output_size), dtype=self.dtype)
+        for b0 in range(0, len(x), self.max_batch):
+            b1 = b0 + self.max_batch
+            self._predict_slice(x[b0:b1], f[b0:b1], out[b0:b1])
+        return out
+
+    def predict_on_batch(self, inputs):
+        """Keras-style entry point, so `predict_chunked` etc. accept this model."""
+        x, f = inputs
+        return self.predict(x, f)
+
+    __call__ = predict_on_batch
+
+
+def compare_with_keras(h5_path, x, f):
+    """
+    Max / mean absolute difference between this runtime and Keras on windows (x, f).
+
+    Imports TensorFlow; meant for validating an exported model, not for deployment.
+    """
+    import tensorflow as tf
+
+    expected = tf.keras.models.load_model(h5_path, compile=False).predict([x, f], verbose=0)
+    got = NumpyCombinedModel.from_h5(h5_path, history_size=x.shape[1]).predict(x, f)
+    err = np.abs(got - expected)
+    return {'max_abs_err': float(err.max()), 'mean_abs_err': float(err.mean())}
@@ -0,0 +1,256 @@
+import argparse
+
+import numpy as np
+
+from tee_kinematics.benchmark import split_inputs_by_width, summarize, time_calls
+from tee_kinematics.weights import from_keras, load_h5
+
+# -----------------------------------------------------------------------------
+# ONNX export and onnxruntime backend
+#
+# The graph is written directly from CombinedWeights with onnx.helper, so
+# neither the export nor the runtime needs TensorFlow:
+#
+#   lstm_input  (batch, history, 7) → Transpose (time major) → LSTM → Y_h
+#               → Gemm chain (Dense(256) → Dense(64) → Dense(7))
+#   c1dnn_input (batch, history, 4) → MatMul + Add chain per timestep → Flatten
+#   Concat → Gemm chain (Dense(14) → final_output)
+#
+# The batch dimension is symbolic ('batch'). Keras stores the LSTM gates as
+# i, f, c, o in a (D, 4u) kernel; ONNX expects i, o, f, c in (4u, D), and a
+# separate recurrent bias (zero here). Folded weights (tee_kinematics.fold)
+# export the same way, with single-layer chains.
+# -----------------------------------------------------------------------------
+
+OPSET = 17
+IR_VERSION = 8       # oldest IR for opset 17, so older onnxruntime releases load the file
+INPUT_NAMES = ('lstm_input', 'c1dnn_input')
+OUTPUT_NAME = 'final_output'
+
+# Keras activation name → ONNX LSTM activation
+_ACTIVATIONS = {'sigmoid': 'Sigmoid', 'tanh': 'Tanh', 'relu': 'Relu'}
+
+# Keras gate blocks (i, f, c, o) in ONNX order (i, o, f, c)
+_GATE_ORDER = (0, 3, 1, 2)
+
+
+def _resolve(weights):
+    # CombinedWeights, a Keras model or the path of its .h5 file
+    if isinstance(weights, str):
+        return load_h5(weights)
+    if not hasattr(weights, 'lstm'):
+        return from_keras(weights)
+    return weights
+
+
+def _onnx_activation(name):
+    try:
+        return _ACTIVATIONS[name]
+    except KeyError:
+        raise ValueError(f"unsupported LSTM activation {name!r}") from None
+
+
+def _onnx_gates(a, units):
+    # (..., 4u) in Keras gate order → (4u, ...) in ONNX gate order
+    blocks = [a[..., k * units:(k + 1) * units] for k in _GATE_ORDER]
+    return np.concatenate(blocks, axis=-1).T
+
+
+def to_onnx(weights, history_size=20, opset=OPSET, name='CombinedModel'):
+    """
+    ONNX graph of the CombinedModel.
+
+    Args:
+      weights       CombinedWeights, a Keras CombinedModel or the path of its .h5 file
+      history_size  window length (fixed in the graph; batch stays dynamic)
+
+    Returns:
+      onnx.ModelProto with inputs lstm_input / c1dnn_input and output final_output
+    """
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    weights = _resolve(weights)
+    kernel, recurrent, bias = weights.lstm
+    units = recurrent.shape[0]
+    d_x = kernel.shape[0]
+    d_f = weights.motor_dense[0][0].shape[0]
+    initializers, nodes = [], []
+
+    def const(tensor_name, array, dtype=np.float32):
+        initializers.append(numpy_helper.from_array(np.asarray(array, dtype=dtype), tensor_name))
+        return tensor_name
+
+    # --- LSTM branch ---
+    w = const('lstm_W', _onnx_gates(kernel, units)[None])                 # (1, 4u, D_x)
+    r = const('lstm_R', _onnx_gates(recurrent, units)[None])              # (1, 4u, u)
+    b = const('lstm_B', np.concatenate([_onnx_gates(bias, units),
+                                        np.zeros(4 * units)])[None])      # (1, 8u)
+    # onnxruntime only implements layout=0 (time major)
+    nodes.append(helper.make_node('Transpose', [INPUT_NAMES[0]], ['lstm_seq'], perm=[1, 0, 2]))
+    nodes.append(helper.make_node(
+        'LSTM', ['lstm_seq', w, r, b], ['', 'lstm_h'], name='lstm', hidden_size=units,
+        activations=[_onnx_activation(weights.recurrent_activation),
+                     _onnx_activation(weights.activation),
+                     _onnx_activation(weights.activation)]))
+    # Y_h is (num_directions, batch, u)
+    nodes.append(helper.make_node('Squeeze', ['lstm_h', const('squeeze_axes', [0], np.int64)],
+                                  ['lstm_out']))
+
+    y = 'lstm_out'
+    for k, (wk, bk) in enumerate(weights.lstm_dense):
+        out = f'lstm_dense_{k}'
+        nodes.append(helper.make_node('Gemm', [y, const(f'{out}_W', wk), const(f'{out}_b', bk)], [out]))
+        y = out
+    lstm_out = y
+
+    # --- Dense branch, applied to every timestep ---
+    y = INPUT_NAMES[1]
+    for k, (wk, bk) in enumerate(weights.motor_dense):
+        out = f'motor_dense_{k}'
+        nodes.append(helper.make_node('MatMul', [y, const(f'{out}_W', wk)], [out + '_mm']))
+        nodes.append(helper.make_node('Add', [out + '_mm', const(f'{out}_b', bk)], [out]))
+        y = out
+    nodes.append(helper.make_node('Flatten', [y], ['motor_out'], axis=1))
+
+    # --- head ---
+    nodes.append(helper.make_node('Concat', [lstm_out, 'motor_out'], ['concat'], axis=1))
+    y = 'concat'
+    for k, (wk, bk) in enumerate(weights.head):
+        out = OUTPUT_NAME if k == len(weights.head) - 1 else f'head_{k}'
+        nodes.append(helper.make_node('Gemm', [y, const(f'{out}_W', wk), const(f'{out}_b', bk)], [out]))
+        y = out
+
+    graph = helper.make_graph(
+        nodes, name,
+        inputs=[helper.make_tensor_value_info(INPUT_NAMES[0], TensorProto.FLOAT,
+                                              ['batch', history_size, d_x]),
+                helper.make_tensor_value_info(INPUT_NAMES[1], TensorProto.FLOAT,
+                                              ['batch', history_size, d_f])],
+        outputs=[helper.make_tensor_value_info(OUTPUT_NAME, TensorProto.FLOAT,
+                                               ['batch', weights.head[-1][0].shape[1]])],
+        initializer=initializers)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', opset)],
+                              ir_version=IR_VERSION, producer_name='tee_kinematics')
+    onnx.checker.check_model(model)
+    return model
+
+
+def export_onnx(weights, out_path, history_size=20, opset=OPSET):
+    """Write the ONNX graph of `weights` (see `to_onnx`) to out_path."""
+    import onnx
+
+    onnx.save(to_onnx(weights, history_size, opset), out_path)
+    return out_path
+
+
+class OnnxModel:
+    """
+    onnxruntime CPU session with the model.predict([x, f]) interface.
+
+    Args:
+      path     .onnx file (or serialized model bytes)
+      threads  intra-op threads (None → onnxruntime default)
+    """
+
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        x_in, f_in = split_inputs_by_width(self.session.get_inputs(), lambda i: i.shape[-1], 7)
+        self._x_name, self._f_name = x_in.name, f_in.name
+
+    def predict_on_batch(self, inputs):
+        x, f = inputs
+        feeds = {self._x_name: np.asarray(x, dtype=np.float32),
+                 self._f_name: np.asarray(f, dtype=np.float32)}
+        return self.session.run(None, feeds)[0]
+
+    __call__ = predict_on_batch
+
+    def predict(self, inputs, batch_size=1024, verbose=0):
+        """Predictions (N, 7) for inputs [x, f], in batches of batch_size (as model.predict)."""
+        x, f = inputs
+        return np.concatenate([self.predict_on_batch([x[i:i + batch_size], f[i:i + batch_size]])
+                               for i in range(0, len(x), batch_size)])
+
+
+def check_onnx(model, onnx_path, x, f, threads=None, batch_size=1024, atol=1e-4):
+    """
+    Equivalence and latency of the ONNX export against the Keras model.
+
+    Args:
+      model      Keras CombinedModel the export was made from
+      onnx_path  exported .onnx file
+      x, f       windows to compare on (e.g. the test windows)
+      atol       largest accepted absolute output difference
+
+    Returns:
+      dict max_abs_err, mean_abs_err, ok, and per backend ('keras', 'onnx')
+      batch-1 p50/p99 latency and the time for all windows
+    """
+    import time
+
+    session = OnnxModel(onnx_path, threads)
+    report = {}
+    preds = {}
+    for backend, predict, predict_on_batch in (
+            ('keras', lambda inputs: model.predict(inputs, batch_size=batch_size, verbose=0),
+             model.predict_on_batch),
+            ('onnx', lambda inputs: session.predict(inputs, batch_size), session.predict_on_batch)):
+        t0 = time.perf_counter()
+        preds[backend] = predict([x, f])
+        seconds = time.perf_counter() - t0
+        single = summarize(time_calls(lambda a, b: predict_on_batch([a, b]), x[:1], f[:1]), 1)
+        report[backend] = {'p50_ms': single['p50_ms'], 'p99_ms': single['p99_ms'],
+                           'all_windows_s': seconds, 'windows': len(x)}
+
+    err = np.abs(preds['onnx'] - preds['keras'])
+    report.update(max_abs_err=float(err.max()), mean_abs_err=float(err.mean()),
+                  ok=bool(err.max() <= atol))
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Export a CombinedModel to ONNX and check it against Keras with onnxruntime.')
+    parser.add_argument('model', help='model saved with model.save(...h5)')
+    parser.add_argument('out_path')
+    parser.add_argument('--data', default=None,
+                        help='directory with the TEE_*_cellformat_Final.mat files; '
+                             'test windows are compared (default: random windows)')
+    parser.add_argument('--history', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--atol', type=float, default=1e-4)
+    args = parser.parse_args()
+
+    export_onnx(args.model, args.out_path, args.history)
+    print(f"{args.model} → {args.out_path}")
+
+    import tensorflow as tf
+
+    keras_model = tf.keras.models.load_model(args.model, compile=False)
+    if args.data:
+        from tee_kinematics.tflite_export import load_configs
+        from tee_kinematics.windowing import joint_windows
+
+        tests = [joint_windows(cfg['x'], cfg['f'], cfg['train_end'], cfg['val_end'],
+                               args.history, 0)['test'] for cfg in load_configs(args.data).values()]
+        x = np.concatenate([w.x for w in tests]).astype(np.float32)
+        f = np.concatenate([w.f for w in tests]).astype(np.float32)
+    else:
+        rng = np.random.default_rng(0)
+        x = rng.standard_normal((4096, args.history, 7)).astype(np.float32)
+        f = rng.standard_normal((4096, args.history, 4)).astype(np.float32)
+
+    report = check_onnx(keras_model, args.out_path, x, f, args.threads, atol=args.atol)
+    for backend in ('keras', 'onnx'):
+        r = report[backend]
+        print(f"{backend:>6}  batch-1 p50 {r['p50_ms']:.3f} ms  p99 {r['p99_ms']:.3f} ms  "
+              f"{r['windows']} windows in {r['all_windows_s']:.2f} s")
+    print(f"max_abs_err={report['max_abs_err']:.3g}  mean_abs_err={report['mean_abs_err']:.3g}")
+    raise SystemExit(0 if report['ok'] else 1)
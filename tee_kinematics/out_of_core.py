@@ -0,0 +1,135 @@
+import numpy as np
+
+from tee_kinematics.windowing import strided_windows, window_bounds
+
+# -----------------------------------------------------------------------------
+# Out-of-core windowing over memory-mapped series
+#
+# The series stay on disk (np.load(..., mmap_mode='r') / CellStore arrays).
+# Labels are processed in chunks; each chunk reads its rows plus the
+# `history_size` rows before it (the halo), so windows that straddle a chunk
+# boundary are identical to the in-memory ones. Peak memory is one chunk of
+# rows plus one batch of windows, independent of the recording length.
+# -----------------------------------------------------------------------------
+
+
+def _chunk_plan(start, stop, batch_size, chunk_size):
+    # chunks are a whole number of batches, so batches never span two chunks
+    chunk_size = max(batch_size, (chunk_size // batch_size) * batch_size)
+    return [(c0, min(c0 + chunk_size, stop)) for c0 in range(start, stop, chunk_size)]
+
+
+def iter_window_batches(series_x, series_f, start_index, end_index, history_size, target_size=0,
+                        batch_size=256, chunk_size=1 << 16, labels=True, shuffle=False, seed=None,
+                        dtype=np.float32):
+    """
+    Yield ((x, f), y) batches from (possibly memory-mapped) series, chunk by chunk.
+
+    Args:
+      series_x      pose series (T, D_x)
+      series_f      motor series (T, D_f)
+      start_index, end_index, history_size, target_size  as in `multivariate_data`
+      batch_size    windows per batch
+      chunk_size    windows read from disk at a time (rounded to whole batches)
+      labels        False → yield (x, f) only, for prediction
+      shuffle       shuffle chunk order and the windows inside each chunk
+      seed          shuffle seed
+      dtype         dtype of the yielded batches
+
+    Yields:
+      ((x, f), y) with x (B, history, D_x), f (B, history, D_f), y (B, D_x)
+    """
+    start, stop = window_bounds(len(series_x), start_index, end_index, history_size, target_size)
+    chunks = _chunk_plan(start, stop, batch_size, chunk_size)
+    rng = np.random.default_rng(seed)
+    if shuffle:
+        rng.shuffle(chunks)
+
+    for c0, c1 in chunks:
+        lo = c0 - history_size                       # halo: the history of the first window
+        hi = c1 + target_size                        # labels run target_size past the windows
+        buf_x = np.asarray(series_x[lo:hi], dtype=dtype)
+        buf_f = np.asarray(series_f[lo:c1], dtype=dtype)
+
+        count = c1 - c0
+        x = strided_windows(buf_x, 0, count, history_size)
+        f = strided_windows(buf_f, 0, count, history_size)
+        y = buf_x[history_size + target_size: history_size + target_size + count]
+
+        order = rng.permutation(count) if shuffle else None
+        for b0 in range(0, count, batch_size):
+            if order is None:
+                sel = slice(b0, b0 + batch_size)
+            else:
+                sel = np.sort(order[b0:b0 + batch_size])
+            inputs = (np.ascontiguousarray(x[sel]), np.ascontiguousarray(f[sel]))
+            if labels:
+                yield inputs, y[sel]
+            else:
+                yield inputs
+
+
+def count_windows(n_samples, start_index, end_index, history_size, target_size=0):
+    """Number of windows a split yields."""
+    start, stop = window_bounds(n_samples, start_index, end_index, history_size, target_size)
+    return stop - start
+
+
+def chunked_dataset(series_x, series_f, start_index, end_index, history_size, target_size=0,
+                    batch_size=256, chunk_size=1 << 16, labels=True, shuffle=False, seed=None):
+    """
+    `iter_window_batches` wrapped as a prefetched tf.data.Dataset for model.fit / evaluate.
+
+    With shuffle=True every epoch re-creates the generator, so the chunk and
+    window order changes between epochs.
+    """
+    import tensorflow as tf
+
+    d_x = series_x.shape[1]
+    d_f = series_f.shape[1]
+    x_spec = (tf.TensorSpec((None, history_size, d_x), tf.float32),
+              tf.TensorSpec((None, history_size, d_f), tf.float32))
+    signature = (x_spec, tf.TensorSpec((None, d_x), tf.float32)) if labels else x_spec
+    epoch = [0]
+
+    def generator():
+        epoch_seed = None if seed is None else seed + epoch[0]
+        epoch[0] += 1
+        return iter_window_batches(series_x, series_f, start_index, end_index, history_size,
+                                   target_size, batch_size, chunk_size, labels, shuffle, epoch_seed)
+
+    ds = tf.data.Dataset.from_generator(generator, output_signature=signature)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def predict_chunked(model, series_x, series_f, start_index, end_index, history_size, target_size=0,
+                    batch_size=1024, chunk_size=1 << 16, out_path=None):
+    """
+    model.predict over a split without holding windows or predictions in RAM.
+
+    Args:
+      model         Keras model (anything with predict_on_batch)
+      out_path      .npy file for the predictions (memory-mapped); None → in memory
+
+    Returns:
+      predictions → array (N, D_out), a memmap when out_path is given
+    """
+    n = count_windows(len(series_x), start_index, end_index, history_size, target_size)
+    out = None
+    row = 0
+    for x, f in iter_window_batches(series_x, series_f, start_index, end_index, history_size,
+                                    target_size, batch_size, chunk_size, labels=False):
+        pred = np.asarray(model.predict_on_batch([x, f]))
+        if out is None:
+            shape = (n,) + pred.shape[1:]
+            if out_path is None:
+                out = np.empty(shape, dtype=pred.dtype)
+            else:
+                out = np.lib.format.open_memmap(out_path, mode='w+', dtype=pred.dtype, shape=shape)
+        out[row:row + len(pred)] = pred
+        row += len(pred)
+    if out is None:
+        return np.empty((0,))
+    if out_path is not None:
+        out.flush()
+    return out
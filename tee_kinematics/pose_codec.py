@@ -0,0 +1,234 @@
+import json
+import os
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Pose normalization as one object
+#
+# The notebook data cells rotate each recording into the training frame,
+# z-score the seven pose channels and scale by co_p; the export cells undo it
+# again with one scalar expression per channel. PoseCodec holds the whole
+# transform and applies it to (..., 7) arrays (N, 7 samples or N, H, 7
+# windows) in a single broadcast pass:
+#
+#   frame    pos' = R · pos,  q' = r ⊗ q   (scalar-last, as scipy's
+#            (rot * Rotation.from_quat(q)).as_quat(), with q normalized first).
+#            Both are linear, so the frame change is one (7, 7) block matrix;
+#            the z-score is folded into it:
+#
+#              encode(p) = frame(p) @ diag(co_p / std) − mean · co_p / std
+#              decode(z) = z · std / co_p + mean
+#
+#   motors   f × motor_scale (the notebooks' magic_number)
+#
+# The codecs of a model are stored with it: as the `pose_codecs` attribute of
+# a Keras .h5 file, or as <model path>.codecs.json next to any other format.
+# -----------------------------------------------------------------------------
+
+POSE_CHANNELS = 7
+CODECS_ATTR = 'pose_codecs'
+
+
+def _quaternion_left_matrix(r):
+    # L with (r ⊗ q) = L @ q for scalar-last quaternions [x y z w]
+    rx, ry, rz, rw = r
+    return np.array([[rw, -rz, ry, rx],
+                     [rz, rw, -rx, ry],
+                     [-ry, rx, rw, rz],
+                     [-rx, -ry, -rz, rw]])
+
+
+def _rotation_quaternion(rotation):
+    # scipy Rotation or scalar-last quaternion → unit quaternion, sign kept
+    # (the sign of r carries over to every encoded quaternion)
+    if hasattr(rotation, 'as_quat'):
+        rotation = rotation.as_quat()
+    r = np.asarray(rotation, dtype=np.float64).reshape(4)
+    return r / np.linalg.norm(r)
+
+
+class PoseCodec:
+    """
+    Normalization of [x y z qx qy qz qw] poses and motor samples.
+
+    Args:
+      mean, std    (7,) statistics of the pose in the training frame
+      co_p         scale applied after the z-score
+      rotation     frame rotation (scipy Rotation or scalar-last quaternion),
+                   or None to use the poses as recorded
+      motor_scale  factor applied to the motor channels
+    """
+
+    def __init__(self, mean, std, co_p=1.0, rotation=None, motor_scale=1.0):
+        self.mean = np.asarray(mean, dtype=np.float64).reshape(POSE_CHANNELS)
+        self.std = np.asarray(std, dtype=np.float64).reshape(POSE_CHANNELS)
+        self.co_p = float(co_p)
+        self.motor_scale = float(motor_scale)
+        self.rotation = None if rotation is None else _rotation_quaternion(rotation)
+
+        self._scale = self.co_p / self.std
+        self._offset = -self.mean * self._scale
+        self._decode_scale = self.std / self.co_p
+        self._frame = self._encode_matrix = None
+        if self.rotation is not None:
+            from scipy.spatial.transform import Rotation
+
+            frame = np.zeros((POSE_CHANNELS, POSE_CHANNELS))
+            frame[:3, :3] = Rotation.from_quat(self.rotation).as_matrix().T
+            frame[3:, 3:] = _quaternion_left_matrix(self.rotation).T
+            self._frame = frame                                  # row vectors: p' = p @ frame
+            self._encode_matrix = frame * self._scale
+
+    @classmethod
+    def fit_encode(cls, pose, co_p=1.0, rotation=None, motor_scale=1.0, out=None):
+        """
+        Fit the statistics of `pose` (after the frame rotation) and encode it,
+        rotating the recording once.
+
+        Args:
+          pose  (N, 7) raw recording
+
+        Returns:
+          (codec, encoded pose); channels with zero spread get std = 1
+        """
+        pose = np.asarray(pose)
+        rotated = cls(np.zeros(POSE_CHANNELS), np.ones(POSE_CHANNELS), 1.0, rotation).to_frame(pose)
+        mean = rotated.mean(axis=0)
+        std = rotated.std(axis=0)
+        std[std == 0] = 1.0
+        codec = cls(mean, std, co_p, rotation, motor_scale)
+        if out is None:
+            out = rotated
+        np.subtract(rotated, codec.mean, out=out)
+        np.multiply(out, codec._scale, out=out)
+        return codec, out
+
+    @classmethod
+    def fit(cls, pose, co_p=1.0, rotation=None, motor_scale=1.0):
+        """Codec with the statistics of `pose` (N, 7), see `fit_encode`."""
+        return cls.fit_encode(pose, co_p, rotation, motor_scale)[0]
+
+    # --- frame ---
+
+    def _unit_quaternions(self, pose):
+        pose = np.array(pose, dtype=np.result_type(pose, np.float32))
+        pose[..., 3:] /= np.linalg.norm(pose[..., 3:], axis=-1, keepdims=True)
+        return pose
+
+    def to_frame(self, pose):
+        """Recorded poses (..., 7) in the training frame (a copy)."""
+        if self._frame is None:
+            return np.array(pose, dtype=np.result_type(pose, np.float32))
+        return self._unit_quaternions(pose) @ self._frame
+
+    def to_tracker(self, pose):
+        """Training-frame poses (..., 7) back in the tracker frame (a copy)."""
+        if self._frame is None:
+            return np.array(pose, dtype=np.result_type(pose, np.float32))
+        return np.asarray(pose) @ self._frame.T               # the block matrix is orthogonal
+
+    # --- pose ---
+
+    def encode(self, pose, out=None):
+        """
+        Recorded poses → network inputs / targets.
+
+        Args:
+          pose  (..., 7) raw poses (N, 7 samples or N, H, 7 windows)
+          out   output array; may be `pose` itself to encode in place
+
+        Returns:
+          encoded poses, same shape
+        """
+        if self._encode_matrix is not None:
+            pose = self._unit_quaternions(pose)
+            out = np.matmul(pose, self._encode_matrix, out=out)
+        else:
+            out = np.multiply(pose, self._scale, out=out)
+        return np.add(out, self._offset, out=out)
+
+    def decode(self, z, out=None):
+        """
+        Network inputs / predictions → poses in the training frame (metres and
+        quaternion components), undoing co_p and the z-score.
+
+        Args:
+          z    (..., 7) encoded poses
+          out  output array; may be `z` itself to decode in place
+
+        Returns:
+          decoded poses, same shape
+        """
+        out = np.multiply(z, self._decode_scale, out=out)
+        return np.add(out, self.mean, out=out)
+
+    # --- motors ---
+
+    def encode_motor(self, f, out=None):
+        """Motor samples (..., 4) × motor_scale (in place with out=f)."""
+        return np.multiply(f, self.motor_scale, out=out)
+
+    # --- serialization ---
+
+    def to_dict(self):
+        return {'mean': self.mean.tolist(), 'std': self.std.tolist(), 'co_p': self.co_p,
+                'rotation': None if self.rotation is None else self.rotation.tolist(),
+                'motor_scale': self.motor_scale}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['mean'], d['std'], d.get('co_p', 1.0), d.get('rotation'), d.get('motor_scale', 1.0))
+
+    def __repr__(self):
+        rotation = None if self.rotation is None else np.round(self.rotation, 4).tolist()
+        return f"PoseCodec(co_p={self.co_p}, rotation={rotation}, motor_scale={self.motor_scale})"
+
+
+def _sidecar(model_path):
+    return os.fspath(model_path) + '.codecs.json'
+
+
+def save_codecs(model_path, codecs):
+    """
+    Store the codecs of a saved model with it.
+
+    Args:
+      model_path  file written by model.save(...): .h5 files get a `pose_codecs`
+                  attribute, other formats a <model_path>.codecs.json sidecar
+      codecs      dict configuration name → PoseCodec (or a single PoseCodec)
+    """
+    if isinstance(codecs, PoseCodec):
+        codecs = {'default': codecs}
+    text = json.dumps({name: codec.to_dict() for name, codec in codecs.items()})
+    if os.fspath(model_path).endswith(('.h5', '.hdf5')):
+        import h5py
+
+        with h5py.File(model_path, 'a') as f:
+            f.attrs[CODECS_ATTR] = text
+    else:
+        with open(_sidecar(model_path), 'w') as f:
+            f.write(text)
+
+
+def load_codecs(model_path):
+    """
+    Codecs stored with a model by `save_codecs`.
+
+    Returns:
+      dict configuration name → PoseCodec (empty when none were stored)
+    """
+    text = None
+    if os.fspath(model_path).endswith(('.h5', '.hdf5')):
+        import h5py
+
+        with h5py.File(model_path, 'r') as f:
+            text = f.attrs.get(CODECS_ATTR)
+    if text is None and os.path.exists(_sidecar(model_path)):
+        with open(_sidecar(model_path)) as f:
+            text = f.read()
+    if text is None:
+        return {}
+    if isinstance(text, bytes):
+        text = text.decode()
+    return {name: PoseCodec.from_dict(d) for name, d in json.loads(text).items()}
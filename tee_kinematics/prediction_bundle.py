@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from tee_kinematics.pose_codec import PoseCodec
+
+# -----------------------------------------------------------------------------
+# Prediction bundle: all results of a run in one memory-mapped directory
+#
+#   predictions.bundle/
+#     manifest.json           per configuration: label, samples, split bounds,
+#                             PoseCodec (normalization stats, rotation)
+#     Zero.measured.npy       (N, 7) measured pose  [x y z qx qy qz qw]
+#     Zero.predicted.npy      (N, 7) predicted pose
+#     45.measured.npy ...
+#
+# Poses are stored de-normalized (metres, training frame), rows ordered
+# train + val + test as in the notebook export cells. Readers parse the
+# manifest once and memory-map an array on first access, so a plot slicing
+# one configuration reads only the pages it touches.
+#
+# The four TEE_<name>_{org,predict}_{pos,orient}_matlab.mat files of the
+# notebooks are written from a bundle on demand by `export_matlab`.
+# -----------------------------------------------------------------------------
+
+MANIFEST_NAME = 'manifest.json'
+BUNDLE_VERSION = 1
+
+
+def _array_path(path, name, kind):
+    return os.path.join(path, f'{name}.{kind}.npy')
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST_NAME)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {'version': BUNDLE_VERSION, 'configs': {}}
+
+
+def _replace(target, write):
+    # write to a temporary file first: readers holding a memory map of the
+    # old file keep a valid mapping, and a crash never leaves a torn file
+    tmp = target + '.tmp'
+    write(tmp)
+    os.replace(tmp, target)
+
+
+def _save_npy(array):
+    def write(tmp):
+        with open(tmp, 'wb') as fh:          # a path would get '.npy' appended
+            np.save(fh, np.ascontiguousarray(array))
+    return write
+
+
+def _split_bounds(splits, samples):
+    # {'train': n, 'val': n, 'test': n} (sizes, in row order) → name → [start, stop]
+    bounds, start = {}, 0
+    for name, size in splits.items():
+        bounds[name] = [start, start + int(size)]
+        start += int(size)
+    if start != samples:
+        raise ValueError(f"split sizes add up to {start}, expected {samples} rows")
+    return bounds
+
+
+def save_bundle(path, name, measured, predicted, splits, codec=None, label=None):
+    """
+    Add (or replace) one configuration's results in the bundle at `path`.
+
+    Args:
+      path       bundle directory (created if missing)
+      name       configuration name ('Zero', '45', '90')
+      measured   (N, 7) measured poses, de-normalized
+      predicted  (N, 7) predicted poses, de-normalized
+      splits     dict split name → number of rows, in row order
+                 (e.g. {'train': len(pred_train), 'val': ..., 'test': ...})
+      codec      PoseCodec of the configuration (stored as its statistics)
+      label      configuration label (default TEE_<NAME>)
+
+    Returns:
+      the configuration's manifest entry
+    """
+    measured = np.asarray(measured)
+    predicted = np.asarray(predicted)
+    if measured.shape != predicted.shape or measured.ndim != 2:
+        raise ValueError(f"measured {measured.shape} and predicted {predicted.shape} must be "
+                         f"the same (N, 7) shape")
+    os.makedirs(path, exist_ok=True)
+    for kind, array in (('measured', measured), ('predicted', predicted)):
+        _replace(_array_path(path, name, kind), _save_npy(array))
+
+    entry = {
+        'label': label or f'TEE_{name.upper()}',
+        'samples': len(measured),
+        'channels': measured.shape[1],
+        'dtype': measured.dtype.str,
+        'splits': _split_bounds(splits, len(measured)),
+        'codec': None if codec is None else codec.to_dict(),
+    }
+    manifest = _read_manifest(path)
+    manifest['configs'][name] = entry
+
+    def write(tmp):
+        with open(tmp, 'w') as fh:
+            json.dump(manifest, fh, indent=2)
+
+    _replace(os.path.join(path, MANIFEST_NAME), write)
+    return entry
+
+
+class ConfigResults:
+    """
+    Results of one configuration in a bundle.
+
+    `measured` / `predicted` are (N, 7) memory maps, opened on first access;
+    `split(name)` returns views of the rows of one split.
+    """
+
+    def __init__(self, path, name, entry, mmap_mode='r'):
+        self.path = path
+        self.name = name
+        self.entry = entry
+        self.mmap_mode = mmap_mode
+        self._arrays = {}
+
+    def _array(self, kind):
+        if kind not in self._arrays:
+            self._arrays[kind] = np.load(_array_path(self.path, self.name, kind), mmap_mode=self.mmap_mode)
+        return self._arrays[kind]
+
+    @property
+    def measured(self):
+        return self._array('measured')
+
+    @property
+    def predicted(self):
+        return self._array('predicted')
+
+    @property
+    def label(self):
+        return self.entry['label']
+
+    @property
+    def splits(self):
+        """dict split name → (start, stop) row bounds."""
+        return {name: tuple(bounds) for name, bounds in self.entry['splits'].items()}
+
+    @property
+    def codec(self):
+        codec = self.entry.get('codec')
+        return None if codec is None else PoseCodec.from_dict(codec)
+
+    def __len__(self):
+        return self.entry['samples']
+
+    def split(self, name):
+        """(measured, predicted) views of the rows of split `name`."""
+        start, stop = self.entry['splits'][name]
+        return self.measured[start:stop], self.predicted[start:stop]
+
+    def __repr__(self):
+        return f"ConfigResults({self.name!r}, samples={len(self)}, splits={self.splits})"
+
+
+class PredictionBundle:
+    """
+    Lazy reader of a bundle written by `save_bundle`.
+
+    ``bundle['Zero'].measured[:, :3]`` is a zero-copy view of the measured
+    positions; only the manifest is read when the bundle is opened.
+    """
+
+    def __init__(self, path, mmap_mode='r'):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        with open(os.path.join(path, MANIFEST_NAME)) as fh:
+            self.manifest = json.load(fh)
+        self._configs = {}
+
+    def __getitem__(self, name):
+        if name not in self._configs:
+            entry = self.manifest['configs'][name]
+            self._configs[name] = ConfigResults(self.path, name, entry, self.mmap_mode)
+        return self._configs[name]
+
+    def __contains__(self, name):
+        return name in self.manifest['configs']
+
+    def __iter__(self):
+        return iter(self.manifest['configs'])
+
+    def keys(self):
+        return self.manifest['configs'].keys()
+
+    def items(self):
+        return ((name, self[name]) for name in self)
+
+
+def open_bundle(path, mmap_mode='r'):
+    """Open a bundle directory (see `save_bundle`)."""
+    return PredictionBundle(path, mmap_mode)
+
+
+def export_matlab(bundle, out_dir='.', names=None):
+    """
+    Write the notebooks' four MATLAB files per configuration from a bundle:
+    TEE_<name>_org_pos_matlab.mat (x_total, y_total, z_total),
+    TEE_<name>_predict_pos_matlab.mat (xp_total, ...), TEE_<name>_org_orient_matlab.mat
+    (o1_total, o2_total, o3_total, s_total) and TEE_<name>_predict_orient_matlab.mat.
+
+    Args:
+      bundle  PredictionBundle or bundle directory
+      names   configurations to export (None → all)
+
+    Returns:
+      list of written paths
+    """
+    import scipy.io as spio
+
+    if not isinstance(bundle, PredictionBundle):
+        bundle = open_bundle(bundle)
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for name in names or list(bundle):
+        run = bundle[name]
+        truth, pred, tag = run.measured, run.predicted, run.label
+        files = {
+            'org_pos': {'x_total': truth[:, 0], 'y_total': truth[:, 1], 'z_total': truth[:, 2],
+                        'label': f'{tag}_org_pos'},
+            'predict_pos': {'xp_total': pred[:, 0], 'yp_total': pred[:, 1], 'zp_total': pred[:, 2],
+                            'label': f'{tag}_Predict_pos'},
+            'org_orient': {'o1_total': truth[:, 3], 'o2_total': truth[:, 4], 'o3_total': truth[:, 5],
+                           's_total': truth[:, 6], 'label': f'{tag}_org_orient'},
+            'predict_orient': {'o1p_total': pred[:, 3], 'o2p_total': pred[:, 4], 'o3p_total': pred[:, 5],
+                               'sp_total': pred[:, 6], 'label': f'{tag}_Predict_orient'},
+        }
+        for kind, variables in files.items():
+            out_path = os.path.join(out_dir, f'TEE_{name}_{kind}_matlab.mat')
+            spio.savemat(out_path, variables)
+            written.append(out_path)
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inspect a prediction bundle or export it for MATLAB.')
+    parser.add_argument('bundle')
+    parser.add_argument('--matlab', default=None, metavar='OUT_DIR',
+                        help='write the TEE_*_matlab.mat files of every configuration')
+    args = parser.parse_args()
+
+    bundle = open_bundle(args.bundle)
+    for name, run in bundle.items():
+        splits = '  '.join(f"{split}={stop - start}" for split, (start, stop) in run.splits.items())
+        print(f"{name:>5}  {run.label:<10} {len(run)} samples  {splits}")
+    if args.matlab:
+        for path in export_matlab(bundle, args.matlab):
+            print(f"→ {path}")
@@ -0,0 +1,171 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# -----------------------------------------------------------------------------
+# Prediction cache for the export / metrics / plotting cells
+#
+# The notebooks predicted every split of every configuration three times (the
+# position export, the orientation export and the metrics cell), over the
+# same windows with the same weights. PredictionCache keys each prediction by
+#
+#   weights hash   BLAKE2b over every weight array of the model, recomputed on
+#                  each call, so further training never serves stale results
+#   fingerprint    BLAKE2b over the windows' contents, shape and dtype. Sliding
+#                  windows from `strided_windows` are hashed through the
+#                  series rows they view (N + history − 1 rows, not N × history)
+#
+# Entries are kept in memory (LRU, bounded by `max_memory_bytes`) and, with a
+# `directory`, evicted entries are spilled to <key>.npy and read back on
+# demand; a cache directory also carries results across kernel restarts.
+# -----------------------------------------------------------------------------
+
+
+def _arrays(obj):
+    # every ndarray in a (nested) CombinedWeights / list / tuple
+    if isinstance(obj, np.ndarray):
+        yield obj
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            yield from _arrays(item)
+
+
+def weights_hash(model):
+    """
+    Hash of a model's weights.
+
+    Accepts a Keras model (get_weights()), CombinedWeights, or an object with a
+    `weights` attribute holding CombinedWeights (NumpyCombinedModel).
+    """
+    if hasattr(model, 'get_weights'):
+        arrays = model.get_weights()
+    elif hasattr(model, 'lstm'):
+        arrays = list(_arrays(tuple(model)))
+    elif hasattr(getattr(model, 'weights', None), 'lstm'):
+        arrays = list(_arrays(tuple(model.weights)))
+    else:
+        raise TypeError(f"cannot hash the weights of {type(model).__name__}; pass model_key=")
+
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(f'{a.dtype.str}{a.shape}'.encode())
+        h.update(a.data)
+    return h.hexdigest()
+
+
+def _series_view(windows):
+    # the (N + history − 1, D) rows a sliding-window view reads, or None
+    n, history, _ = windows.shape
+    s_win, s_step, s_feat = windows.strides
+    if n < 1 or s_win != s_step:
+        return None
+    return as_strided(windows, shape=(n + history - 1, windows.shape[2]), strides=(s_step, s_feat),
+                      writeable=False)
+
+
+def window_fingerprint(windows):
+    """Content hash of a window array (N, history, D)."""
+    windows = np.asarray(windows)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{windows.dtype.str}{windows.shape}'.encode())
+    rows = _series_view(windows) if windows.ndim == 3 else None
+    h.update(np.ascontiguousarray(windows if rows is None else rows).data)
+    return h.hexdigest()
+
+
+def _predict(model, x, f, batch_size):
+    # Keras models take predict([x, f]); the other engines predict_on_batch([x, f])
+    if hasattr(model, 'get_weights'):
+        return np.asarray(model.predict([x, f], batch_size=batch_size, verbose=0))
+    return np.asarray(model.predict_on_batch([x, f]))
+
+
+class PredictionCache:
+    """
+    Memoized model.predict([x, f]).
+
+    Args:
+      directory         spill / persist predictions here as <key>.npy (None → memory only)
+      max_memory_bytes  in-memory budget; least recently used entries are
+                        evicted first (spilled when `directory` is set)
+      batch_size        batch size for Keras predict
+    """
+
+    def __init__(self, directory=None, max_memory_bytes=512 * 2 ** 20, batch_size=1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.batch_size = batch_size
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, model, x, f, model_key=None):
+        model_key = model_key or weights_hash(model)
+        return f'{model_key}-{window_fingerprint(x)}-{window_fingerprint(f)}'
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npy')
+
+    def _remember(self, key, pred):
+        self._memory[key] = pred
+        self._memory_bytes += pred.nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            old_key, old = self._memory.popitem(last=False)
+            self._memory_bytes -= old.nbytes
+            if self.directory and not os.path.exists(self._path(old_key)):
+                np.save(self._path(old_key), old)
+
+    def predict(self, model, x, f, model_key=None):
+        """
+        Predictions for windows (x, f), computed at most once per (weights, windows).
+
+        Args:
+          model      Keras model, NumpyCombinedModel, or any engine with predict_on_batch
+          x, f       pose / motor windows
+          model_key  identifies the model when its weights cannot be hashed
+                     (TFLite / ONNX sessions)
+
+        Returns:
+          predictions (N, 7), read-only (shared between callers)
+        """
+        key = self.key(model, x, f, model_key)
+        pred = self._memory.get(key)
+        if pred is not None:
+            self._memory.move_to_end(key)
+            self.stats['hits'] += 1
+            return pred
+
+        if self.directory and os.path.exists(self._path(key)):
+            pred = np.load(self._path(key))
+            self.stats['disk_hits'] += 1
+        else:
+            pred = _predict(model, x, f, self.batch_size)
+            self.stats['misses'] += 1
+            if self.directory:
+                np.save(self._path(key), pred)
+        pred.setflags(write=False)
+        self._remember(key, pred)
+        return pred
+
+    def predict_splits(self, model, splits, model_key=None):
+        """
+        Predictions for every split of `windowing.joint_windows`.
+
+        Returns:
+          dict split name → predictions
+        """
+        return {name: self.predict(model, w.x, w.f, model_key) for name, w in splits.items()}
+
+    def clear(self, disk=False):
+        self._memory.clear()
+        self._memory_bytes = 0
+        if disk and self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith('.npy'):
+                    os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,411 @@
+import argparse
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Micro-batching inference server on a Unix domain socket
+#
+# One process loads the model; the controller, logger, safety monitor, ...
+# connect as clients. Requests are queued, and a single batcher thread
+#
+#   1. waits for the first request,
+#   2. keeps collecting until `max_wait_ms` after that request, `max_batch`
+#      windows, or the point where an earlier client deadline would otherwise
+#      be missed (deadline − recent inference time),
+#   3. runs all windows as one predict(x, f) call and sends each client its
+#      rows back with the time it spent queued and in inference.
+#
+# Requests whose deadline has already passed when their batch starts are
+# answered with STATUS_DEADLINE instead of being run.
+#
+# Wire format (little endian, float32 payloads):
+#   request   <QIIIIf  id, windows, history, d_x, d_f, deadline_ms (0 → none)
+#             then x (windows, history, d_x) and f (windows, history, d_f)
+#   response  <QIIIIff id, status, windows, d_out, batch_windows, queue_ms, infer_ms
+#             then predictions (windows, d_out); on STATUS_ERROR the payload
+#             is a UTF-8 message of `windows` bytes
+# -----------------------------------------------------------------------------
+
+REQUEST = struct.Struct('<QIIIIf')
+RESPONSE = struct.Struct('<QIIIIff')
+
+STATUS_OK = 0
+STATUS_DEADLINE = 1
+STATUS_ERROR = 2
+
+Timing = namedtuple('Timing', ['queue_ms', 'infer_ms', 'batch_windows', 'total_ms'])
+Timing.__doc__ = """
+Per-request latency accounting.
+
+  queue_ms       arrival at the server → start of its batch
+  infer_ms       predict() time of the batch it ran in
+  batch_windows  windows in that batch (all clients)
+  total_ms       client-side round trip
+"""
+
+
+class DeadlineExceeded(RuntimeError):
+    """The server dropped the request because its deadline passed before it could run."""
+
+
+def _recv_exact(conn, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = conn.recv_into(view[got:])
+        if not k:
+            raise ConnectionError('connection closed')
+        got += k
+    return buf
+
+
+class _Request:
+    __slots__ = ('conn', 'lock', 'req_id', 'x', 'f', 'arrival', 'deadline')
+
+    def __init__(self, conn, lock, req_id, x, f, arrival, deadline):
+        self.conn, self.lock, self.req_id = conn, lock, req_id
+        self.x, self.f = x, f
+        self.arrival, self.deadline = arrival, deadline
+
+
+class InferenceServer:
+    """
+    Serve predict(x, f) to local clients, batching concurrent requests.
+
+    Args:
+      predict       callable (x (N, history, 7), f (N, history, 4)) → (N, 7), e.g.
+                    NumpyCombinedModel.predict or `benchmark.load_engine(...).predict`
+      socket_path   Unix socket to listen on (an existing socket file is replaced)
+      history_size  window length the model expects
+      max_batch     windows per batch
+      max_wait_ms   longest time the first request of a batch waits for others
+      d_x, d_f      pose / motor channels the model expects; requests with
+                    other widths are answered with an error
+    """
+
+    def __init__(self, predict, socket_path, history_size=20, max_batch=256, max_wait_ms=1.0,
+                 d_x=7, d_f=4):
+        self.predict = predict
+        self.socket_path = socket_path
+        self.history_size = history_size
+        self.d_x, self.d_f = d_x, d_f
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1e3
+
+        self._queue = queue.Queue()
+        self._closing = threading.Event()
+        self._threads = []
+        self._listener = None
+        self._infer_s = 0.0                     # recent batch inference time (EWMA)
+        self.stats = {'requests': 0, 'windows': 0, 'batches': 0, 'dropped': 0}
+
+    # --- lifecycle ---
+
+    def start(self):
+        """Listen and run the acceptor / batcher threads in the background."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        self._listener.listen()
+        for target in (self._accept_loop, self._batch_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while not self._closing.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self._closing.set()
+        self._queue.put(None)
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- connections ---
+
+    def _accept_loop(self):
+        while not self._closing.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _read_loop(self, conn):
+        lock = threading.Lock()
+        try:
+            while True:
+                req_id, n, history, d_x, d_f, deadline_ms = REQUEST.unpack(
+                    _recv_exact(conn, REQUEST.size))
+                x = np.frombuffer(_recv_exact(conn, 4 * n * history * d_x), np.float32)
+                f = np.frombuffer(_recv_exact(conn, 4 * n * history * d_f), np.float32)
+                arrival = time.perf_counter()
+                if history != self.history_size:
+                    self._send_error(conn, lock, req_id,
+                                     f"history {history} != server history {self.history_size}")
+                    continue
+                if (d_x, d_f) != (self.d_x, self.d_f):
+                    self._send_error(conn, lock, req_id,
+                                     f"channels (d_x={d_x}, d_f={d_f}) != server channels "
+                                     f"(d_x={self.d_x}, d_f={self.d_f})")
+                    continue
+                deadline = arrival + deadline_ms / 1e3 if deadline_ms > 0 else None
+                self._queue.put(_Request(conn, lock, req_id, x.reshape(n, history, d_x),
+                                         f.reshape(n, history, d_f), arrival, deadline))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _send(self, request, status, payload, d_out, batch_windows, queue_ms, infer_ms):
+        header = RESPONSE.pack(request.req_id, status, len(payload) if status == STATUS_ERROR
+                               else len(request.x), d_out, batch_windows, queue_ms, infer_ms)
+        data = payload if status == STATUS_ERROR else np.ascontiguousarray(payload, np.float32)
+        try:
+            with request.lock:
+                request.conn.sendall(header)
+                request.conn.sendall(data)
+        except OSError:
+            pass                                # client went away
+
+    def _send_error(self, conn, lock, req_id, message):
+        request = _Request(conn, lock, req_id, None, None, None, None)
+        self._send(request, STATUS_ERROR, message.encode(), 0, 0, 0.0, 0.0)
+
+    # --- batching ---
+
+    def _collect(self, first):
+        batch = [first]
+        windows = len(first.x)
+        close_at = first.arrival + self.max_wait
+        earliest = first.deadline
+        while windows < self.max_batch:
+            if earliest is not None:
+                close_at = min(close_at, earliest - self._infer_s)
+            # past the window, still take what is already queued
+            timeout = close_at - time.perf_counter()
+            try:
+                request = (self._queue.get(timeout=timeout) if timeout > 0
+                           else self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+            windows += len(request.x)
+            if request.deadline is not None:
+                earliest = request.deadline if earliest is None else min(earliest, request.deadline)
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+
+            start = time.perf_counter()
+            live = []
+            for request in batch:
+                if request.deadline is not None and request.deadline < start:
+                    self.stats['dropped'] += 1
+                    self._send(request, STATUS_DEADLINE, np.empty((0, 0)), 0, 0,
+                               (start - request.arrival) * 1e3, 0.0)
+                else:
+                    live.append(request)
+            if not live:
+                continue
+
+            try:
+                x = np.concatenate([r.x for r in live])
+                f = np.concatenate([r.f for r in live])
+                out = np.asarray(self.predict(x, f))
+            except Exception as exc:            # report to the clients, keep serving
+                for request in live:
+                    self._send(request, STATUS_ERROR, repr(exc).encode(), 0, 0, 0.0, 0.0)
+                continue
+            infer = time.perf_counter() - start
+            self._infer_s = infer if not self.stats['batches'] else 0.8 * self._infer_s + 0.2 * infer
+
+            self.stats['batches'] += 1
+            self.stats['requests'] += len(live)
+            self.stats['windows'] += len(x)
+            row = 0
+            for request in live:
+                n = len(request.x)
+                self._send(request, STATUS_OK, out[row:row + n], out.shape[1], len(x),
+                           (start - request.arrival) * 1e3, infer * 1e3)
+                row += n
+
+
+class InferenceClient:
+    """
+    Connection to an InferenceServer. One request in flight per client
+    (calls from several threads are serialized); open one client per thread
+    for concurrency.
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def request(self, x, f, deadline_ms=None):
+        """
+        Args:
+          x            pose windows (N, history, 7) or one window (history, 7)
+          f            motor windows (N, history, 4) or one window (history, 4)
+          deadline_ms  drop the request if it cannot start within this many ms
+
+        Returns:
+          predictions (N, 7), Timing
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        f = np.ascontiguousarray(f, dtype=np.float32)
+        if x.ndim == 2:
+            x, f = x[None], f[None]
+        n, history, d_x = x.shape
+        with self._lock:
+            self._next_id += 1
+            t0 = time.perf_counter()
+            self.sock.sendall(REQUEST.pack(self._next_id, n, history, d_x, f.shape[2],
+                                           deadline_ms or 0.0))
+            self.sock.sendall(x)
+            self.sock.sendall(f)
+            _, status, rows, d_out, batch_windows, queue_ms, infer_ms = RESPONSE.unpack(
+                _recv_exact(self.sock, RESPONSE.size))
+            if status == STATUS_ERROR:
+                raise RuntimeError(_recv_exact(self.sock, rows).decode())
+            out = np.frombuffer(_recv_exact(self.sock, 4 * rows * d_out), np.float32)
+            total_ms = (time.perf_counter() - t0) * 1e3
+        timing = Timing(queue_ms, infer_ms, batch_windows, total_ms)
+        if status == STATUS_DEADLINE:
+            raise DeadlineExceeded(f"dropped after {queue_ms:.2f} ms in the queue")
+        return out.reshape(rows, d_out), timing
+
+    def predict_on_batch(self, inputs):
+        x, f = inputs
+        return self.request(x, f)[0]
+
+    __call__ = predict_on_batch
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_test(socket_path, clients=4, requests=500, history_size=20, windows=1, deadline_ms=None,
+              seed=0):
+    """
+    Run `clients` threads that each send `requests` requests of `windows` windows.
+
+    Returns:
+      dict requests_per_s, windows_per_s, p50/p99 round trip ms, mean batch size,
+      mean queue ms, dropped
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((windows, history_size, 7)).astype(np.float32)
+    f = rng.standard_normal((windows, history_size, 4)).astype(np.float32)
+    timings, dropped = [], [0]
+    lock = threading.Lock()
+
+    def run():
+        local, drops = [], 0
+        with InferenceClient(socket_path) as client:
+            for _ in range(requests):
+                try:
+                    local.append(client.request(x, f, deadline_ms)[1])
+                except DeadlineExceeded:
+                    drops += 1
+        with lock:
+            timings.extend(local)
+            dropped[0] += drops
+
+    threads = [threading.Thread(target=run) for _ in range(clients)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - t0
+
+    total = np.array([t.total_ms for t in timings])
+    done = len(timings)
+    return {
+        'clients': clients,
+        'requests_per_s': done / seconds,
+        'windows_per_s': done * windows / seconds,
+        'p50_ms': float(np.percentile(total, 50)) if done else float('nan'),
+        'p99_ms': float(np.percentile(total, 99)) if done else float('nan'),
+        'mean_batch_windows': float(np.mean([t.batch_windows for t in timings])) if done else 0.0,
+        'mean_queue_ms': float(np.mean([t.queue_ms for t in timings])) if done else 0.0,
+        'dropped': dropped[0],
+    }
+
+
+if __name__ == '__main__':
+    from tee_kinematics.benchmark import ENGINES, load_engine
+
+    parser = argparse.ArgumentParser(description='Micro-batching local inference server.')
+    parser.add_argument('model', help='.h5 / .keras / SavedModel dir / .tflite / .onnx')
+    parser.add_argument('--socket', default='/tmp/tee_kinematics.sock')
+    parser.add_argument('--engine', choices=[e for e in ENGINES if e != 'streaming'], default='numpy')
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--history', type=int, default=20)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=1.0)
+    parser.add_argument('--load-test', type=int, nargs='*', default=None, metavar='CLIENTS',
+                        help='instead of serving, measure throughput for these client counts')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--deadline-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    engine = load_engine(args.model, args.engine, args.threads)
+    server = InferenceServer(engine.predict, args.socket, args.history, args.max_batch,
+                             args.max_wait_ms)
+    if args.load_test is None:
+        print(f"serving {args.model} ({args.engine}) on {args.socket}")
+        server.serve_forever()
+    else:
+        with server:
+            print(f"{'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6} "
+                  f"{'queue ms':>9} {'dropped':>8}")
+            for clients in args.load_test or [1, 2, 4, 8]:
+                r = load_test(args.socket, clients, args.requests, args.history,
+                              deadline_ms=args.deadline_ms)
+                print(f"{clients:>7} {r['requests_per_s']:9.0f} {r['p50_ms']:8.3f} {r['p99_ms']:8.3f} "
+                      f"{r['mean_batch_windows']:6.1f} {r['mean_queue_ms']:9.3f} {r['dropped']:>8}")
@@ -0,0 +1,289 @@
+import argparse
+import multiprocessing as mp
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Single-producer / single-consumer ring buffer in shared memory
+#
+# The controller process pushes one (pose, motor) sample per tick; the
+# inference process reads the `history_size`-step window ending at a sample
+# as NumPy views of the shared block, ready to be used as lstm_input /
+# c1dnn_input of shape (1, history, D) without copying or allocating.
+#
+# Layout of the shared block:
+#
+#   header  int64[16]   [0] head: samples written (producer only)
+#                       [8] tail: next sample to read (consumer only)
+#                       head / tail sit on separate 64-byte lines
+#                       [11] pid of the creator's resource tracker
+#                       [12..15] capacity, history, d_x, d_f
+#   poses   float32 (2 × capacity, d_x)
+#   motors  float32 (2 × capacity, d_f)
+#
+# Sample n is written to rows n % capacity and n % capacity + capacity, so
+# the window of the `history` samples ending at n is always one contiguous
+# slice (the same doubled ring as the Dense branch of StreamingPredictor).
+#
+# No locks: each counter has a single writer. The producer fills both rows
+# before publishing head, and never writes into the rows of the window the
+# consumer may be reading (head − tail < capacity − history, with tail at
+# least history − 1, the end of the first window). Aligned int64
+# stores are atomic and, on x86-64, not reordered with the earlier data
+# stores; on weakly ordered CPUs (ARM) a reader could in principle see the new
+# head before the data.
+# -----------------------------------------------------------------------------
+
+HEADER_SLOTS = 16
+_HEAD, _TAIL, _TRACKER = 0, 8, 11
+_CAPACITY, _HISTORY, _D_X, _D_F = 12, 13, 14, 15
+
+
+def _tracker_pid():
+    resource_tracker.ensure_running()
+    return getattr(resource_tracker._resource_tracker, '_pid', None) or 0
+
+
+class SharedRing:
+    """
+    Shared-memory ring of (pose, motor) samples.
+
+    Create it in one process with `SharedRing.create(...)` and open it in the
+    other with `SharedRing.attach(name)`. One process pushes, the other reads.
+
+    Args:
+      shm    multiprocessing.shared_memory.SharedMemory holding the ring
+      owner  unlink the block on close()
+    """
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self._header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        capacity, history, d_x, d_f = (int(v) for v in self._header[_CAPACITY:])
+        self.capacity, self.history_size = capacity, history
+
+        offset = self._header.nbytes
+        self.poses = np.ndarray((2 * capacity, d_x), dtype=np.float32, buffer=shm.buf, offset=offset)
+        offset += self.poses.nbytes
+        self.motors = np.ndarray((2 * capacity, d_f), dtype=np.float32, buffer=shm.buf, offset=offset)
+
+    @staticmethod
+    def nbytes(capacity, d_x=7, d_f=4):
+        return 8 * HEADER_SLOTS + 4 * 2 * capacity * (d_x + d_f)
+
+    @classmethod
+    def create(cls, capacity=1024, history_size=20, d_x=7, d_f=4, name=None):
+        """
+        Allocate a new ring.
+
+        Args:
+          capacity      samples the ring holds; the producer can run ahead of
+                        the consumer by capacity − history_size samples
+          history_size  window length
+        """
+        if capacity <= history_size:
+            raise ValueError(f"capacity ({capacity}) must exceed history_size ({history_size})")
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.nbytes(capacity, d_x, d_f))
+        header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_TRACKER] = _tracker_pid()
+        header[_CAPACITY:] = (capacity, history_size, d_x, d_f)
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Open a ring created by another process."""
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)    # Python >= 3.13
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            # the creating process owns the block: keep a resource tracker of
+            # our own (spawned process) from unlinking it when we exit. Forked
+            # processes share the creator's tracker and must leave it registered.
+            creator = int(np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)[_TRACKER])
+            if creator != _tracker_pid():
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        del self._header, self.poses, self.motors
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- producer ---
+
+    @property
+    def head(self):
+        return int(self._header[_HEAD])
+
+    def _read_from(self):
+        # sample ending the next window to read; before the first peek() the
+        # tail is 0 but no window ends before sample history_size − 1
+        return max(int(self._header[_TAIL]), self.history_size - 1)
+
+    def free(self):
+        """Samples the producer can push before it would overwrite an unread window."""
+        return self.capacity - self.history_size - (self.head - self._read_from())
+
+    def push(self, pose, motor):
+        """
+        Append one sample. Returns False (and writes nothing) when the ring is full.
+        """
+        n = int(self._header[_HEAD])
+        if n - self._read_from() >= self.capacity - self.history_size:
+            return False
+        k = n % self.capacity
+        self.poses[k] = pose
+        self.poses[k + self.capacity] = pose
+        self.motors[k] = motor
+        self.motors[k + self.capacity] = motor
+        self._header[_HEAD] = n + 1                         # publish
+        return True
+
+    # --- consumer ---
+
+    @property
+    def tail(self):
+        return int(self._header[_TAIL])
+
+    def available(self):
+        """Complete windows that have not been consumed yet."""
+        head = int(self._header[_HEAD])
+        return max(0, head - self._read_from())
+
+    def _window(self, n):
+        stop = n % self.capacity + self.capacity + 1
+        start = stop - self.history_size
+        return self.poses[None, start:stop], self.motors[None, start:stop]
+
+    def peek(self):
+        """
+        Window ending at the oldest unconsumed sample.
+
+        Returns:
+          (x (1, history, d_x), f (1, history, d_f)) views into shared memory,
+          valid until `advance()`, or None when no complete window is available
+        """
+        n = self._read_from()
+        if n >= int(self._header[_HEAD]):
+            return None
+        self._header[_TAIL] = n
+        return self._window(n)
+
+    def advance(self):
+        """Release the window returned by `peek()`."""
+        self._header[_TAIL] += 1
+
+    def latest(self):
+        """
+        Window ending at the newest sample, skipping older unconsumed ones.
+
+        Returns:
+          views as in `peek()`, valid until `advance()`, or None
+        """
+        head = int(self._header[_HEAD])
+        if head < self.history_size:
+            return None
+        self._header[_TAIL] = head - 1
+        return self._window(head - 1)
+
+    def wait(self, timeout=None):
+        """Spin (yielding the CPU) until a window is available; returns `peek()`."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            window = self.peek()
+            if window is not None:
+                return window
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            time.sleep(0)
+
+
+# -----------------------------------------------------------------------------
+# Transport benchmark: shared ring vs multiprocessing.Queue
+# -----------------------------------------------------------------------------
+
+def _ring_producer(name, poses, motors):
+    ring = SharedRing.attach(name)
+    for pose, motor in zip(poses, motors):
+        while not ring.push(pose, motor):
+            time.sleep(0)
+    ring.close()
+
+
+def _queue_producer(q, poses, motors):
+    for pose, motor in zip(poses, motors):
+        q.put((pose, motor))
+    q.put(None)
+
+
+def transport_benchmark(samples=100_000, history_size=20, capacity=1024, seed=0):
+    """
+    Move `samples` ticks from a producer process to this process and assemble
+    every (1, history, D) window, once through SharedRing and once through a
+    multiprocessing.Queue of per-tick arrays (windows rebuilt with np.stack).
+
+    Returns:
+      dict transport → samples_per_s
+    """
+    rng = np.random.default_rng(seed)
+    poses = rng.standard_normal((samples, 7)).astype(np.float32)
+    motors = rng.standard_normal((samples, 4)).astype(np.float32)
+    report = {}
+
+    with SharedRing.create(capacity, history_size) as ring:
+        producer = mp.Process(target=_ring_producer, args=(ring.name, poses, motors))
+        t0 = time.perf_counter()
+        producer.start()
+        checksum = 0.0
+        for _ in range(samples - history_size + 1):
+            x, f = ring.wait()
+            checksum += x[0, -1, 0]
+            ring.advance()
+        report['shared_ring'] = samples / (time.perf_counter() - t0)
+        producer.join()
+
+    q = mp.Queue(maxsize=capacity)
+    producer = mp.Process(target=_queue_producer, args=(q, poses, motors))
+    t0 = time.perf_counter()
+    producer.start()
+    recent_x, recent_f = [], []
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        recent_x.append(item[0])
+        recent_f.append(item[1])
+        if len(recent_x) > history_size:
+            del recent_x[0], recent_f[0]
+        if len(recent_x) == history_size:
+            x, f = np.stack(recent_x)[None], np.stack(recent_f)[None]
+    report['mp_queue'] = samples / (time.perf_counter() - t0)
+    producer.join()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Shared-memory ring vs multiprocessing.Queue.')
+    parser.add_argument('--samples', type=int, default=100_000)
+    parser.add_argument('--history', type=int, default=20)
+    parser.add_argument('--capacity', type=int, default=1024)
+    args = parser.parse_args()
+
+    for transport, rate in transport_benchmark(args.samples, args.history, args.capacity).items():
+        print(f"{transport:>12}  {rate:12,.0f} samples/s")
@@ -0,0 +1,208 @@
+import numpy as np
+
+from tee_kinematics.numpy_runtime import activation
+from tee_kinematics.weights import from_keras, load_h5
+from tee_kinematics.windowing import strided_windows
+
+# -----------------------------------------------------------------------------
+# Stateful streaming inference
+#
+# At run time every control tick adds one pose/motor sample, but the windowed
+# model re-runs LSTM(256) over all `history_size` steps of the window on every
+# call. StreamingPredictor keeps LSTM state between ticks instead:
+#
+#   exact (default)  one LSTM state per window still being filled. Each tick
+#                    projects the new pose once, advances all in-flight states
+#                    with a single (history, u) @ (u, 4u) matmul, reads out the
+#                    state that has now seen `history_size` samples and restarts
+#                    it for the next window. Output equals the windowed model.
+#   carry            one state carried over the whole stream: a single LSTM step
+#                    per tick, but the LSTM sees an unbounded history instead of
+#                    the last `history_size` samples it was trained on, so the
+#                    output drifts from the windowed model (see
+#                    `validate_streaming`).
+#
+# The Dense branch works on each motor timestep independently, so only the
+# newest sample goes through Dense(256) → Dense(32) → Dense(4) on a tick; its
+# output is written into a ring buffer of the last `history_size` per-timestep
+# outputs. The ring is stored twice end to end, so the window in time order is
+# always one contiguous slice (the Flatten is a view).
+# Pure NumPy: weights come from `tee_kinematics.weights`, TensorFlow is not needed.
+# -----------------------------------------------------------------------------
+
+
+class StreamingPredictor:
+    """
+    Advance the CombinedModel one sample at a time.
+
+    Args:
+      weights       CombinedWeights, a Keras CombinedModel or the path of its .h5 file
+      history_size  window length the model was trained with
+      carry         carry a single LSTM state instead of reproducing the windows exactly
+
+    After `history_size` samples, step() returns the model output for the
+    window made of the last `history_size` samples, i.e. the prediction of the
+    next pose, exactly as model.predict on the same window.
+    """
+
+    def __init__(self, weights, history_size=20, carry=False):
+        if isinstance(weights, str):
+            weights = load_h5(weights)
+        elif not hasattr(weights, 'lstm'):
+            weights = from_keras(weights)
+        self.weights = weights
+        self.history_size = history_size
+        self.carry = carry
+
+        kernel, recurrent, bias = weights.lstm
+        self.units = recurrent.shape[0]
+        self.dtype = kernel.dtype
+        self._act = activation(weights.activation)
+        self._rec_act = activation(weights.recurrent_activation)
+
+        slots = 1 if carry else history_size
+        u = self.units
+        self._h = np.zeros((slots, u), dtype=self.dtype)
+        self._c = np.zeros((slots, u), dtype=self.dtype)
+        self._z = np.empty((slots, 4 * u), dtype=self.dtype)
+        self._xw = np.empty(4 * u, dtype=self.dtype)
+        self._tmp = np.empty((slots, u), dtype=self.dtype)
+
+        # first head Dense split into the rows fed by the LSTM branch and the Dense branch
+        w1, b1 = weights.head[0]
+        n_lstm = weights.lstm_dense[-1][0].shape[1]
+        self._head = (w1[:n_lstm], w1[n_lstm:], b1)
+
+        # per-timestep width of the flattened Dense branch output
+        d_motor = (weights.motor_dense[-1][0].shape[1] if weights.motor_dense
+                   else (w1.shape[0] - n_lstm) // history_size)
+        self._motor = np.zeros((2 * history_size, d_motor), dtype=self.dtype)
+        self.reset()
+
+    def reset(self):
+        """Forget all samples; the next `history_size` steps warm the predictor up."""
+        self._h[:] = 0
+        self._c[:] = 0
+        self._motor[:] = 0
+        self.samples = 0
+
+    @property
+    def ready(self):
+        return self.samples >= self.history_size
+
+    def _lstm_step(self, pose):
+        kernel, recurrent, bias = self.weights.lstm
+        u = self.units
+        h, c, z, tmp = self._h, self._c, self._z, self._tmp
+
+        if not self.carry:
+            # the slot that starts a new window this tick begins from zero state
+            slot = self.samples % self.history_size
+            h[slot] = 0
+            c[slot] = 0
+
+        np.matmul(pose, kernel, out=self._xw)
+        self._xw += bias
+        np.matmul(h, recurrent, out=z)
+        z += self._xw
+
+        i = self._rec_act(z[:, :u], z[:, :u])
+        f = self._rec_act(z[:, u:2 * u], z[:, u:2 * u])
+        g = self._act(z[:, 2 * u:3 * u], z[:, 2 * u:3 * u])
+        o = self._rec_act(z[:, 3 * u:], z[:, 3 * u:])
+
+        c *= f
+        np.multiply(i, g, out=tmp)
+        c += tmp
+        self._act(c, tmp)
+        np.multiply(o, tmp, out=h)
+
+        if self.carry:
+            return h[0]
+        # the slot that started history_size - 1 ticks ago has now seen a full window
+        return h[(self.samples + 1) % self.history_size]
+
+    def _dense_branch(self, motor_t):
+        y = np.asarray(motor_t, dtype=self.dtype)
+        for w, b in self.weights.motor_dense:
+            y = y @ w
+            y += b
+        # write the newest per-timestep output into both copies of the ring
+        k = self.samples % self.history_size
+        self._motor[k] = y
+        self._motor[k + self.history_size] = y
+        return self._motor[k + 1:k + 1 + self.history_size].reshape(-1)
+
+    def step(self, pose_t, motor_t):
+        """
+        Feed one (normalized) sample.
+
+        Args:
+          pose_t   pose sample (7,)
+          motor_t  motor sample (4,)
+
+        Returns:
+          prediction (7,), or None while fewer than `history_size` samples were seen
+        """
+        pose_t = np.asarray(pose_t, dtype=self.dtype)
+        h = self._lstm_step(pose_t)
+        motor = self._dense_branch(motor_t)
+
+        self.samples += 1
+        if not self.ready:
+            return None
+
+        x = h
+        for w, b in self.weights.lstm_dense:
+            x = x @ w
+            x += b
+        w1a, w1b, b1 = self._head
+        z = x @ w1a
+        z += motor @ w1b
+        z += b1
+        for w, b in self.weights.head[1:]:
+            z = z @ w
+            z += b
+        return z
+
+    def run(self, series_x, series_f):
+        """
+        Stream a whole (T, 7) / (T, 4) series through `step`.
+
+        Returns:
+          predictions (T - history_size + 1, 7); row k is the output for the
+          window series[k : k + history_size]
+        """
+        out = []
+        for pose_t, motor_t in zip(series_x, series_f):
+            pred = self.step(pose_t, motor_t)
+            if pred is not None:
+                out.append(pred)
+        return np.asarray(out).reshape(-1, self.weights.head[-1][0].shape[1])
+
+
+def validate_streaming(model, series_x, series_f, history_size=20, count=1000, carry=False):
+    """
+    Compare StreamingPredictor against model.predict on the same windows.
+
+    Args:
+      model             Keras CombinedModel
+      series_x          normalized pose series (T, 7)
+      series_f          normalized motor series (T, 4)
+      count             number of windows to compare (from the start of the series)
+      carry             validate the carried-state mode instead of the exact one
+
+    Returns:
+      dict with max_abs_err / mean_abs_err over all outputs
+    """
+    count = min(count, len(series_x) - history_size + 1)
+    x = np.ascontiguousarray(strided_windows(series_x, 0, count, history_size), dtype=np.float32)
+    f = np.ascontiguousarray(strided_windows(series_f, 0, count, history_size), dtype=np.float32)
+    expected = np.asarray(model.predict([x, f], verbose=0))
+
+    stream = StreamingPredictor(from_keras(model), history_size, carry=carry)
+    n = count + history_size - 1
+    got = stream.run(series_x[:n], series_f[:n])
+
+    err = np.abs(got - expected)
+    return {'windows': count, 'max_abs_err': float(err.max()), 'mean_abs_err': float(err.mean())}
@@ -0,0 +1,310 @@
+import argparse
+import concurrent.futures
+import math
+
+import numpy as np
+
+from tee_kinematics.metrics import (ANGLE_COLUMNS, AXES, POSITION_COLUMNS, metric_row, quaternion_angle_deg,
+                                    to_frame)
+
+# -----------------------------------------------------------------------------
+# Streaming metric accumulators
+#
+# `metrics.evaluate` needs every prediction of a split in memory. The
+# accumulators here take the same (n, 7) measured / predicted poses one batch
+# at a time and keep only
+#
+#   moments   count, mean and M2 (sum of squared deviations) of the position
+#             error e, |e|, the measured position t and the quaternion angle,
+#             combined per batch with Chan et al.'s parallel form of Welford's
+#             update:  MAE = mean|e|,  MSE = M2(e)/n + mean(e)²,
+#             R² = 1 − n·MSE / M2(t),  RMS angle = sqrt(M2/n + mean²)
+#   sketches  log-bucket histograms (DDSketch style) of the angle error and of
+#             the position error norm |e|₂: fixed number of buckets, every
+#             quantile within `alpha` relative error
+#
+# so memory does not grow with the stream. Two accumulators of the same split
+# (e.g. from worker processes, which can pickle them) merge exactly: the
+# merged moments equal those of the concatenated stream, sketch counts add.
+# The table rows match `metrics.evaluate` up to rounding, plus error bias /
+# std per axis, maximum angle and quantile columns.
+# -----------------------------------------------------------------------------
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """
+    Fixed-memory quantile sketch of non-negative values.
+
+    Values are counted in logarithmic buckets [γ^(i−1), γ^i), γ = (1 + α) / (1 − α),
+    so a quantile is returned within relative error α. Values outside
+    [min_value, max_value] are counted in the first / last bucket, zeros
+    separately.
+
+    Args:
+      alpha      relative accuracy
+      min_value  smallest value resolved
+      max_value  largest value resolved
+    """
+
+    def __init__(self, alpha=0.01, min_value=1e-6, max_value=1e3):
+        self.alpha = alpha
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self._offset = math.floor(math.log(min_value) / self._log_gamma)
+        bins = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.zeros = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return int(self.counts.sum()) + self.zeros
+
+    def update(self, values):
+        """Add a batch of values (any shape)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        index = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64) - self._offset
+        np.clip(index, 0, len(self.counts) - 1, out=index)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    def merge(self, other):
+        """Add the counts of a sketch with the same parameters."""
+        if (other.alpha, other.min_value, other.max_value) != (self.alpha, self.min_value, self.max_value):
+            raise ValueError("cannot merge sketches with different alpha / value range")
+        self.counts += other.counts
+        self.zeros += other.zeros
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Value at quantile q (scalar or sequence, in [0, 1]); NaN when empty."""
+        qs = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        total = len(self)
+        if total == 0:
+            out = np.full(qs.shape, np.nan)
+            return out if np.ndim(q) else float(out[0])
+        ranks = qs * (total - 1)
+        cumulative = self.zeros + np.cumsum(self.counts)
+        bucket = np.searchsorted(cumulative, ranks, side='right')
+        # bucket midpoint 2γ^i / (γ + 1), kept within the observed range
+        values = 2 * self.gamma ** (np.minimum(bucket, len(self.counts) - 1) + self._offset) / (self.gamma + 1)
+        values = np.where(ranks < self.zeros, 0.0, np.clip(values, self.min, self.max))
+        return values if np.ndim(q) else float(values[0])
+
+
+class _Moments:
+    # count, mean and M2 per column; batches and other instances are combined
+    # with the pairwise update of Chan, Golub & LeVeque
+
+    def __init__(self, width):
+        self.n = 0
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+
+    def _combine(self, n, mean, m2):
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += m2 + delta ** 2 * (self.n * n / total)
+        self.n = total
+
+    def update(self, values):
+        if len(values):
+            mean = values.mean(axis=0)
+            self._combine(len(values), mean, np.square(values - mean).sum(axis=0))
+
+    def merge(self, other):
+        self._combine(other.n, other.mean, other.m2)
+
+
+# columns of the per-batch moments
+_ERR, _ABS, _TRUE, _ANGLE = slice(0, 3), slice(3, 6), slice(6, 9), 9
+
+
+class MetricAccumulator:
+    """
+    Running metrics of one split, fed batch by batch.
+
+    Args:
+      alpha      relative accuracy of the quantile sketches
+      quantiles  quantiles reported by `row`
+    """
+
+    def __init__(self, alpha=0.01, quantiles=QUANTILES):
+        self.quantiles = tuple(quantiles)
+        self._moments = _Moments(10)
+        self.angle_sketch = QuantileSketch(alpha, min_value=1e-6, max_value=180.0)
+        self.position_sketch = QuantileSketch(alpha)
+
+    def __len__(self):
+        return self._moments.n
+
+    def update(self, measured, predicted):
+        """
+        Add a batch of (n, 7) measured / predicted poses (read only, any float dtype).
+        """
+        values = np.empty((len(measured), 10))
+        np.subtract(predicted[:, :3], measured[:, :3], out=values[:, _ERR])
+        np.abs(values[:, _ERR], out=values[:, _ABS])
+        values[:, _TRUE] = measured[:, :3]
+        values[:, _ANGLE] = quaternion_angle_deg(measured[:, 3:7], predicted[:, 3:7])
+        self._moments.update(values)
+        self.angle_sketch.update(values[:, _ANGLE])
+        self.position_sketch.update(np.linalg.norm(values[:, _ERR], axis=1))
+        return self
+
+    def merge(self, other):
+        """Fold in an accumulator of the same split (e.g. from another process)."""
+        self._moments.merge(other._moments)
+        self.angle_sketch.merge(other.angle_sketch)
+        self.position_sketch.merge(other.position_sketch)
+        return self
+
+    __iadd__ = merge
+
+    def row(self, config=None, split='all'):
+        """Table row with the columns of `metrics.evaluate` plus bias / std, max and quantile columns."""
+        m = self._moments
+        n = m.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            err_var = m.m2[_ERR] / n
+            mse = err_var + m.mean[_ERR] ** 2
+            ss_res, ss_tot = n * mse, m.m2[_TRUE]
+            r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.where(ss_res == 0, 1.0, 0.0))
+            angle_rms = math.sqrt(m.m2[_ANGLE] / n + m.mean[_ANGLE] ** 2) if n else math.nan
+        if not n:
+            r2[:] = np.nan
+            mae = mse = np.full(3, np.nan)
+            angle_mean = math.nan
+        else:
+            mae, angle_mean = m.mean[_ABS], m.mean[_ANGLE]
+
+        row = metric_row(config, split, n, mae, mse, r2, angle_mean, angle_rms)
+        for a, axis in enumerate(AXES):
+            row[f'Bias {axis}'] = float(m.mean[a]) if n else math.nan
+            row[f'Std {axis}'] = float(math.sqrt(err_var[a])) if n else math.nan
+        row['Max Angle Error (deg)'] = self.angle_sketch.max if n else math.nan
+        for q in self.quantiles:
+            row[f'Angle p{q * 100:g} (deg)'] = self.angle_sketch.quantile(q)
+        for q in self.quantiles:
+            row[f'Position Error p{q * 100:g}'] = self.position_sketch.quantile(q)
+        return row
+
+
+class StreamingEvaluator:
+    """
+    Accumulators per (configuration, split), in first-seen order.
+
+    >>> ev = StreamingEvaluator()
+    >>> for split, x, pred in stream:               # batches of any size
+    ...     ev.update(split, x[:, 1], pred, config='Zero')
+    >>> to_frame(ev.rows())
+
+    Args:
+      alpha, quantiles  see MetricAccumulator
+    """
+
+    def __init__(self, alpha=0.01, quantiles=QUANTILES):
+        self.alpha = alpha
+        self.quantiles = tuple(quantiles)
+        self.accumulators = {}
+
+    def accumulator(self, split, config=None):
+        key = (config, split)
+        if key not in self.accumulators:
+            self.accumulators[key] = MetricAccumulator(self.alpha, self.quantiles)
+        return self.accumulators[key]
+
+    def update(self, split, measured, predicted, config=None):
+        """Add a batch of (n, 7) poses to `split` of `config`."""
+        return self.accumulator(split, config).update(measured, predicted)
+
+    def merge(self, other):
+        """Fold in another evaluator (same alpha / quantiles), key by key."""
+        for (config, split), acc in other.accumulators.items():
+            self.accumulator(split, config).merge(acc)
+        return self
+
+    __iadd__ = merge
+
+    def rows(self):
+        return [acc.row(config, split) for (config, split), acc in self.accumulators.items()]
+
+    def frame(self):
+        """pandas DataFrame of `rows`, as `metrics.to_frame`."""
+        return to_frame(self.rows())
+
+
+def accumulate_config(run, batch_rows=65536, evaluator=None, alpha=0.01, quantiles=QUANTILES):
+    """
+    Stream one bundle configuration (ConfigResults) through an evaluator,
+    `batch_rows` rows of the memory maps at a time.
+    """
+    evaluator = evaluator or StreamingEvaluator(alpha, quantiles)
+    for split, (start, stop) in run.splits.items():
+        acc = evaluator.accumulator(split, run.name)
+        for i in range(start, stop, batch_rows):
+            j = min(i + batch_rows, stop)
+            acc.update(run.measured[i:j], run.predicted[i:j])
+    return evaluator
+
+
+def _accumulate_worker(path, name, batch_rows, alpha, quantiles):
+    from tee_kinematics.prediction_bundle import open_bundle
+
+    return accumulate_config(open_bundle(path)[name], batch_rows, alpha=alpha, quantiles=quantiles)
+
+
+def accumulate_bundle(path, names=None, batch_rows=65536, workers=1, alpha=0.01, quantiles=QUANTILES):
+    """
+    Streaming metrics of every configuration of a prediction bundle, in
+    bounded memory; with workers > 1 configurations are accumulated in
+    separate processes and the evaluators merged.
+
+    Returns:
+      StreamingEvaluator
+    """
+    from tee_kinematics.prediction_bundle import open_bundle
+
+    names = names or list(open_bundle(path))
+    evaluator = StreamingEvaluator(alpha, quantiles)
+    if workers <= 1:
+        bundle = open_bundle(path)
+        for name in names:
+            accumulate_config(bundle[name], batch_rows, evaluator)
+        return evaluator
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_accumulate_worker, path, name, batch_rows, alpha, quantiles) for name in names]
+        for future in futures:
+            evaluator.merge(future.result())
+    return evaluator
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Streaming metrics of a prediction bundle in bounded memory.')
+    parser.add_argument('bundle')
+    parser.add_argument('--names', nargs='*', default=None)
+    parser.add_argument('--batch-rows', type=int, default=65536)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--alpha', type=float, default=0.01, help='relative accuracy of the quantiles')
+    parser.add_argument('--csv', default=None)
+    args = parser.parse_args()
+
+    frame = accumulate_bundle(args.bundle, args.names, args.batch_rows, args.workers, args.alpha).frame()
+    extra = [c for c in frame.columns if c.startswith(('Max Angle', 'Angle p', 'Position Error p'))]
+    print(frame[POSITION_COLUMNS + ANGLE_COLUMNS + extra].to_string(float_format='%.4f'))
+    if args.csv:
+        frame.to_csv(args.csv)
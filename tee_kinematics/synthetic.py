@@ -0,0 +1,307 @@
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+import scipy.io as spio
+from scipy.signal import lfilter
+from scipy.spatial.transform import Rotation as R
+
+from tee_kinematics.dataset_store import TRIM_BOUNDS
+from tee_kinematics.pose_codec import PoseCodec
+
+# -----------------------------------------------------------------------------
+# Synthetic posecell / motorcell recordings
+#
+# The TEE_*_cellformat_Final.mat recordings are not in the repository. This
+# module writes stand-ins with the same layout (posecell (T, 7) = [x y z qx qy
+# qz qw] in metres / scalar-last unit quaternions, motorcell (T, 4) = [m_1 m_2
+# m_4 m_3] in radians), so the pipeline can be run and benchmarked at any scale.
+#
+# The motion model is a constant-curvature bending section:
+#   - m_1 / m_2 are smooth random knob trajectories (sums of sinusoids plus a
+#     slow random walk) that bend the tip in two planes
+#   - m_4 rolls the probe about the shaft, m_3 (the transducer angle) moves
+#     independently and does not affect the pose
+#   - the tip follows the knobs through a first-order lag and a saturating
+#     cable response, so the pose depends on the motor history, not just the
+#     current sample
+#   - the tube configuration (0°, 45°, 90°) rotates the bending base, and
+#     tracker noise is added to position and orientation
+# These are plausible shapes and magnitudes, not a fit to the private data.
+# -----------------------------------------------------------------------------
+
+# Configuration name → (output file, tube bend in degrees)
+CONFIGS = {
+    'Zero': ('TEE_zero_cellformat_Final.mat', 0.0),
+    '45':   ('TEE_45_cellformat_Final.mat', 45.0),
+    '90':   ('TEE_90_cellformat_Final.mat', 90.0),
+}
+
+SECTION_LENGTH_M = 0.05                          # bending section length
+BASE_OFFSET_M = np.array([0.12, 0.03, 0.25])     # tracker origin → bending base
+KNOB_RANGE_RAD = 2.0                             # m_1 / m_2 amplitude
+ROLL_RANGE_RAD = 0.8                             # m_4 amplitude
+MAX_BEND_RAD = 1.6                               # cable saturation
+LAG_SAMPLES = 15.0                               # tip lag behind the knobs
+POSITION_NOISE_M = 2e-4
+ORIENTATION_NOISE_DEG = 0.2
+
+
+def smooth_signal(n, rng, amplitude, periods=(400, 6000), components=6, walk=0.02):
+    """Band-limited random trajectory of `n` samples in [-amplitude, amplitude] (approx.)."""
+    t = np.arange(n, dtype=np.float64)
+    freq = 1.0 / rng.uniform(*periods, size=components)
+    phase = rng.uniform(0, 2 * np.pi, size=components)
+    weight = rng.dirichlet(np.ones(components))
+    signal = np.sin(2 * np.pi * freq[:, None] * t[None, :] + phase[:, None]).T @ weight
+    # slow drift, kept bounded by a leaky integrator
+    drift = lfilter([walk], [1.0, -(1.0 - 1e-3)], rng.standard_normal(n))
+    return amplitude * np.tanh(1.5 * (signal + drift))
+
+
+def synthetic_motor(n, rng):
+    """motorcell (n, 4) = [m_1 m_2 m_4 m_3] in radians."""
+    return np.column_stack([
+        smooth_signal(n, rng, KNOB_RANGE_RAD),
+        smooth_signal(n, rng, KNOB_RANGE_RAD),
+        smooth_signal(n, rng, ROLL_RANGE_RAD, periods=(2000, 20000)),
+        smooth_signal(n, rng, np.pi / 2, periods=(1000, 8000)),
+    ])
+
+
+def _lag(x, samples):
+    alpha = 1.0 / samples
+    return lfilter([alpha], [1.0, -(1.0 - alpha)], x, axis=0)
+
+
+def synthetic_pose(motor, bend_deg, rng, noise=True):
+    """
+    posecell (n, 7) for a motor trajectory under the constant-curvature model.
+
+    Args:
+      motor     motorcell (n, 4)
+      bend_deg  tube configuration bend (0, 45, 90)
+    """
+    lagged = _lag(motor, LAG_SAMPLES)
+    bend_x = MAX_BEND_RAD * np.tanh(lagged[:, 0] / KNOB_RANGE_RAD)
+    bend_y = MAX_BEND_RAD * np.tanh(lagged[:, 1] / KNOB_RANGE_RAD)
+    theta = np.hypot(bend_x, bend_y)
+    phi = np.arctan2(bend_y, bend_x)
+
+    # tip of a constant-curvature arc; sinc forms stay finite at theta = 0
+    radial = SECTION_LENGTH_M * theta / 2 * np.sinc(theta / (2 * np.pi)) ** 2
+    axial = SECTION_LENGTH_M * np.sinc(theta / np.pi)
+    tip = np.column_stack([radial * np.cos(phi), radial * np.sin(phi), axial])
+    bend = R.from_rotvec(theta[:, None] * np.column_stack([-np.sin(phi), np.cos(phi),
+                                                           np.zeros_like(phi)]))
+
+    roll = R.from_euler('z', lagged[:, 2:3])
+    tube = R.from_euler('x', bend_deg, degrees=True)
+    frame = tube * roll
+
+    position = BASE_OFFSET_M + frame.apply(tip)
+    orientation = frame * bend
+    if noise:
+        position = position + rng.normal(0, POSITION_NOISE_M, position.shape)
+        jitter = R.from_rotvec(rng.normal(0, np.deg2rad(ORIENTATION_NOISE_DEG), (len(motor), 3)))
+        orientation = jitter * orientation
+    return np.hstack([position, orientation.as_quat(canonical=True)])
+
+
+def synthetic_recording(n_samples, bend_deg=0.0, seed=None):
+    """
+    One synthetic recording.
+
+    Returns:
+      posecell (n, 7), motorcell (n, 4)
+    """
+    rng = np.random.default_rng(seed)
+    motor = synthetic_motor(n_samples, rng)
+    return synthetic_pose(motor, bend_deg, rng), motor
+
+
+def scaled_trim(filename, scale):
+    """Trim bounds of a configuration stretched `scale`× (same start, longer span)."""
+    start, end = TRIM_BOUNDS[filename]
+    return start, start + int(round(scale * (end - start)))
+
+
+def write_cellformat(path, posecell, motorcell):
+    """Write a TEE_*_cellformat_Final.mat file (posecell / motorcell)."""
+    spio.savemat(path, {'posecell': posecell, 'motorcell': motorcell}, do_compression=False)
+
+
+def generate_dataset(out_dir, scale=1.0, seed=0, configs=CONFIGS):
+    """
+    Write synthetic TEE_{zero,45,90}_cellformat_Final.mat files.
+
+    Each recording holds the notebook's trim window stretched `scale`× (1×
+    is the 14k-sample split) plus the samples before its start.
+
+    Returns:
+      dict name → dict(path=, start=, end=)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    out = {}
+    for k, (name, (filename, bend_deg)) in enumerate(configs.items()):
+        start, end = scaled_trim(filename, scale)
+        posecell, motorcell = synthetic_recording(end, bend_deg, seed=seed + k)
+        path = os.path.join(out_dir, filename)
+        write_cellformat(path, posecell, motorcell)
+        out[name] = {'path': path, 'start': start, 'end': end}
+    return out
+
+
+# -----------------------------------------------------------------------------
+# End-to-end throughput: load → normalize → window → fit → predict → export
+# -----------------------------------------------------------------------------
+
+CO_P = 1
+MAGIC_NUMBER = 0.005
+
+
+def normalize_recording(posecell, motorcell):
+    """
+    Notebook normalization ("TEE_Zero / TEE_45 / TEE_90" cells): z-score the
+    pose per recording, scale by co_p, motors × magic_number.
+
+    Returns:
+      x, f, mean, std
+    """
+    codec, x = PoseCodec.fit_encode(posecell, CO_P, motor_scale=MAGIC_NUMBER)
+    return x, codec.encode_motor(motorcell), codec.mean, codec.std
+
+
+def pipeline_benchmark(out_dir, scale=1.0, epochs=1, max_steps=None, history_size=20,
+                       batch_size=32, predict_batch=1024, seed=0):
+    """
+    Time every stage of the training/evaluation pipeline on synthetic data.
+
+    Args:
+      out_dir        where the .mat files, stores, the prediction bundle and exports are written
+      scale          recording length relative to the 14k-sample splits
+      epochs         epochs of the mixed training stream
+      max_steps      cap on steps per epoch (None → one pass over the training windows)
+      batch_size     training batch
+      predict_batch  prediction batch
+
+    Returns:
+      dict stage → dict(seconds=, and samples/s or windows/s)
+    """
+    from tee_kinematics.dataset_store import open_cellformat
+    from tee_kinematics.mixed_training import mixed_datasets
+    from tee_kinematics.model import build_combined_model
+    from tee_kinematics.prediction_bundle import export_matlab, save_bundle
+    from tee_kinematics.windowing import joint_windows
+
+    report = {}
+
+    def stage(name, t0, **rates):
+        report[name] = dict(seconds=time.perf_counter() - t0, **rates)
+
+    t0 = time.perf_counter()
+    files = generate_dataset(out_dir, scale, seed)
+    samples = sum(info['end'] - info['start'] for info in files.values())
+    stage('generate', t0, samples_per_s=samples / (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    raw = {}
+    for name, info in files.items():
+        store = open_cellformat(info['path'], info['start'], info['end'])
+        raw[name] = (np.asarray(store.trimmed('posecell')), np.asarray(store.trimmed('motorcell')))
+    stage('load', t0, samples_per_s=samples / (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    series, stats = {}, {}
+    for name, (posecell, motorcell) in raw.items():
+        x, f, mean, std = normalize_recording(posecell, motorcell)
+        series[name], stats[name] = (x, f), (mean, std)
+    stage('normalize', t0, samples_per_s=samples / (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    windows, configs = {}, {}
+    for name, (x, f) in series.items():
+        train_end, val_end = math.floor(0.7 * len(x)), math.floor(0.9 * len(x))
+        windows[name] = joint_windows(x, f, train_end, val_end, history_size, 0)
+        configs[name] = dict(x=x, f=f, train_end=train_end, val_end=val_end)
+    n_windows = sum(len(w.x) for splits in windows.values() for w in splits.values())
+    stage('window', t0, windows_per_s=n_windows / (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    model = build_combined_model((history_size, 7), (history_size, 4))
+    train, steps, _, _ = mixed_datasets(configs, history_size, 0, batch_size, seed=seed)
+    steps = min(steps, max_steps) if max_steps else steps
+    model.fit(train, epochs=epochs, steps_per_epoch=steps, verbose=0)
+    stage('fit', t0, windows_per_s=epochs * steps * batch_size / (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    predictions = {}
+    for name, splits in windows.items():
+        predictions[name] = [model.predict([w.x, w.f], batch_size=predict_batch, verbose=0)
+                             for w in splits.values()]
+    stage('predict', t0, windows_per_s=n_windows / (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    bundle = os.path.join(out_dir, 'predictions.bundle')
+    for name, splits in windows.items():
+        codec = PoseCodec(*stats[name], CO_P, motor_scale=MAGIC_NUMBER)
+        truth = codec.decode(np.concatenate([w.x[:, 1, :] for w in splits.values()]))
+        pred = codec.decode(np.concatenate(predictions[name]))
+        save_bundle(bundle, name, truth, pred, {k: len(w.x) for k, w in splits.items()}, codec)
+    stage('bundle', t0, windows_per_s=n_windows / (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    export_matlab(bundle, out_dir)
+    stage('export', t0, windows_per_s=n_windows / (time.perf_counter() - t0))
+
+    report['total'] = {'seconds': sum(r['seconds'] for r in report.values()),
+                       'samples': samples, 'windows': n_windows, 'scale': scale}
+    return report
+
+
+def print_report(report):
+    for name, r in report.items():
+        if name == 'total':
+            print(f"{'total':>10} {r['seconds']:9.2f} s  ({r['samples']} samples, "
+                  f"{r['windows']} windows, scale {r['scale']}×)")
+            continue
+        rate = ', '.join(f"{k.replace('_per_s', '')}/s={v:,.0f}" for k, v in r.items() if k != 'seconds')
+        print(f"{name:>10} {r['seconds']:9.2f} s  {rate}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Synthetic TEE recordings and pipeline benchmark.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    gen = sub.add_parser('generate', help='write synthetic TEE_*_cellformat_Final.mat files')
+    gen.add_argument('out_dir')
+    gen.add_argument('--scale', type=float, default=1.0)
+    gen.add_argument('--seed', type=int, default=0)
+
+    bench = sub.add_parser('bench', help='end-to-end throughput on synthetic data')
+    bench.add_argument('out_dir')
+    bench.add_argument('--scale', type=float, nargs='+', default=[1.0])
+    bench.add_argument('--epochs', type=int, default=1)
+    bench.add_argument('--max-steps', type=int, default=None)
+    bench.add_argument('--batch-size', type=int, default=32)
+    bench.add_argument('--seed', type=int, default=0)
+    bench.add_argument('--json', default=None)
+
+    args = parser.parse_args()
+    if args.command == 'generate':
+        for name, info in generate_dataset(args.out_dir, args.scale, args.seed).items():
+            print(f"{name:>5} → {info['path']}  trim=({info['start']}, {info['end']})")
+    else:
+        reports = []
+        for scale in args.scale:
+            report = pipeline_benchmark(os.path.join(args.out_dir, f'scale_{scale:g}'), scale,
+                                        args.epochs, args.max_steps, batch_size=args.batch_size,
+                                        seed=args.seed)
+            print_report(report)
+            reports.append(report)
+        if args.json:
+            with open(args.json, 'w') as fh:
+                json.dump(reports, fh, indent=2)
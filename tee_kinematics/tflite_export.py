@@ -0,0 +1,319 @@
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+from tee_kinematics.benchmark import split_inputs_by_width, summarize, time_calls
+from tee_kinematics.metrics import quaternion_angle_deg
+from tee_kinematics.pose_codec import PoseCodec
+
+# -----------------------------------------------------------------------------
+# TFLite export with quantization
+#
+#   float32  plain conversion
+#   float16  weights stored as float16, dequantized at load
+#   dynamic  dynamic-range quantization: int8 weights, float activations
+#   int8     full-integer quantization calibrated on training windows; the
+#            model keeps float32 inputs / outputs (QUANTIZE / DEQUANTIZE at the
+#            edges), so every variant runs through the same predictor
+#
+# The converter cannot lower the LSTM's while loop with a dynamic batch, and
+# int8 calibration of the loop crashes, so the model is exported from a copy
+# whose LSTM is unrolled over the (fixed) 20-step window. The weights are
+# shared, the unrolled graph is the same computation.
+#
+# `quantization_report` converts every variant, times batch-1 calls and
+# computes the notebook metrics (position RMSE, quaternion angle error) per
+# configuration, next to the Keras model as reference.
+# -----------------------------------------------------------------------------
+
+VARIANTS = ('float32', 'float16', 'dynamic', 'int8')
+
+
+def unrolled_copy(model):
+    """Copy of a Keras model with every LSTM unrolled, sharing the trained weights."""
+    import tensorflow as tf
+
+    def clone(layer):
+        config = layer.get_config()
+        if isinstance(layer, tf.keras.layers.LSTM):
+            config['unroll'] = True
+        return layer.__class__.from_config(config)
+
+    copy = tf.keras.models.clone_model(model, clone_function=clone)
+    copy.set_weights(model.get_weights())
+    return copy
+
+
+def representative_windows(configs, history_size=20, count=300, seed=0):
+    """
+    Calibration data for full-integer quantization: windows drawn uniformly
+    from the training split of every configuration.
+
+    Args:
+      configs  dict name → dict(x=, f=, train_end=, ...) as in `mixed_datasets`
+      count    windows per configuration
+
+    Returns:
+      generator function yielding {'lstm_input': (1, history, 7), 'c1dnn_input': (1, history, 4)}
+    """
+    rng = np.random.default_rng(seed)
+    picks = []
+    for cfg in configs.values():
+        ends = rng.integers(history_size, cfg['train_end'], size=count)
+        picks.extend((cfg['x'], cfg['f'], end) for end in ends)
+    rng.shuffle(picks)
+
+    def generate():
+        for x, f, end in picks:
+            yield {'lstm_input': np.asarray(x[None, end - history_size:end], dtype=np.float32),
+                   'c1dnn_input': np.asarray(f[None, end - history_size:end], dtype=np.float32)}
+
+    return generate
+
+
+def convert(model, variant='float32', representative=None):
+    """
+    Convert a two-input CombinedModel to a TFLite flatbuffer.
+
+    Args:
+      model           Keras model with inputs (lstm_input, c1dnn_input)
+      variant         one of VARIANTS
+      representative  generator function from `representative_windows` (int8 only)
+
+    Returns:
+      flatbuffer bytes
+    """
+    import tempfile
+
+    import tensorflow as tf
+
+    if variant not in VARIANTS:
+        raise ValueError(f"unknown variant {variant!r}, expected one of {VARIANTS}")
+    if variant == 'int8' and representative is None:
+        raise ValueError("int8 quantization needs a representative dataset")
+
+    (_, history, d_x), (_, _, d_f) = (tuple(t.shape) for t in model.inputs)
+    signature = [[tf.TensorSpec((None, history, d_x), tf.float32, name='lstm_input'),
+                  tf.TensorSpec((None, history, d_f), tf.float32, name='c1dnn_input')]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        unrolled_copy(model).export(tmp, format='tf_saved_model', input_signature=signature,
+                                    verbose=False)
+        converter = tf.lite.TFLiteConverter.from_saved_model(tmp)
+        if variant != 'float32':
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if variant == 'float16':
+            converter.target_spec.supported_types = [tf.float16]
+        elif variant == 'int8':
+            converter.representative_dataset = representative
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        return converter.convert()
+
+
+class TFLiteModel:
+    """
+    TFLite interpreter with the model.predict([x, f]) interface.
+
+    Uses tflite_runtime when installed, otherwise tf.lite. The batch dimension
+    is resized on demand.
+
+    Args:
+      model    path to a .tflite file or flatbuffer bytes
+      threads  interpreter threads (None → default)
+    """
+
+    def __init__(self, model, threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        if isinstance(model, (bytes, bytearray)):
+            self.interpreter = Interpreter(model_content=bytes(model), num_threads=threads or None)
+        else:
+            self.interpreter = Interpreter(model_path=model, num_threads=threads or None)
+        self._x_in, self._f_in = split_inputs_by_width(self.interpreter.get_input_details(),
+                                                       lambda d: d['shape'][-1], 7)
+        self._output = self.interpreter.get_output_details()[0]['index']
+        self._batch = None
+
+    def predict_on_batch(self, inputs):
+        x, f = inputs
+        interpreter = self.interpreter
+        if self._batch != len(x):
+            interpreter.resize_tensor_input(self._x_in['index'], x.shape)
+            interpreter.resize_tensor_input(self._f_in['index'], f.shape)
+            interpreter.allocate_tensors()
+            self._batch = len(x)
+        interpreter.set_tensor(self._x_in['index'], np.asarray(x, dtype=self._x_in['dtype']))
+        interpreter.set_tensor(self._f_in['index'], np.asarray(f, dtype=self._f_in['dtype']))
+        interpreter.invoke()
+        return interpreter.get_tensor(self._output).copy()
+
+    __call__ = predict_on_batch
+
+    def predict(self, inputs, batch_size=256):
+        """Predictions (N, 7) for inputs [x, f], in batches of batch_size."""
+        x, f = inputs
+        return np.concatenate([self.predict_on_batch([x[i:i + batch_size], f[i:i + batch_size]])
+                               for i in range(0, len(x), batch_size)])
+
+
+def pose_metrics(truth, pred, mean=None, std=None, co_p=1):
+    """
+    Position and orientation error of the notebook evaluation cells.
+
+    With mean / std the notebook normalization is undone first and positions
+    are reported in mm; otherwise errors are in the units of the inputs.
+
+    Args:
+      truth, pred  (N, 7) [x y z qx qy qz qw]
+
+    Returns:
+      dict pos_rmse, pos_mae, angle_mean_deg, angle_rmse_deg
+    """
+    truth = np.asarray(truth, dtype=np.float64)
+    pred = np.asarray(pred, dtype=np.float64)
+    pos_scale = 1.0
+    if mean is not None:
+        codec = PoseCodec(mean, std, co_p)
+        truth, pred = codec.decode(truth), codec.decode(pred)
+        pos_scale = 1e3
+
+    err = (truth[:, :3] - pred[:, :3]) * pos_scale
+    angles = quaternion_angle_deg(truth[:, 3:7], pred[:, 3:7])
+    return {
+        'pos_rmse': float(np.sqrt(np.mean(err ** 2))),
+        'pos_mae': float(np.mean(np.abs(err))),
+        'angle_mean_deg': float(angles.mean()),
+        'angle_rmse_deg': float(np.sqrt(np.mean(angles ** 2))),
+    }
+
+
+def load_configs(data_dir):
+    """
+    Trimmed, normalized recordings of the three configurations in `data_dir`,
+    as the notebooks prepare them.
+
+    Returns:
+      dict name → dict(x=, f=, train_end=, val_end=, mean=, std=)
+    """
+    from tee_kinematics.dataset_store import TRIM_BOUNDS, open_cellformat
+    from tee_kinematics.synthetic import CONFIGS, normalize_recording
+
+    configs = {}
+    for name, (filename, _) in CONFIGS.items():
+        start, end = TRIM_BOUNDS[filename]
+        store = open_cellformat(os.path.join(data_dir, filename), start, end)
+        x, f, mean, std = normalize_recording(np.asarray(store.trimmed('posecell')),
+                                              np.asarray(store.trimmed('motorcell')))
+        configs[name] = dict(x=x, f=f, train_end=math.floor(0.7 * len(x)),
+                             val_end=math.floor(0.9 * len(x)), mean=mean, std=std)
+    return configs
+
+
+def _evaluate(predict, windows, configs, batch_size):
+    metrics, preds = {}, {}
+    for name, w in windows.items():
+        preds[name] = predict([w.x, w.f], batch_size)
+        cfg = configs[name]
+        # truth as in the notebook evaluation / export cells: x[:, 1, :]
+        metrics[name] = pose_metrics(w.x[:, 1, :], preds[name], cfg.get('mean'), cfg.get('std'))
+    return metrics, preds
+
+
+def _latency(predict_on_batch, window):
+    x, f = window
+    return summarize(time_calls(lambda a, b: predict_on_batch([a, b]), x, f), 1)
+
+
+def quantization_report(model, configs, out_dir, variants=VARIANTS, history_size=20, split='test',
+                        threads=1, calibration=300, batch_size=256, seed=0):
+    """
+    Export every TFLite variant and compare them with the Keras model.
+
+    Args:
+      model        Keras CombinedModel
+      configs      dict name → dict(x=, f=, train_end=, val_end=[, mean=, std=])
+      out_dir      where the .tflite files are written
+      split        windows to evaluate on ('train' / 'val' / 'test')
+      threads      interpreter threads for the latency measurement
+      calibration  representative windows per configuration (int8)
+
+    Returns:
+      list of dicts, one per variant (the Keras model first):
+        variant, path, size_bytes, p50_ms, p99_ms, max_abs_err (vs Keras),
+        configs → name → `pose_metrics`
+    """
+    from tee_kinematics.windowing import joint_windows
+
+    os.makedirs(out_dir, exist_ok=True)
+    windows = {name: joint_windows(cfg['x'], cfg['f'], cfg['train_end'], cfg['val_end'],
+                                   history_size, 0)[split]
+               for name, cfg in configs.items()}
+    first = next(iter(windows.values()))
+    window = (np.asarray(first.x[:1], dtype=np.float32), np.asarray(first.f[:1], dtype=np.float32))
+
+    keras_predict = lambda inputs, batch: model.predict(inputs, batch_size=batch, verbose=0)
+    metrics, reference = _evaluate(keras_predict, windows, configs, batch_size)
+    timing = _latency(model.predict_on_batch, window)
+    rows = [{'variant': 'keras', 'path': None, 'size_bytes': None, 'p50_ms': timing['p50_ms'],
+             'p99_ms': timing['p99_ms'], 'max_abs_err': 0.0, 'configs': metrics}]
+
+    representative = representative_windows(configs, history_size, calibration, seed)
+    for variant in variants:
+        flatbuffer = convert(model, variant, representative if variant == 'int8' else None)
+        path = os.path.join(out_dir, f'{model.name}_{variant}.tflite')
+        with open(path, 'wb') as fh:
+            fh.write(flatbuffer)
+
+        lite = TFLiteModel(path, threads)
+        metrics, preds = _evaluate(lite.predict, windows, configs, batch_size)
+        err = max(float(np.abs(preds[name] - reference[name]).max()) for name in windows)
+        timing = _latency(lite.predict_on_batch, window)
+        rows.append({'variant': variant, 'path': path, 'size_bytes': len(flatbuffer),
+                     'p50_ms': timing['p50_ms'], 'p99_ms': timing['p99_ms'], 'max_abs_err': err,
+                     'configs': metrics})
+    return rows
+
+
+def print_report(rows):
+    names = list(rows[0]['configs'])
+    header = ''.join(f"{name + ' pos':>11} {name + ' ang°':>10}" for name in names)
+    print(f"{'variant':>8} {'size kB':>8} {'p50 ms':>7} {'max err':>9}{header}")
+    for r in rows:
+        size = f"{r['size_bytes'] / 1024:8.0f}" if r['size_bytes'] else f"{'-':>8}"
+        cells = ''.join(f"{r['configs'][n]['pos_rmse']:11.4f} {r['configs'][n]['angle_mean_deg']:10.3f}"
+                        for n in names)
+        print(f"{r['variant']:>8} {size} {r['p50_ms']:7.3f} {r['max_abs_err']:9.2e}{cells}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Export a CombinedModel to TFLite (float32 / float16 / dynamic / int8) '
+                    'and report accuracy per configuration.')
+    parser.add_argument('model', help='model saved with model.save(...h5 / .keras)')
+    parser.add_argument('data_dir', help='directory with the TEE_*_cellformat_Final.mat files')
+    parser.add_argument('out_dir')
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument('--history', type=int, default=20)
+    parser.add_argument('--split', choices=('train', 'val', 'test'), default='test')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--calibration', type=int, default=300)
+    parser.add_argument('--json', default=None)
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    keras_model = tf.keras.models.load_model(args.model, compile=False)
+    rows = quantization_report(keras_model, load_configs(args.data_dir), args.out_dir,
+                               args.variants, args.history, args.split, args.threads,
+                               args.calibration)
+    print_report(rows)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(rows, fh, indent=2)
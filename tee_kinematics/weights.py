@@ -0,0 +1,192 @@
+import json
+from collections import namedtuple
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# CombinedModel weights as plain NumPy arrays
+#
+# The streaming / NumPy inference paths only need the kernels, not the Keras
+# graph. CombinedWeights holds them in forward-pass order:
+#
+#   lstm         (kernel (D_x, 4u), recurrent (u, 4u), bias (4u,)), gates i, f, c, o
+#   lstm_dense   [(W, b), ...] Dense(256) → Dense(64) → Dense(7) after the LSTM
+#   motor_dense  [(W, b), ...] Dense(256) → Dense(32) → Dense(4) per timestep
+#   head         [(W, b), ...] Dense(14) → final_output on [lstm_out, flatten(motor)]
+#   activation, recurrent_activation  LSTM activation names
+#
+# The layers are found from the functional model config (the JSON Keras
+# stores in .h5 files and returns from model.get_config()), by following each
+# input through the graph up to the Concatenate and from there to the output.
+# Both the tf.keras 2 layout (nested LSTM_branch / Dense_branch models,
+# inbound nodes as [name, node, tensor, kwargs] lists) and the Keras 3 layout
+# (flat layers, inbound nodes as keras_history) are handled.
+# -----------------------------------------------------------------------------
+
+CombinedWeights = namedtuple(
+    'CombinedWeights',
+    ['lstm', 'lstm_dense', 'motor_dense', 'head', 'activation', 'recurrent_activation'])
+
+
+def _check_linear(config):
+    if config.get('activation', 'linear') != 'linear':
+        raise ValueError(f"Dense layer {config.get('name')!r} has activation "
+                         f"{config['activation']!r}; the CombinedModel Dense layers are linear")
+
+
+def _inbound_names(nodes):
+    if isinstance(nodes, dict):
+        history = nodes['config'].get('keras_history') if isinstance(nodes.get('config'), dict) else None
+        if history:
+            return [history[0]]
+        return [name for value in nodes.values() for name in _inbound_names(value)]
+    if isinstance(nodes, (list, tuple)):
+        if len(nodes) >= 3 and isinstance(nodes[0], str) and isinstance(nodes[1], int):
+            return [nodes[0]]
+        return [name for value in nodes for name in _inbound_names(value)]
+    return []
+
+
+def _layer_refs(refs):
+    # [[name, node, tensor], ...], or a single [name, node, tensor] in Keras 3
+    if refs and isinstance(refs[0], str):
+        refs = [refs]
+    return [ref[0] for ref in refs]
+
+
+def _of_type(chain, cls):
+    return [layer for layer in chain if layer[0] == cls]
+
+
+def _flatten_config(config):
+    """
+    Layer configs of a functional model with nested models inlined.
+
+    Returns:
+      list of (class_name, name, config, inbound layer names), in config order
+    """
+    layers = []
+    for layer in config['layers']:
+        inbound = _inbound_names(layer.get('inbound_nodes', []))
+        if 'layers' in layer['config']:
+            inner = _flatten_config(layer['config'])
+            # the nested model's input layers stand for the outer inbound tensors,
+            # an alias entry for its output layer stands for the nested model itself
+            outer = {name: inbound for name in _layer_refs(layer['config']['input_layers'])}
+            for cls, name, cfg, inb in inner:
+                if cls != 'InputLayer':
+                    layers.append((cls, name, cfg, [n for i in inb for n in outer.get(i, [i])]))
+            out_name = _layer_refs(layer['config']['output_layers'])[0]
+            layers.append(('Alias', layer['config']['name'], {}, [out_name]))
+        else:
+            layers.append((layer['class_name'], layer['config']['name'], layer['config'], inbound))
+    return layers
+
+
+def _chain(layers, name):
+    """
+    Layers applied one after another to the output of layer `name`, up to (and
+    including) the first layer with several inputs, or to the model output.
+    """
+    chain = []
+    while True:
+        consumers = [layer for layer in layers if name in layer[3]]
+        if not consumers:
+            return chain
+        layer = consumers[0]
+        chain.append(layer)
+        if len(layer[3]) > 1:
+            return chain
+        name = layer[1]
+
+
+def _combined(config, arrays_of, dtype):
+    """
+    Assemble CombinedWeights from a functional model config.
+
+    Args:
+      config     model config dict (with 'layers' / 'input_layers')
+      arrays_of  fn(layer name) → list of that layer's weight arrays
+    """
+    layers = _flatten_config(config)
+    branches = [_chain(layers, name) for name in _layer_refs(config['input_layers'])]
+    lstm_chain, motor_chain = sorted(branches, key=lambda chain: not _of_type(chain, 'LSTM'))
+    concat = lstm_chain[-1]
+    # the head kernel rows are split as [LSTM branch, Dense branch]
+    if concat[3][0] not in [name for _, name, _, _ in lstm_chain]:
+        raise ValueError("expected the LSTM branch as the first Concatenate input")
+    head = _chain(layers, concat[1])
+
+    def arrays(name):
+        return tuple(np.asarray(w, dtype=dtype) for w in arrays_of(name))
+
+    def dense(chain):
+        out = []
+        for _, name, cfg, _ in _of_type(chain, 'Dense'):
+            _check_linear(cfg)
+            out.append(arrays(name))
+        return out
+
+    _, lstm_name, lstm_cfg, _ = _of_type(lstm_chain, 'LSTM')[0]
+    return CombinedWeights(
+        lstm=arrays(lstm_name),
+        lstm_dense=dense(lstm_chain),
+        motor_dense=dense(motor_chain),
+        head=dense(head),
+        activation=lstm_cfg.get('activation', 'tanh'),
+        recurrent_activation=lstm_cfg.get('recurrent_activation', 'sigmoid'),
+    )
+
+
+def from_keras(model, dtype=np.float32):
+    """
+    Pull the CombinedModel kernels out of a built Keras model.
+
+    Works for models from `tee_kinematics.model.build_combined_model` and for
+    the notebooks' smrs_*.h5 files, whether or not the branches are nested models.
+    """
+    by_name = {}
+
+    def collect(m):
+        for layer in m.layers:
+            by_name[layer.name] = layer
+            if hasattr(layer, 'layers'):
+                collect(layer)
+
+    collect(model)
+    return _combined(model.get_config(), lambda name: by_name[name].get_weights(), dtype)
+
+
+def _h5_arrays(group):
+    """layer name → list of weight datasets, in saved order."""
+    arrays = {}
+    for layer_name in group.attrs.get('layer_names', list(group)):
+        layer_name = layer_name.decode() if isinstance(layer_name, bytes) else layer_name
+        sub = group[layer_name]
+        for weight_name in sub.attrs.get('weight_names', []):
+            weight_name = weight_name.decode() if isinstance(weight_name, bytes) else weight_name
+            # '<layer>/kernel:0' (tf.keras 2) or '<layer>/kernel' (Keras 3); for a nested
+            # model the group holds the weights of all its layers
+            owner = weight_name.split('/')[0]
+            arrays.setdefault(owner, []).append(sub[weight_name])
+    return arrays
+
+
+def load_h5(path, dtype=np.float32):
+    """
+    Read the CombinedModel kernels straight from a Keras .h5 file (h5py only).
+
+    model.save("smrs_v2_2041.h5") stores the architecture as JSON in the
+    'model_config' attribute and the arrays under 'model_weights/<layer>/...'.
+
+    Returns:
+      CombinedWeights, identical to `from_keras(tf.keras.models.load_model(path))`
+    """
+    import h5py
+
+    with h5py.File(path, 'r') as f:
+        config = f.attrs['model_config']
+        config = json.loads(config.decode() if isinstance(config, bytes) else config)['config']
+        group = f['model_weights'] if 'model_weights' in f else f
+        arrays = _h5_arrays(group)
+        return _combined(config, arrays.__getitem__, dtype)
@@ -0,0 +1,162 @@
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# -----------------------------------------------------------------------------
+# Sliding windows as strided views
+#
+# multivariate_data used to copy every window into a Python list, so an
+# (N, 20, D) window tensor held 20 copies of each sample. Here the windows are
+# a read-only view onto the (T, D) series: window k is dataset[s+k : s+k+h],
+# built by giving the window axis the same stride as the time axis.
+# -----------------------------------------------------------------------------
+
+
+def window_bounds(n_samples, start_index, end_index, history_size, target_size):
+    """
+    First/last label index of a split, as used by `multivariate_data`.
+
+    Returns:
+      start → index of the first label (start_index + history_size)
+      stop  → one past the last label (end_index, or T - target_size)
+    """
+    start = start_index + history_size
+    stop = end_index if end_index is not None else n_samples - target_size
+    return start, max(stop, start)
+
+
+def strided_windows(dataset, first, count, history_size):
+    """
+    `count` windows of `history_size` rows, the first one starting at `first`.
+
+    Args:
+      dataset       array (T, D); may be a memmap
+      first         row where the first window starts
+      count         number of windows
+      history_size  rows per window
+
+    Returns:
+      read-only view of shape (count, history_size, D)
+    """
+    dataset = np.asarray(dataset)
+    if dataset.ndim == 1:
+        dataset = dataset[:, None]
+    if count > 0 and first + count - 1 + history_size > len(dataset):
+        raise IndexError(f"windows [{first}, {first + count - 1 + history_size}) exceed "
+                         f"series of length {len(dataset)}")
+    base = dataset[first:]
+    step, feat = dataset.strides
+    return as_strided(base, shape=(count, history_size, dataset.shape[1]),
+                      strides=(step, step, feat), writeable=False)
+
+
+def multivariate_data(dataset, start_index, end_index, history_size, target_size,
+                      materialize=False):
+    """
+    Build sliding windows from `dataset`:
+      - inputs:  `history_size` timesteps ending at i-1
+      - output:  value at i+target_size
+
+    Args:
+      dataset       array of shape (T, D)
+      start_index   where to start (inclusive)
+      end_index     where to end (exclusive; None → T - target_size)
+      history_size  number of past steps in each input
+      target_size   steps-forward for prediction
+      materialize   return contiguous copies instead of views
+
+    Returns:
+      data  → array shape (N, history_size, D), read-only view unless materialized
+      labels→ array shape (N, D)
+    """
+    return multivariate_data_f(dataset, dataset, start_index, end_index,
+                               history_size, target_size, materialize)
+
+
+def multivariate_data_f(dataset_f, dataset, start_index, end_index, history_size, target_size,
+                        materialize=False):
+    """
+    Like `multivariate_data`, but uses:
+      - `dataset_f` for input histories
+      - `dataset` for labels.
+
+    Args:
+      dataset_f     array (T, D_f) → inputs
+      dataset       array (T, D_x) → labels
+      start_index, end_index, history_size, target_size, materialize  same as above
+
+    Returns:
+      data_f → array (N, history_size, D_f)
+      labels → array (N, D_x)
+    """
+    start, stop = window_bounds(len(dataset), start_index, end_index, history_size, target_size)
+    count = stop - start
+
+    data = strided_windows(dataset_f, start - history_size, count, history_size)
+    labels = np.asarray(dataset)[start + target_size: stop + target_size]
+    if len(labels) != count:
+        raise IndexError(f"labels [{start + target_size}, {stop + target_size}) exceed "
+                         f"series of length {len(dataset)}")
+
+    if materialize:
+        return np.ascontiguousarray(data), np.array(labels)
+    return data, labels
+
+
+# -----------------------------------------------------------------------------
+# Joint pose + motor windowing for all three splits at once
+# -----------------------------------------------------------------------------
+
+WindowSet = namedtuple('WindowSet', ['x', 'f', 'y', 'index'])
+WindowSet.__doc__ = """
+Windows of one split.
+
+  x      → (N, history, D_x) pose windows
+  f      → (N, history, D_f) motor windows
+  y      → (N, D_x) labels, shared by both inputs
+  index  → (N,) series index of each label
+"""
+
+
+def split_bounds(train_end, val_end):
+    """(start_index, end_index) of the train / val / test splits."""
+    return {'train': (0, train_end), 'val': (train_end, val_end), 'test': (val_end, None)}
+
+
+def joint_windows(dataset, dataset_f, train_end, val_end, history_size, target_size,
+                  materialize=False):
+    """
+    Pose windows, motor windows and one label array for every split.
+
+    Replaces the six multivariate_data / multivariate_data_f calls per
+    configuration: index ranges are computed once per split and the labels
+    (previously returned twice, as y_* and fy_*) are shared.
+
+    Args:
+      dataset       pose series (T, D_x) → x windows and labels
+      dataset_f     motor series (T, D_f) → f windows
+      train_end     index where training ends
+      val_end       index where validation ends
+      history_size, target_size, materialize  as in `multivariate_data`
+
+    Returns:
+      dict 'train' / 'val' / 'test' → WindowSet
+    """
+    if len(dataset_f) < len(dataset):
+        raise ValueError(f"motor series ({len(dataset_f)}) shorter than pose series ({len(dataset)})")
+
+    splits = {}
+    for name, (start_index, end_index) in split_bounds(train_end, val_end).items():
+        start, stop = window_bounds(len(dataset), start_index, end_index, history_size, target_size)
+        count = stop - start
+        first = start - history_size
+
+        x = strided_windows(dataset, first, count, history_size)
+        f = strided_windows(dataset_f, first, count, history_size)
+        index = np.arange(start + target_size, stop + target_size)
+        y = np.asarray(dataset)[start + target_size: stop + target_size]
+        if materialize:
+            x, f, y = np.ascontiguousarray(x), np.ascontiguousarray(f), np.array(y)
+        splits[name] = WindowSet(x, f, y, index)
+    return splits